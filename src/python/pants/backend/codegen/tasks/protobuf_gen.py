@@ -13,6 +13,7 @@ from hashlib import sha1
 from twitter.common.collections import OrderedSet
 
 from pants.backend.codegen.targets.java_protobuf_library import JavaProtobufLibrary
+from pants.backend.codegen.tasks.protobuf_parse import ProtobufParse
 from pants.backend.codegen.tasks.simple_codegen_task import SimpleCodegenTask
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.targets.java_library import JavaLibrary
@@ -110,21 +111,44 @@ class ProtobufGen(SimpleCodegenTask):
     return isinstance(target, JavaProtobufLibrary)
 
   def execute_codegen(self, target, target_workdir):
-    sources_by_base = self._calculate_sources(target)
-    sources = target.sources_relative_to_buildroot()
+    self._run_protoc(self._proto_paths(target), target.sources_relative_to_buildroot(),
+                     target_workdir)
 
-    bases = OrderedSet(sources_by_base.keys())
+  def batch_key(self, target):
+    # The sources plugins generate can't be attributed back to the targets in a batch.
+    if self.plugins:
+      return None
+    # Targets can only share an invocation if protoc will resolve their imports the same way.
+    return tuple(self._proto_paths(target))
+
+  def execute_codegen_batch(self, targets, batch_workdir):
+    sources = OrderedSet()
+    for target in targets:
+      sources.update(target.sources_relative_to_buildroot())
+    self._run_protoc(self._proto_paths(targets[0]), sources, batch_workdir)
+
+  def find_batch_sources(self, target, batch_workdir):
+    for source in target.sources_relative_to_buildroot():
+      with open(os.path.join(get_buildroot(), source), 'r') as fp:
+        parse = ProtobufParse(os.path.relpath(source, target.target_base), fp.read())
+      for java_source in parse.java_sources():
+        yield java_source
+
+  def _proto_paths(self, target):
+    bases = OrderedSet(self._calculate_sources(target).keys())
     bases.update(self._proto_path_imports([target]))
+    return bases
 
+  def _run_protoc(self, bases, sources, workdir):
     gen_flag = '--java_out'
 
-    gen = '{0}={1}'.format(gen_flag, target_workdir)
+    gen = '{0}={1}'.format(gen_flag, workdir)
 
     args = [self.protobuf_binary, gen]
 
     if self.plugins:
       for plugin in self.plugins:
-        args.append("--{0}_out={1}".format(plugin, target_workdir))
+        args.append("--{0}_out={1}".format(plugin, workdir))
 
     for base in bases:
       args.append('--proto_path={0}'.format(base))
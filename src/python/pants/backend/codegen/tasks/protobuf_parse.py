@@ -0,0 +1,106 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import re
+
+
+class ProtobufParse(object):
+  """Parses just enough of a .proto file to name the Java sources protoc generates for it.
+
+  This is not a full parser: it picks out the top-level package, options, messages, enums and
+  services, which is all protoc's Java generator uses to name its output files.
+  """
+
+  _COMMENT_RE = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+  _TOKEN_RE = re.compile(r'[{}]|\b(?P<kind>package|option|message|enum|service)\s+(?P<body>[^;{}]*)')
+  _OPTION_RE = re.compile(r'(?P<name>\w+)\s*=\s*"?(?P<value>[^"]*)"?')
+
+  def __init__(self, path, contents):
+    """
+    :param string path: the path of the .proto file, relative to its proto path.
+    :param string contents: the contents of the .proto file.
+    """
+    self.path = path
+    self.package = ''
+    self.options = {}
+    self.messages = []
+    self.enums = []
+    self.services = []
+    self._parse(self._COMMENT_RE.sub('', contents))
+
+  def _parse(self, contents):
+    depth = 0
+    for match in self._TOKEN_RE.finditer(contents):
+      token = match.group(0)
+      if token == '{':
+        depth += 1
+      elif token == '}':
+        depth -= 1
+      elif depth == 0:
+        kind, body = match.group('kind'), match.group('body').strip()
+        if kind == 'package':
+          self.package = body
+        elif kind == 'option':
+          option = self._OPTION_RE.match(body)
+          if option:
+            self.options[option.group('name')] = option.group('value').strip()
+        elif kind == 'message':
+          self.messages.append(body)
+        elif kind == 'enum':
+          self.enums.append(body)
+        elif kind == 'service':
+          self.services.append(body)
+
+  @property
+  def java_package(self):
+    return self.options.get('java_package', self.package)
+
+  @property
+  def outer_class_name(self):
+    if 'java_outer_classname' in self.options:
+      return self.options['java_outer_classname']
+    basename = os.path.basename(self.path)
+    for extension in ('.protodevel', '.proto'):
+      if basename.endswith(extension):
+        basename = basename[:-len(extension)]
+        break
+    return self._camel_case(basename)
+
+  @staticmethod
+  def _camel_case(name):
+    """Mirrors protoc's UnderscoresToCamelCase for file class names."""
+    result = []
+    cap_next = True
+    for char in name:
+      if 'a' <= char <= 'z':
+        result.append(char.upper() if cap_next else char)
+        cap_next = False
+      elif 'A' <= char <= 'Z':
+        result.append(char)
+        cap_next = False
+      elif '0' <= char <= '9':
+        result.append(char)
+        cap_next = True
+      else:
+        cap_next = True
+    return ''.join(result)
+
+  def java_sources(self):
+    """Returns the paths of the Java sources protoc generates for this file.
+
+    :rtype: list of strings
+    """
+    class_names = [self.outer_class_name]
+    if self.options.get('java_multiple_files') == 'true':
+      for message in self.messages:
+        class_names.extend([message, '{}OrBuilder'.format(message)])
+      class_names.extend(self.enums)
+      if self.options.get('java_generic_services') == 'true':
+        class_names.extend(self.services)
+    package_dir = self.java_package.replace('.', os.path.sep)
+    return [os.path.join(package_dir, '{}.java'.format(name)) for name in class_names]
@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import logging
 import os
+import shutil
 from abc import abstractmethod
 from collections import OrderedDict
 
@@ -14,11 +15,14 @@ from twitter.common.collections import OrderedSet
 
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
+from pants.base.execution_graph import ExecutionFailure, ExecutionGraph, Job
+from pants.base.worker_pool import WorkerPool
 from pants.base.workunit import WorkUnitLabel
 from pants.build_graph.address import Address
 from pants.build_graph.address_lookup_error import AddressLookupError
 from pants.task.task import Task
-from pants.util.dirutil import fast_relpath, safe_delete, safe_walk
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import fast_relpath, safe_delete, safe_mkdir_for, safe_walk
 
 
 logger = logging.getLogger(__name__)
@@ -46,6 +50,12 @@ class SimpleCodegenTask(Task):
                    'allowed, the logic of find_sources will associate generated sources with '
                    'the least-dependent targets that generate them.',
               advanced=True)
+    register('--worker-count', advanced=True, type=int, default=1,
+             help='The number of targets to generate code for concurrently. A target is only '
+                  'generated once all of the invalid targets it depends on have been.')
+    register('--batch-size', advanced=True, type=int, default=1,
+             help='The maximum number of compatible targets to generate code for with a single '
+                  'invocation of the code generator. Only used by tasks that support batching.')
 
   @classmethod
   def get_fingerprint_strategy(cls):
@@ -142,21 +152,173 @@ class SimpleCodegenTask(Task):
     synthetic_address = Address(sources_rel_path, synthetic_name)
     return synthetic_address
 
+  def batch_key(self, target):
+    """Returns a key shared by targets that can be generated with one code generator invocation.
+
+    Tasks that support batching override this along with `execute_codegen_batch` and
+    `find_batch_sources`; batching is then enabled with `--batch-size`.
+
+    :param Target target: a target that needs code generated.
+    :return: a hashable key, or None if the target must be generated on its own.
+    """
+    return None
+
+  def execute_codegen_batch(self, targets, batch_workdir):
+    """Generate code for all of the given targets with a single invocation of the code generator.
+
+    :param list targets: targets that all share the same `batch_key`.
+    :param string batch_workdir: a clean directory into which to generate code for all targets.
+    """
+    raise NotImplementedError
+
+  def find_batch_sources(self, target, batch_workdir):
+    """Determines which of the sources generated by `execute_codegen_batch` belong to the target.
+
+    :param Target target: one of the targets the batch was generated for.
+    :param string batch_workdir: the directory the batch generated code into.
+    :return: an iterable of filepaths relative to the batch_workdir.
+    """
+    raise NotImplementedError
+
   def execute(self):
     with self.invalidated(self.codegen_targets(),
                           invalidate_dependents=True,
                           fingerprint_strategy=self.get_fingerprint_strategy()) as invalidation_check:
-      with self.context.new_workunit(name='execute', labels=[WorkUnitLabel.MULTITOOL]):
+      with self.context.new_workunit(name='execute', labels=[WorkUnitLabel.MULTITOOL]) as workunit:
+        if self.get_options().worker_count > 1 or self.get_options().batch_size > 1:
+          generated_vts = [vt for vt in invalidation_check.invalid_vts
+                           if self._do_validate_sources_present(vt.target)]
+          self._execute_codegen_units(self._codegen_units(generated_vts), workunit)
+          generated_vts = set(generated_vts)
+          generate = lambda vt: vt in generated_vts
+        else:
+          def generate(vt):
+            if self._do_validate_sources_present(vt.target):
+              self.execute_codegen(vt.target, vt.results_dir)
+              return True
+            return False
+
         for vt in invalidation_check.all_vts:
           # Build the target and handle duplicate sources.
           if not vt.valid:
-            if self._do_validate_sources_present(vt.target):
-              self.execute_codegen(vt.target, vt.results_dir)
+            if generate(vt):
               self._handle_duplicate_sources(vt.target, vt.results_dir)
             vt.update()
           # And inject a synthetic target to represent it.
           self._inject_synthetic_target(vt.target, vt.results_dir)
 
+  def _codegen_units(self, vts):
+    """Groups the given versioned targets into lists to generate with one invocation each.
+
+    Targets are only batched together with others that share their `batch_key` and dependency
+    depth, so no batch ever depends on another batch that depends on it in turn.
+    """
+    batch_size = self.get_options().batch_size
+    if batch_size <= 1:
+      return [[vt] for vt in vts]
+
+    targets = set(vt.target for vt in vts)
+    depths = {}
+
+    def depth(target):
+      if target not in depths:
+        depths[target] = 1 + max([depth(dep) for dep in target.closure()
+                                  if dep != target and dep in targets] or [-1])
+      return depths[target]
+
+    units = []
+    batches = OrderedDict()
+    for vt in vts:
+      key = self.batch_key(vt.target)
+      if key is None:
+        units.append([vt])
+      else:
+        batches.setdefault((depth(vt.target), key), []).append(vt)
+    for batch in batches.values():
+      units.extend(batch[i:i + batch_size] for i in range(0, len(batch), batch_size))
+    return units
+
+  def _execute_codegen_units(self, units, workunit):
+    """Runs code generation for each list of versioned targets returned by `_codegen_units`.
+
+    With a --worker-count above 1, units run on a pool of threads. Only code generation itself
+    runs on the pool: duplicate source handling and synthetic target injection mutate the build
+    graph and so are left to the caller to run on the main thread, in the same order as a serial
+    run.
+    """
+    worker_count = min(self.get_options().worker_count, len(units))
+    if worker_count <= 1:
+      for unit in units:
+        self._execute_codegen_unit(unit)
+      return
+
+    def job_key(unit):
+      return 'codegen({})'.format(','.join(vt.target.address.spec for vt in unit))
+
+    unit_by_target = {vt.target: unit for unit in units for vt in unit}
+
+    def job(unit):
+      dependencies = OrderedSet()
+      for vt in unit:
+        for dep in vt.target.closure():
+          dep_unit = unit_by_target.get(dep)
+          if dep_unit is not None and dep_unit is not unit:
+            dependencies.add(job_key(dep_unit))
+      return Job(job_key(unit),
+                 lambda: self._execute_codegen_unit(unit),
+                 list(dependencies),
+                 size=sum(len(vt.target.sources_relative_to_buildroot()) for vt in unit))
+
+    worker_pool = WorkerPool(workunit, self.context.run_tracker, worker_count)
+    try:
+      ExecutionGraph([job(unit) for unit in units]).execute(worker_pool, self.context.log)
+    except ExecutionFailure as e:
+      raise TaskError('Code generation failure: {}'.format(e))
+    finally:
+      worker_pool.shutdown()
+
+  def _execute_codegen_unit(self, vts):
+    if len(vts) == 1:
+      vt = vts[0]
+      self.execute_codegen(vt.target, vt.results_dir)
+    else:
+      self._execute_codegen_batch(vts)
+
+  def _execute_codegen_batch(self, vts):
+    """Generates code for the given versioned targets at once and copies it to their results dirs.
+
+    If the generated sources can't be fully attributed back to the targets, falls back to
+    generating code for each target on its own.
+    """
+    targets = [vt.target for vt in vts]
+    with temporary_dir(root_dir=self.workdir, suffix='.batch') as batch_workdir:
+      self.execute_codegen_batch(targets, batch_workdir)
+
+      generated = set(self._find_sources_in_workdir(batch_workdir))
+      sources_by_vt = OrderedDict((vt, OrderedSet(self.find_batch_sources(vt.target, batch_workdir)))
+                                  for vt in vts)
+      attributed = set()
+      for sources in sources_by_vt.values():
+        attributed.update(sources)
+
+      if attributed != generated:
+        logger.warn('Could not attribute the sources generated for {} back to each target, '
+                    'generating code for them one at a time instead.\n'
+                    '  Unattributed: {}\n'
+                    '  Missing: {}'
+                    .format(', '.join(t.address.spec for t in targets),
+                            ', '.join(sorted(generated - attributed)),
+                            ', '.join(sorted(attributed - generated))))
+        for vt in vts:
+          self.execute_codegen(vt.target, vt.results_dir)
+        return
+
+      for vt, sources in sources_by_vt.items():
+        for source in sources:
+          dest = os.path.join(vt.results_dir, source)
+          safe_mkdir_for(dest)
+          shutil.copy2(os.path.join(batch_workdir, source), dest)
+
   @property
   def _copy_target_attributes(self):
     """Return a list of attributes to be copied from the target to derived synthetic targets."""
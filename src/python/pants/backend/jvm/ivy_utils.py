@@ -7,11 +7,11 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import copy
 import errno
+import hashlib
 import logging
 import os
 import pkgutil
 import threading
-import xml.etree.ElementTree as ET
 from collections import OrderedDict, defaultdict, namedtuple
 from contextlib import contextmanager
 
@@ -26,7 +26,18 @@ from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.base.generator import Generator, TemplateData
 from pants.base.revision import Revision
 from pants.build_graph.target import Target
-from pants.util.dirutil import safe_mkdir, safe_open
+from pants.util.dirutil import safe_concurrent_create, safe_mkdir, safe_open
+
+
+try:
+  import cPickle as pickle
+except ImportError:
+  import pickle
+
+try:
+  import xml.etree.cElementTree as ET
+except ImportError:
+  import xml.etree.ElementTree as ET
 
 
 IvyModule = namedtuple('IvyModule', ['ref', 'artifact', 'callers'])
@@ -243,16 +254,33 @@ class IvyUtils(object):
     If there is an existing symlink for a file under inpath, it is used rather than creating
     a new symlink. Preserves all other paths. Writes the resulting paths to outpath.
     Returns a map of path -> symlink to that path.
+
+    The map is also saved to a manifest next to outpath, keyed by the contents of inpath: if
+    called again for the same inpath, the saved map is returned without creating any symlinks, as
+    long as each of its symlinks still points at an existing file in the ivy cache.
     """
-    safe_mkdir(symlink_dir)
     # The ivy_cache_dir might itself be a symlink. In this case, ivy may return paths that
     # reference the realpath of the .jar file after it is resolved in the cache dir. To handle
     # this case, add both the symlink'ed path and the realpath to the jar to the symlink map.
     real_ivy_cache_dir = os.path.realpath(ivy_cache_dir)
-    symlink_map = OrderedDict()
     with safe_open(inpath, 'r') as infile:
-      inpaths = filter(None, infile.read().strip().split(os.pathsep))
-      paths = OrderedSet([os.path.realpath(path) for path in inpaths])
+      raw_classpath = infile.read()
+
+    hasher = hashlib.sha1()
+    for value in (real_ivy_cache_dir, symlink_dir, raw_classpath):
+      hasher.update(value.encode('utf-8') if isinstance(value, six.text_type) else value)
+      hasher.update(b'\0')
+    manifest_key = hasher.hexdigest()
+    manifest_path = '{}.manifest'.format(outpath)
+
+    symlink_map = cls._load_symlink_manifest(manifest_path, manifest_key)
+    if (symlink_map is not None and os.path.exists(outpath) and os.path.isdir(symlink_dir) and
+        cls._symlinks_intact(symlink_map)):
+      return dict(symlink_map)
+
+    symlink_map = OrderedDict()
+    inpaths = filter(None, raw_classpath.strip().split(os.pathsep))
+    paths = OrderedSet([os.path.realpath(path) for path in inpaths])
 
     for path in paths:
       if path.startswith(real_ivy_cache_dir):
@@ -261,12 +289,13 @@ class IvyUtils(object):
         # This path is outside the cache. We won't symlink it.
         symlink_map[path] = path
 
-    # Create symlinks for paths in the ivy cache dir.
-    for path, symlink in six.iteritems(symlink_map):
-      if path == symlink:
-        # Skip paths that aren't going to be symlinked.
-        continue
-      safe_mkdir(os.path.dirname(symlink))
+    # Create symlinks for paths in the ivy cache dir: first all of their directories, once each.
+    symlinks = [(path, symlink) for path, symlink in six.iteritems(symlink_map)
+                if path != symlink]
+    safe_mkdir(symlink_dir)
+    for symlink_parent_dir in sorted({os.path.dirname(symlink) for _, symlink in symlinks}):
+      safe_mkdir(symlink_parent_dir)
+    for path, symlink in symlinks:
       try:
         os.symlink(path, symlink)
       except OSError as e:
@@ -278,8 +307,41 @@ class IvyUtils(object):
     with safe_open(outpath, 'w') as outfile:
       outfile.write(':'.join(OrderedSet(symlink_map.values())))
 
+    cls._save_symlink_manifest(manifest_path, manifest_key, symlink_map)
     return dict(symlink_map)
 
+  @staticmethod
+  def _load_symlink_manifest(manifest_path, manifest_key):
+    try:
+      with open(manifest_path, 'rb') as fp:
+        saved_key, symlink_map = pickle.load(fp)
+    except Exception:
+      # There's no manifest, or a corrupt one, which can raise almost anything when unpickled:
+      # just link the classpath again.
+      return None
+    return symlink_map if saved_key == manifest_key else None
+
+  @staticmethod
+  def _symlinks_intact(symlink_map):
+    for path, symlink in symlink_map:
+      if path == symlink:
+        continue
+      try:
+        if os.readlink(symlink) != path:
+          return False
+      except OSError:
+        return False
+      if not os.path.exists(path):
+        return False
+    return True
+
+  @staticmethod
+  def _save_symlink_manifest(manifest_path, manifest_key, symlink_map):
+    def write(path):
+      with open(path, 'wb') as fp:
+        pickle.dump((manifest_key, list(symlink_map.items())), fp, pickle.HIGHEST_PROTOCOL)
+    safe_concurrent_create(write, manifest_path)
+
   @staticmethod
   def identify(targets):
     targets = list(targets)
@@ -322,24 +384,114 @@ class IvyUtils(object):
     if not os.path.exists(path):
       raise cls.IvyResolveReportError('Missing expected ivy output file {}'.format(path))
 
-    return cls._parse_xml_report(conf, path)
+    return cls._load_xml_report(conf, path)
+
+  # Bump when the layout of saved reports changes.
+  _SAVED_REPORT_VERSION = 1
+
+  # The modules of the most recently loaded reports, by report path -> (report stamp, modules),
+  # least recently used first.
+  _MAX_PARSED_REPORTS = 16
+  _parsed_reports = OrderedDict()
+  _parsed_reports_lock = threading.Lock()
+
+  @classmethod
+  def _load_xml_report(cls, conf, path):
+    """Returns a new `IvyInfo` of the report at path, parsing the report only if it's changed.
+
+    Reports are named by the hash of the resolve, so they're only rewritten when a resolve is
+    re-run: otherwise the same report is read on every run, and often by several tasks per run.
+    The modules of each report are saved alongside it the first time it's parsed, and the modules
+    of the last few reports loaded are held in memory, both for as long as the report's size and
+    mtime are unchanged.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_size, stat.st_mtime)
+    with cls._parsed_reports_lock:
+      parsed = cls._parsed_reports.pop(path, None)
+      if parsed is not None and parsed[0] == stamp:
+        cls._parsed_reports[path] = parsed
+    modules = parsed[1] if parsed is not None and parsed[0] == stamp else None
+
+    if modules is None:
+      saved_report_path = '{}.modules'.format(path)
+      modules = cls._load_saved_report(saved_report_path, stamp)
+      if modules is None:
+        logger.debug("Parsing ivy report {}".format(path))
+        modules = tuple(cls._parse_xml_report_modules(path))
+        cls._save_report(saved_report_path, stamp, modules)
+      with cls._parsed_reports_lock:
+        cls._parsed_reports[path] = (stamp, modules)
+        while len(cls._parsed_reports) > cls._MAX_PARSED_REPORTS:
+          cls._parsed_reports.popitem(last=False)
+
+    # The modules are immutable, but each caller gets its own `IvyInfo` to index them.
+    ivy_info = IvyInfo(conf)
+    for module in modules:
+      ivy_info.add_module(module)
+    return ivy_info
+
+  @classmethod
+  def _load_saved_report(cls, saved_report_path, stamp):
+    try:
+      with open(saved_report_path, 'rb') as fp:
+        version, saved_stamp, modules = pickle.load(fp)
+    except Exception:
+      # There's no saved report, or a corrupt one, which can raise almost anything when unpickled:
+      # just parse the report again.
+      return None
+    if version != cls._SAVED_REPORT_VERSION or tuple(saved_stamp) != stamp:
+      return None
+    return tuple(IvyModule(IvyModuleRef(*ref), artifact,
+                           tuple(IvyModuleRef(*caller) for caller in callers))
+                 for ref, artifact, callers in modules)
 
   @classmethod
-  def _parse_xml_report(cls, conf, path):
-    logger.debug("Parsing ivy report {}".format(path))
-    ret = IvyInfo(conf)
-    etree = ET.parse(path)
-    doc = etree.getroot()
-    for module in doc.findall('dependencies/module'):
-      org = module.get('organisation')
-      name = module.get('name')
-      for revision in module.findall('revision'):
+  def _save_report(cls, saved_report_path, stamp, modules):
+    # Modules are saved as plain tuples, which are compact and quick to load.
+    saved_modules = [((module.ref.org, module.ref.name, module.ref.rev, module.ref.classifier,
+                       module.ref.ext),
+                      module.artifact,
+                      [(caller.org, caller.name, caller.rev) for caller in module.callers])
+                     for module in modules]
+
+    def write(path):
+      with open(path, 'wb') as fp:
+        pickle.dump((cls._SAVED_REPORT_VERSION, stamp, saved_modules), fp,
+                    pickle.HIGHEST_PROTOCOL)
+
+    try:
+      safe_concurrent_create(write, saved_report_path)
+    except (IOError, OSError) as e:
+      # The report will just be parsed again next time.
+      logger.debug('Failed to save ivy report modules to {}: {}'.format(saved_report_path, e))
+
+  @classmethod
+  def _parse_xml_report_modules(cls, path):
+    """Yields an `IvyModule` for each artifact of each module revision in the report at path.
+
+    The report is streamed rather than loaded whole: each module is discarded once its artifacts
+    are yielded, so only one module's elements are held in memory at a time.
+    """
+    # The tags of the elements enclosing the current one: modules are at ivy-report/dependencies.
+    enclosing_tags = []
+    # NB: cElementTree only accepts byte string event names.
+    for event, element in ET.iterparse(path, events=(b'start', b'end')):
+      if event == 'start':
+        enclosing_tags.append(element.tag)
+        continue
+      enclosing_tags.pop()
+      if element.tag != 'module' or enclosing_tags[1:] != ['dependencies']:
+        continue
+
+      org = element.get('organisation')
+      name = element.get('name')
+      for revision in element.findall('revision'):
         rev = revision.get('name')
-        callers = []
-        for caller in revision.findall('caller'):
-          callers.append(IvyModuleRef(caller.get('organisation'),
-                                      caller.get('name'),
-                                      caller.get('callerrev')))
+        callers = tuple(IvyModuleRef(caller.get('organisation'),
+                                     caller.get('name'),
+                                     caller.get('callerrev'))
+                        for caller in revision.findall('caller'))
 
         for artifact in revision.findall('artifacts/artifact'):
           classifier = artifact.get('extra-classifier')
@@ -348,10 +500,8 @@ class IvyUtils(object):
                                         classifier=classifier, ext=ext)
 
           artifact_cache_path = artifact.get('location')
-          ivy_module = IvyModule(ivy_module_ref, artifact_cache_path, callers)
-
-          ret.add_module(ivy_module)
-    return ret
+          yield IvyModule(ivy_module_ref, artifact_cache_path, callers)
+      element.clear()
 
   @classmethod
   def generate_ivy(cls, targets, jars, excludes, ivyxml, confs, resolve_hash_name=None):
@@ -418,7 +568,17 @@ class IvyUtils(object):
       generator.write(output)
 
   @classmethod
-  def calculate_classpath(cls, targets, gather_excludes=True):
+  def calculate_classpath(cls, targets, gather_excludes=True, jar_libraries=None):
+    """Collects the jars and excludes to resolve for the given targets and their dependencies.
+
+    :param targets: The targets to walk.
+    :param bool gather_excludes: `True` to collect the excludes of the walked targets.
+    :param jar_libraries: If given, jars are only collected from these jar libraries and the walk
+                          doesn't descend into any other jar library, so that the resolve of one set
+                          of pinned artifacts doesn't pick up the jars managed by another.  The
+                          other targets walked still contribute their excludes.
+    :returns: A tuple of the jars and the global excludes.
+    """
     jars = OrderedDict()
     global_excludes = set()
     provide_excludes = set()
@@ -466,8 +626,15 @@ class IvyUtils(object):
         collect_excludes(target)
       collect_provide_excludes(target)
 
+    def should_walk(target):
+      if target in targets_processed:
+        return False
+      return (jar_libraries is None or
+              not isinstance(target, JarLibrary) or
+              target in jar_libraries)
+
     for target in targets:
-      target.walk(collect_elements, predicate=lambda target: target not in targets_processed)
+      target.walk(collect_elements, predicate=should_walk)
 
     # If a source dep is exported (ie, has a provides clause), it should always override
     # remote/binary versions of itself, ie "round trip" dependencies.
@@ -16,7 +16,7 @@ from pants.backend.jvm.tasks.jvm_binary_task import JvmBinaryTask
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
 from pants.fs import archive
-from pants.fs.archive import JAR
+from pants.fs.archive import JAR, ZipArchiver
 from pants.util.dirutil import safe_mkdir
 
 
@@ -106,11 +106,19 @@ class BundleCreate(JvmBinaryTask):
       jvm_bundles_product = self.context.products.get('jvm_bundles')
       jvm_bundles_product.add(app.target, os.path.dirname(basedir)).append(os.path.basename(basedir))
       if archiver:
+        kwargs = {}
+        if isinstance(archiver, ZipArchiver):
+          # Bundles mostly change by a few internal jars between runs: reuse the compressed
+          # entries of the rest from the previous archive.
+          kwargs['index_file'] = os.path.join(self.workdir, 'archives',
+                                              '{}.{}.index'.format(app.basename, archiver_type))
+          safe_mkdir(os.path.dirname(kwargs['index_file']))
         archivepath = archiver.create(
           basedir,
           self.get_options().pants_distdir,
           app.basename,
-          prefix=app.basename if self.get_options().archive_prefix else None
+          prefix=app.basename if self.get_options().archive_prefix else None,
+          **kwargs
         )
         self.context.log.info('created {}'.format(os.path.relpath(archivepath, get_buildroot())))
 
@@ -316,3 +316,96 @@ class ClasspathProducts(object):
         raise TaskError(
           'Classpath entry {} for target {} is located outside the working directory "{}".'
           .format(path, target.address.spec, self._pants_workdir))
+
+
+class MemoizedClasspaths(object):
+  """Computes the classpaths of many targets over one unchanging `ClasspathProducts`.
+
+  Computing the classpath of each target in a large graph from scratch repeats the same work many
+  times over: the closure of each dependency is re-walked for every dependee, as is the union of
+  the excludes in play and the check of every classpath entry against them.  Here each of those is
+  computed at most once: closures per target, excludes per closure, and exclude checks per distinct
+  set of excludes; so a classpath costs one pass over the memoized entries of its closure.
+
+  The classpaths are identical to those computed by `ClasspathUtil.compute_classpath` for the
+  closure of the target, so the products must not change while they're in use.  Instances may be
+  shared between threads: racing threads may compute the same memoized value, but will agree on it.
+  """
+
+  def __init__(self, classpath_products, confs):
+    """
+    :param ClasspathProducts classpath_products: Product containing classpath elements.
+    :param confs: The list of confs for use by the classpaths, or `None` for all confs.
+    """
+    self._classpath_products = classpath_products
+    self._confs = None if confs is None else frozenset(confs)
+    self._closures = {}  # target -> OrderedSet of the target's bfs closure.
+    self._excludes = {}  # target -> frozenset of the excludes in play for the target's closure.
+    self._entries = {}  # target -> tuple of the target's ClasspathEntrys in the given confs.
+    self._excluded = {}  # frozenset of excludes -> {ClasspathEntry: bool}.
+
+  def closure(self, target):
+    """Returns the closure of the given target, in breadth first order.
+
+    :rtype: :class:`twitter.common.collections.OrderedSet`
+    """
+    closure = self._closures.get(target)
+    if closure is None:
+      closure = self._closures.setdefault(target, target.closure(bfs=True))
+    return closure
+
+  def classpath(self, target, classpath_targets=None, extra_classpath_tuples=()):
+    """Returns the classpath for the given target.
+
+    :param target: The target to generate a classpath for.  Excludes are always applied from its
+                   whole closure.
+    :param classpath_targets: The targets whose entries make up the classpath, in order; the closure
+                              of `target` by default.
+    :param extra_classpath_tuples: Additional (conf, path) tuples to add to the end of the classpath.
+    :returns: The classpath as a list of path elements.
+    :rtype: list of string
+    """
+    if classpath_targets is None:
+      classpath_targets = self.closure(target)
+    excluded = self._excluded_for(target)
+
+    paths = OrderedSet()
+    for classpath_target in classpath_targets:
+      for entry in self._entries_for(classpath_target):
+        if excluded is None or not self._is_excluded(entry, excluded):
+          paths.add(entry.path)
+    paths.update(path for conf, path in extra_classpath_tuples if self._accepts(conf))
+    return list(paths)
+
+  def _accepts(self, conf):
+    return self._confs is None or conf in self._confs
+
+  def _entries_for(self, target):
+    entries = self._entries.get(target)
+    if entries is None:
+      entries = tuple(entry for conf, entry in
+                      self._classpath_products._classpaths.get_for_target(target)
+                      if self._accepts(conf))
+      self._entries[target] = entries
+    return entries
+
+  def _excluded_for(self, target):
+    """Returns the excludes in play for the target's closure, and the cache of checks against them.
+
+    Returns `None` if there are no excludes in play.
+    """
+    excludes = self._excludes.get(target)
+    if excludes is None:
+      excludes = frozenset(self._classpath_products._excludes.get_for_targets(self.closure(target)))
+      self._excludes[target] = excludes
+    if not excludes:
+      return None
+    return excludes, self._excluded.setdefault(excludes, {})
+
+  @staticmethod
+  def _is_excluded(entry, excluded):
+    excludes, checked = excluded
+    is_excluded = checked.get(entry)
+    if is_excluded is None:
+      is_excluded = checked[entry] = entry.is_excluded_by(excludes)
+    return is_excluded
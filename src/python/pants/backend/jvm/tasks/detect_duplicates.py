@@ -9,15 +9,13 @@ import os
 import re
 from collections import defaultdict
 
-from pex.compatibility import to_bytes
-
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
+from pants.backend.jvm.tasks.jar_entry_index import JarEntryIndex
 from pants.backend.jvm.tasks.jvm_binary_task import JvmBinaryTask
 from pants.base.exceptions import TaskError
 from pants.java.jar.manifest import Manifest
 from pants.option.custom_types import list_option
-from pants.util.contextutil import open_zip
-from pants.util.memo import memoized_property
+from pants.util.memo import memoized_method, memoized_property
 
 
 EXCLUDED_FILES = ['.DS_Store', 'cmdline.arg.info.txt.1', 'dependencies',
@@ -83,18 +81,49 @@ class DuplicateDetector(JvmBinaryTask):
     # Conflict structure returned for tests.
     return conflicts_by_binary
 
+  @memoized_property
+  def _jar_entry_index(self):
+    # The index only holds the entries that aren't excluded, so must be keyed by the exclusions.
+    include_key = repr((sorted(self.exclude_files),
+                        sorted(self.exclude_dirs),
+                        sorted(set(self.get_options().exclude_patterns or []))))
+    return JarEntryIndex(include=lambda name: not self._is_excluded(name),
+                         include_key=include_key,
+                         cache_dir=os.path.join(self.workdir, 'jar-entries'))
+
   def detect_duplicates_for_target(self, binary_target):
+    # The entries of each artifact, indexed by the hashes of their names.
+    jar_paths_by_artifact = self._get_external_dependencies(binary_target)
+    names_by_hash_by_artifact = self._get_internal_dependencies(binary_target)
+    hashes_by_artifact = {}
+    for artifact, jar_paths in jar_paths_by_artifact.items():
+      hashes_by_artifact[artifact] = frozenset().union(*(self._jar_entry_index.hashes(jar_path)
+                                                         for jar_path in jar_paths))
+    for artifact, names_by_hash in names_by_hash_by_artifact.items():
+      hashes_by_artifact[artifact] = frozenset(names_by_hash)
+
+    # Join the artifacts on their hashes to find those shared by more than one.
+    seen_hashes = set()
+    shared_hashes = set()
+    for hashes in hashes_by_artifact.values():
+      shared_hashes.update(seen_hashes.intersection(hashes))
+      seen_hashes.update(hashes)
+
+    # And name only the shared entries.
     artifacts_by_file_name = defaultdict(set)
-
-    # Extract external dependencies on libraries (jars)
-    external_deps = self._get_external_dependencies(binary_target)
-    for (file_name, jar_names) in external_deps.items():
-      artifacts_by_file_name[file_name].update(jar_names)
-
-    # Extract internal dependencies on classes and resources
-    internal_deps = self._get_internal_dependencies(binary_target)
-    for (file_name, target_specs) in internal_deps.items():
-      artifacts_by_file_name[file_name].update(target_specs)
+    for artifact, hashes in hashes_by_artifact.items():
+      artifact_shared_hashes = shared_hashes.intersection(hashes)
+      if not artifact_shared_hashes:
+        continue
+      if artifact in names_by_hash_by_artifact:
+        names_by_hash = names_by_hash_by_artifact[artifact]
+        file_names = [names_by_hash[name_hash] for name_hash in artifact_shared_hashes]
+      else:
+        file_names = set()
+        for jar_path in jar_paths_by_artifact[artifact]:
+          file_names.update(self._jar_entry_index.names(jar_path, artifact_shared_hashes).values())
+      for file_name in file_names:
+        artifacts_by_file_name[file_name].add(artifact)
 
     return self._check_conflicts(artifacts_by_file_name, binary_target)
 
@@ -107,32 +136,38 @@ class DuplicateDetector(JvmBinaryTask):
     return conflicts_by_artifacts
 
   def _get_internal_dependencies(self, binary_target):
-    artifacts_by_file_name = defaultdict(set)
-    classpath_products = self.context.products.get_data('runtime_classpath')
+    """Returns a map from the address of each internal target to its entries by name hash."""
+    names_by_hash_by_artifact = defaultdict(dict)
 
     # Select classfiles from the classpath - we want all the direct products of internal targets,
     # no external JarLibrary products.
     def record_file_ownership(target):
-      entries = ClasspathUtil.internal_classpath([target], classpath_products)
-      for f in ClasspathUtil.classpath_entries_contents(entries):
-        artifacts_by_file_name[f].add(target.address.reference())
+      names_by_hash = self._get_internal_entries(target)
+      if names_by_hash:
+        names_by_hash_by_artifact[target.address.reference()].update(names_by_hash)
 
     binary_target.walk(record_file_ownership)
-    return artifacts_by_file_name
+    return names_by_hash_by_artifact
+
+  @memoized_method
+  def _get_internal_entries(self, target):
+    # Targets are often shared by many binaries, so their entries are only listed once.
+    classpath_products = self.context.products.get_data('runtime_classpath')
+    entries = ClasspathUtil.internal_classpath([target], classpath_products)
+    names_by_hash = {}
+    for name in ClasspathUtil.classpath_entries_contents(entries):
+      file_name = JarEntryIndex.decode_name(name)
+      if not self._is_excluded(file_name):
+        names_by_hash[JarEntryIndex.hash_name(file_name)] = file_name
+    return names_by_hash
 
   def _get_external_dependencies(self, binary_target):
-    artifacts_by_file_name = defaultdict(set)
+    """Returns a map from the artifact filename of each external dependency to its jars."""
+    jar_paths_by_artifact = defaultdict(list)
     for external_dep, coordinate in self.list_external_jar_dependencies(binary_target):
       self.context.log.debug('  scanning {} from {}'.format(coordinate, external_dep))
-      with open_zip(external_dep) as dep_zip:
-        for qualified_file_name in dep_zip.namelist():
-          # Zip entry names can come in any encoding and in practice we find some jars that have
-          # utf-8 encoded entry names, some not.  As a result we cannot simply decode in all cases
-          # and need to do this to_bytes(...).decode('utf-8') dance to stay safe across all entry
-          # name flavors and under all supported pythons.
-          decoded_file_name = to_bytes(qualified_file_name).decode('utf-8')
-          artifacts_by_file_name[decoded_file_name].add(coordinate.artifact_filename)
-    return artifacts_by_file_name
+      jar_paths_by_artifact[coordinate.artifact_filename].append(external_dep)
+    return jar_paths_by_artifact
 
   def _is_excluded(self, path):
     if self._isdir(path) or Manifest.PATH == path:
@@ -85,17 +85,19 @@ class IvyResolve(IvyTaskMixin, NailgunTask):
     targets = self.context.targets()
     compile_classpath = self.context.products.get_data('compile_classpath',
         init_func=ClasspathProducts.init_func(self.get_options().pants_workdir))
-    resolve_hash_name = self.resolve(executor=executor,
-                                     targets=targets,
-                                     classpath_products=compile_classpath,
-                                     confs=self.get_options().confs,
-                                     extra_args=self._args)
+    resolve_hash_names = self.resolve_by_artifact_set(executor=executor,
+                                                      targets=targets,
+                                                      classpath_products=compile_classpath,
+                                                      confs=self.get_options().confs,
+                                                      extra_args=self._args)
     if self._report:
-      self._generate_ivy_report(resolve_hash_name)
+      # With nothing to resolve, an empty report is generated.
+      for resolve_hash_name in resolve_hash_names or [None]:
+        self._generate_ivy_report(resolve_hash_name)
 
   def check_artifact_cache_for(self, invalidation_check):
     # Ivy resolution is an output dependent on the entire target set, and is not divisible
-    # by target. So we can only cache it keyed by the entire target set.
+    # by target. So we can only cache it keyed by the entire target set of each resolve.
     global_vts = VersionedTargetSet.from_versioned_targets(invalidation_check.all_vts)
     return [global_vts]
 
@@ -11,6 +11,8 @@ import shutil
 import threading
 from hashlib import sha1
 
+from twitter.common.collections import OrderedSet
+
 from pants.backend.jvm.ivy_utils import IvyUtils
 from pants.backend.jvm.jar_dependency_utils import ResolvedJar
 from pants.backend.jvm.subsystems.jar_dependency_management import JarDependencyManagement
@@ -116,6 +118,93 @@ class IvyTaskMixin(TaskBase):
 
     confs = confs or ('default',)
 
+    return self._resolve_partition(executor, targets, None, classpath_products, confs, extra_args,
+                                   invalidate_dependents)
+
+  def resolve_by_artifact_set(self, executor, targets, classpath_products, confs=None,
+                              extra_args=None, invalidate_dependents=False):
+    """Like `resolve`, but resolves jar libraries separately per set of pinned artifacts.
+
+    Jar libraries managed by different sets of pinned artifacts (see `JarDependencyManagement`) are
+    resolved separately, each set in its own resolve with its own cache key and reports, so that a
+    change to the libraries managed by one set doesn't re-resolve those managed by the others.
+
+    :returns: The ids of the reports associated with this resolve, one per resolve run.
+    :rtype: list of string
+    :raises: :class:`JarDependencyManagement.IncompatibleManagedJarDependencies` if a target
+             depends on jar libraries managed by more than one set, since they can't be resolved
+             against each other.
+    """
+
+    classpath_products.add_excludes_for_targets(targets)
+
+    confs = confs or ('default',)
+
+    resolve_hash_names = []
+    for partition, jar_libraries in self._partition_by_artifact_set(targets):
+      resolve_hash_name = self._resolve_partition(executor, partition, jar_libraries,
+                                                  classpath_products, confs, extra_args,
+                                                  invalidate_dependents)
+      if resolve_hash_name:
+        resolve_hash_names.append(resolve_hash_name)
+    return resolve_hash_names
+
+  def _partition_by_artifact_set(self, targets):
+    """Partitions the given targets into those to resolve together.
+
+    Jar libraries are partitioned by the set of pinned artifacts that manages them.  Any other
+    targets may exclude jars from every resolve, so they're included in every partition, but only
+    the partition's own jar libraries contribute jars to its resolve.
+
+    :returns: A list of partitions, each a tuple of the targets in their original order and the
+              jar libraries to collect jars from, or `None` to collect them from all the targets
+              when there's just the one partition.
+    :raises: :class:`JarDependencyManagement.IncompatibleManagedJarDependencies` if a target
+             depends on jar libraries from more than one partition.
+    """
+    manager = JarDependencyManagement.global_instance()
+    artifact_set_id_by_target = {}
+    for target in targets:
+      if isinstance(target, JarLibrary):
+        artifact_set = manager.for_target(target)
+        artifact_set_id_by_target[target] = artifact_set.id if artifact_set else None
+
+    artifact_set_ids = OrderedSet(artifact_set_id_by_target[target] for target in targets
+                                  if target in artifact_set_id_by_target)
+    if len(artifact_set_ids) < 2:
+      return [(targets, None)]
+
+    # The classpath of a target depending on jars from several partitions would mix independent
+    # resolves, so any conflicts between them would go unresolved.
+    artifact_set_ids_by_target = {}
+
+    def reachable_artifact_set_ids(target):
+      if target not in artifact_set_ids_by_target:
+        if target in artifact_set_id_by_target:
+          reachable = frozenset([artifact_set_id_by_target[target]])
+        else:
+          reachable = frozenset().union(*(reachable_artifact_set_ids(dependency)
+                                          for dependency in target.dependencies))
+        artifact_set_ids_by_target[target] = reachable
+      return artifact_set_ids_by_target[target]
+
+    for target in targets:
+      if len(reachable_artifact_set_ids(target)) > 1:
+        raise JarDependencyManagement.IncompatibleManagedJarDependencies(
+          '{} depends on jar libraries managed by multiple incompatible managed_jar_dependencies.'
+          .format(target.address.spec))
+
+    partitions = []
+    for artifact_set_id in artifact_set_ids:
+      partition = [target for target in targets
+                   if artifact_set_id_by_target.get(target, artifact_set_id) == artifact_set_id]
+      jar_libraries = frozenset(target for target in partition
+                                if target in artifact_set_id_by_target)
+      partitions.append((partition, jar_libraries))
+    return partitions
+
+  def _resolve_partition(self, executor, targets, jar_libraries, classpath_products, confs,
+                         extra_args, invalidate_dependents):
     # After running ivy, we parse the resulting report, and record the dependencies for
     # all relevant targets (ie: those that have direct dependencies).
     _, symlink_map, resolve_hash_name = self.ivy_resolve(
@@ -125,6 +214,7 @@ class IvyTaskMixin(TaskBase):
       confs=confs,
       custom_args=extra_args,
       invalidate_dependents=invalidate_dependents,
+      jar_libraries=jar_libraries,
     )
 
     if not resolve_hash_name:
@@ -182,7 +272,8 @@ class IvyTaskMixin(TaskBase):
                   workunit_name=None,
                   confs=None,
                   custom_args=None,
-                  invalidate_dependents=False):
+                  invalidate_dependents=False,
+                  jar_libraries=None):
     """Resolves external dependencies for the given targets.
 
     If there are no targets suitable for jvm transitive dependency resolution, an empty result is
@@ -199,6 +290,10 @@ class IvyTaskMixin(TaskBase):
     :type custom_args: list of string
     :param bool invalidate_dependents: `True` to invalidate dependents of targets that needed to be
                                         resolved.
+    :param jar_libraries: If given, only the jars of these jar libraries are resolved; all the jar
+                          libraries reachable from the targets are resolved by default.
+    :type jar_libraries: :class:`collections.Set` of
+                         :class:`pants.backend.jvm.targets.jar_library.JarLibrary`
     :returns: A tuple of the classpath, a mapping from ivy cache jars to their linked location
               under .pants.d, and the id of the reports associated with the resolve.
     :rtype: tuple of (list, dict, string)
@@ -212,8 +307,6 @@ class IvyTaskMixin(TaskBase):
 
     fingerprint_strategy = IvyResolveFingerprintStrategy(confs)
 
-    # TODO(gmalmquist): Targets should be partitioned and resolved in separate groups depending on
-    # what sets of pinned artifacts they depend on.
     with self.invalidated(targets,
                           invalidate_dependents=invalidate_dependents,
                           silent=silent,
@@ -261,7 +354,8 @@ class IvyTaskMixin(TaskBase):
             workunit_name=workunit_name,
             confs=confs,
             use_soft_excludes=self.get_options().soft_excludes,
-            resolve_hash_name=resolve_hash_name)
+            resolve_hash_name=resolve_hash_name,
+            jar_libraries=jar_libraries)
 
         if not os.path.exists(raw_target_classpath_file_tmp):
           raise self.Error('Ivy failed to create classpath file at {}'
@@ -296,7 +390,8 @@ class IvyTaskMixin(TaskBase):
                ivy=None,
                workunit_name='ivy',
                use_soft_excludes=False,
-               resolve_hash_name=None):
+               resolve_hash_name=None,
+               jar_libraries=None):
     ivy_jvm_options = self.get_options().jvm_options[:]
     # Disable cache in File.getCanonicalPath(), makes Ivy work with -symlink option properly on ng.
     ivy_jvm_options.append('-Dsun.io.useCanonCaches=false')
@@ -315,7 +410,9 @@ class IvyTaskMixin(TaskBase):
     # diagnostics can be had in `IvyUtils.generate_ivy` if this is done.
     # See: https://github.com/pantsbuild/pants/issues/2239
     try:
-      jars, excludes = IvyUtils.calculate_classpath(targets, gather_excludes=not use_soft_excludes)
+      jars, excludes = IvyUtils.calculate_classpath(targets,
+                                                    gather_excludes=not use_soft_excludes,
+                                                    jar_libraries=jar_libraries)
       with IvyUtils.ivy_lock:
         IvyUtils.generate_ivy(targets, jars, excludes, ivyxml, confs_to_resolve, resolve_hash_name)
         runner = ivy.runner(jvm_options=ivy_jvm_options, args=ivy_args, executor=executor)
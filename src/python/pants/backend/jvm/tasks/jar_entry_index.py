@@ -0,0 +1,136 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import hashlib
+import os
+import struct
+import threading
+
+from pex.compatibility import to_bytes
+
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import safe_concurrent_create
+
+
+class JarEntryIndex(object):
+  """Indexes the entries of jars by the hashes of their names.
+
+  Each jar is listed once, and its entries kept as a sorted array of 64 bit hashes of their names:
+  in memory for as long as the jar's size and mtime are unchanged, and optionally also saved under
+  a directory keyed by the jar's path, size and mtime, so that later runs needn't open the jars of
+  earlier ones.  Jars sharing entries can then be found by intersecting hashes, and only the jars
+  that do share entries need be opened again, to name them.
+
+  Safe to use from multiple threads.
+  """
+
+  # Hashes are saved as little-endian 64 bit unsigned integers.
+  _HASH_FORMAT = str('<{}Q')
+  _HASH_SIZE = 8
+
+  @staticmethod
+  def decode_name(name):
+    """Decodes a zip entry name.
+
+    Zip entry names can come in any encoding and in practice we find some jars that have utf-8
+    encoded entry names, some not.  As a result we cannot simply decode in all cases and need to do
+    this to_bytes(...).decode('utf-8') dance to stay safe across all entry name flavors and under
+    all supported pythons.
+    """
+    return to_bytes(name).decode('utf-8')
+
+  @staticmethod
+  def hash_name(name):
+    """Returns the 64 bit hash of an entry name.
+
+    :param string name: A decoded entry name.
+    :rtype: int
+    """
+    return int(hashlib.md5(name.encode('utf-8')).hexdigest()[:16], 16)
+
+  def __init__(self, include=None, include_key='', cache_dir=None):
+    """
+    :param include: A predicate on decoded entry names: only those it accepts are indexed.  All
+                    entries are indexed by default.
+    :param string include_key: A key that changes whenever the include predicate does.
+    :param string cache_dir: A directory to save the hashes of jars to and load them from, if any.
+    """
+    self._include = include or (lambda name: True)
+    self._include_key = include_key
+    self._cache_dir = cache_dir
+    self._lock = threading.Lock()
+    self._hashes = {}  # jar path -> (jar stamp, frozenset of entry name hashes).
+
+  def hashes(self, jar_path):
+    """Returns the hashes of the names of the included entries of the given jar.
+
+    :param string jar_path: The jar to index.
+    :rtype: frozenset of int
+    """
+    stat = os.stat(jar_path)
+    stamp = (stat.st_size, stat.st_mtime)
+    with self._lock:
+      indexed = self._hashes.get(jar_path)
+    if indexed is not None and indexed[0] == stamp:
+      return indexed[1]
+
+    if self._cache_dir:
+      hashes = self._load_or_index(jar_path, stamp)
+    else:
+      hashes = self._index(jar_path)
+    hashes = frozenset(hashes)
+    with self._lock:
+      self._hashes[jar_path] = (stamp, hashes)
+    return hashes
+
+  def names(self, jar_path, hashes):
+    """Returns the included entries of the given jar with the given name hashes.
+
+    :param string jar_path: The jar to look up entries in.
+    :param hashes: The hashes of the entry names to look up.
+    :returns: A map from hash to decoded entry name.
+    :rtype: dict of int to string
+    """
+    names_by_hash = {}
+    for name in self._included_names(jar_path):
+      name_hash = self.hash_name(name)
+      if name_hash in hashes:
+        names_by_hash[name_hash] = name
+    return names_by_hash
+
+  def _included_names(self, jar_path):
+    with open_zip(jar_path) as jar:
+      for name in jar.namelist():
+        decoded_name = self.decode_name(name)
+        if self._include(decoded_name):
+          yield decoded_name
+
+  def _index(self, jar_path):
+    return sorted({self.hash_name(name) for name in self._included_names(jar_path)})
+
+  def _load_or_index(self, jar_path, stamp):
+    hasher = hashlib.sha1()
+    for value in (jar_path, repr(stamp), self._include_key):
+      hasher.update(to_bytes(value))
+      hasher.update(b'\0')
+    cache_file = os.path.join(self._cache_dir, hasher.hexdigest())
+
+    try:
+      with open(cache_file, 'rb') as fp:
+        data = fp.read()
+      return struct.unpack(self._HASH_FORMAT.format(len(data) // self._HASH_SIZE), data)
+    except Exception:
+      # There's no entry, or a truncated one: index the jar again.
+      pass
+
+    hashes = self._index(jar_path)
+
+    def write(path):
+      with open(path, 'wb') as fp:
+        fp.write(struct.pack(self._HASH_FORMAT.format(len(hashes)), *hashes))
+    safe_concurrent_create(write, cache_file)
+    return hashes
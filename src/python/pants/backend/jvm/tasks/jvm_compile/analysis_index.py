@@ -0,0 +1,118 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import hashlib
+import os
+import threading
+
+from pex.compatibility import to_bytes
+
+from pants.util.dirutil import safe_concurrent_create
+
+
+try:
+  import cPickle as pickle
+except ImportError:
+  import pickle
+
+
+class AnalysisIndex(object):
+  """Parses the products and dependencies of analysis files at most once each.
+
+  The products and dependencies of an analysis are each parsed lazily, the first time they're
+  requested, and then held in memory for as long as the analysis file is unchanged.  Optionally,
+  they're also saved under a directory, one entry per analysis file, so that later runs needn't
+  parse analyses that haven't changed since: in particular those of valid targets, which are
+  otherwise re-parsed on every run.  Each entry records the analysis file's signature and digest:
+  the file is only digested when its signature no longer matches, to find if its content changed.
+
+  Safe to use from multiple threads.
+  """
+
+  def __init__(self, parser, cache_dir=None):
+    """
+    :param parser: The `AnalysisParser` for the analysis files.
+    :param string cache_dir: A directory to save parsed analyses to and load them from, if any.
+    """
+    self._parser = parser
+    self._cache_dir = cache_dir
+    self._lock = threading.Lock()
+    self._parsed = {}  # (kind, analysis file, args) -> (file signature, parsed value).
+
+  def products(self, analysis_file, classes_dir):
+    """Returns the products of the analysis, as `AnalysisParser.parse_products_from_path` does."""
+    return self._get('products', self._parser.parse_products_from_path, analysis_file, classes_dir)
+
+  def deps(self, analysis_file):
+    """Returns the dependencies of the analysis, as `AnalysisParser.parse_deps_from_path` does."""
+    return self._get('deps', self._parser.parse_deps_from_path, analysis_file)
+
+  def _get(self, kind, parse, analysis_file, *args):
+    try:
+      stat = os.stat(analysis_file)
+    except OSError:
+      # Let the parser report the missing file.
+      return parse(analysis_file, *args)
+    # The analysis is rewritten via a rename after each compile, so its inode changes even if its
+    # size and mtime don't.
+    signature = (stat.st_ino, stat.st_size, stat.st_mtime)
+
+    key = (kind, analysis_file, args)
+    with self._lock:
+      parsed = self._parsed.get(key)
+    if parsed is not None and parsed[0] == signature:
+      return parsed[1]
+
+    if self._cache_dir:
+      value = self._load_or_parse(kind, parse, analysis_file, args, signature)
+    else:
+      value = parse(analysis_file, *args)
+    with self._lock:
+      self._parsed[key] = (signature, value)
+    return value
+
+  def _load_or_parse(self, kind, parse, analysis_file, args, signature):
+    hasher = hashlib.sha1()
+    for value in (kind, analysis_file) + args:
+      hasher.update(to_bytes(value))
+      hasher.update(b'\0')
+    cache_file = os.path.join(self._cache_dir, hasher.hexdigest())
+
+    digest = None
+    try:
+      with open(cache_file, 'rb') as fp:
+        saved_signature, saved_digest, value = pickle.load(fp)
+      if saved_signature == signature:
+        return value
+      # The analysis was rewritten, but perhaps with the same content.
+      digest = self._digest(analysis_file)
+      if saved_digest == digest:
+        self._save(cache_file, signature, digest, value)
+        return value
+    except Exception:
+      # There's no entry, or a corrupt one, which can raise almost anything when unpickled.
+      pass
+
+    value = parse(analysis_file, *args)
+    self._save(cache_file, signature, digest or self._digest(analysis_file), value)
+    return value
+
+  @staticmethod
+  def _digest(analysis_file):
+    hasher = hashlib.sha1()
+    with open(analysis_file, 'rb') as fp:
+      for chunk in iter(lambda: fp.read(1024 * 1024), b''):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+  @staticmethod
+  def _save(cache_file, signature, digest, value):
+    # Each entry is replaced in place, so concurrent readers only ever see complete entries.
+    def write(path):
+      with open(path, 'wb') as fp:
+        pickle.dump((signature, digest, value), fp, pickle.HIGHEST_PROTOCOL)
+    safe_concurrent_create(write, cache_file)
@@ -0,0 +1,146 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import re
+
+import six
+
+
+class AnalysisRebaser(object):
+  """Rebases text analysis files by substituting paths over the whole file at once.
+
+  An `AnalysisParser` rebases an analysis section by section and line by line, in python.  But in
+  the analyses zinc writes, every path that should be rebased is rebased, and the only lines
+  holding other text that might contain a base are the base64 encoded API and source info blobs.
+  So unless a base could appear in a blob, rebasing is the same as replacing the base throughout
+  the file, which `bytes.replace` does in a single fast search per base.
+
+  References to the java home are dropped as the parser drops them: the items of the sections
+  listing binary dependencies and their stamps that refer to it are removed and the sections' item
+  counts adjusted.  Only those sections are walked line by line, and only when the java home
+  appears in the file.
+
+  When the result might differ from the parser's, nothing is written and the caller should fall
+  back to the parser: ie, for files that don't start with the expected header (which the parser
+  will reject), whose java home sections can't be found, or that have a base followed by only
+  base64 up to the end of its line.
+  """
+
+  _BASE64_CHARS = re.compile(br'[A-Za-z0-9+/=]*\Z')
+
+  # The sections the parser drops java home references from, in the order they appear in an
+  # analysis, and whether it drops items that mention the java home anywhere or only those that
+  # start with it.  Each item of these sections is a single `key -> value` line.  NB: the relations
+  # also have a 'class names' section, but it comes before the 'binary stamps' one.
+  _JAVA_HOME_SECTIONS = ((b'binary dependencies', False),
+                         (b'binary stamps', True),
+                         (b'class names', True))
+
+  _NUM_ITEMS = re.compile(br'(\d+) items\n')
+
+  def __init__(self, header):
+    """
+    :param bytes header: The first line of an analysis file in the current format.
+    """
+    self._header = header
+
+  def rebase_from_path(self, infile_path, outfile_path, rebase_mappings, java_home=None):
+    """Rebase an analysis at infile_path, writing the result to outfile_path.
+
+    :param string infile_path: The analysis to rebase.
+    :param string outfile_path: The path to write the rebased analysis to.
+    :param rebase_mappings: A list of (old base, new base) pairs to apply in order, as successive
+                            calls to `AnalysisParser.rebase` would.
+    :param string java_home: The java home whose references should be dropped, if any.
+    :returns: `True` if the analysis was rebased, or `False` if it must be rebased by the parser.
+    :rtype: bool
+    """
+    with open(infile_path, 'rb') as infile:
+      analysis = infile.read()
+    analysis = self.rebase(analysis, rebase_mappings, java_home=java_home)
+    if analysis is None:
+      return False
+    with open(outfile_path, 'wb') as outfile:
+      outfile.write(analysis)
+    return True
+
+  def rebase(self, analysis, rebase_mappings, java_home=None):
+    """Rebase the given analysis.
+
+    :param bytes analysis: The contents of an analysis file.
+    :param rebase_mappings: A list of (old base, new base) pairs to apply in order.
+    :param string java_home: The java home whose references should be dropped, if any.
+    :returns: The rebased analysis, or `None` if it must be rebased by the parser.
+    :rtype: bytes
+    """
+    if not analysis.startswith(self._header):
+      return None
+    if java_home:
+      java_home = self._encode(java_home)
+      if java_home in analysis:
+        analysis = self._drop_java_home(analysis, java_home)
+        if analysis is None:
+          return None
+    for old_base, new_base in rebase_mappings:
+      old_base = self._encode(old_base)
+      if old_base not in analysis:
+        continue
+      if self._in_base64_line(analysis, old_base):
+        return None
+      analysis = analysis.replace(old_base, self._encode(new_base))
+    return analysis
+
+  @classmethod
+  def _drop_java_home(cls, analysis, java_home):
+    """Drops the items of the java home sections that refer to the given java home.
+
+    :returns: The analysis without those items, or `None` if a section can't be found.
+    """
+    pieces = []
+    start = 0
+    for header, prefix_only in cls._JAVA_HOME_SECTIONS:
+      header_line = b'\n' + header + b':\n'
+      # Back up to the end of the previous section's last item, in case this section follows it.
+      section_start = analysis.find(header_line, max(0, start - 1))
+      if section_start == -1:
+        return None
+      num_items = cls._NUM_ITEMS.match(analysis, section_start + len(header_line))
+      if not num_items:
+        return None
+
+      items = []
+      pos = num_items.end()
+      for _ in range(int(num_items.group(1))):
+        end = analysis.find(b'\n', pos) + 1
+        if not end:
+          return None
+        item = analysis[pos:end]
+        if not (item.startswith(java_home) if prefix_only else java_home in item):
+          items.append(item)
+        pos = end
+
+      pieces.append(analysis[start:num_items.start()])
+      pieces.append('{} items\n'.format(len(items)).encode('ascii'))
+      pieces.extend(items)
+      start = pos
+    pieces.append(analysis[start:])
+    return b''.join(pieces)
+
+  @staticmethod
+  def _encode(base):
+    return base.encode('utf-8') if isinstance(base, six.text_type) else base
+
+  @classmethod
+  def _in_base64_line(cls, analysis, base):
+    # Paths almost always contain a '.', '_' or '-' somewhere, which can't appear in base64.
+    if not cls._BASE64_CHARS.match(base):
+      return False
+    # Otherwise look for the base followed by only base64 up to the end of its line.  That's true
+    # of any base in a blob, but rarely of one in a path, which almost always goes on to a file
+    # extension.  Starting the pattern with the base lets the regex engine skip ahead to each one.
+    base_in_base64_line = re.compile(re.escape(base) + br'[A-Za-z0-9+/=]*(?:\n|\Z)')
+    return base_in_base64_line.search(analysis) is not None
@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import os
 import shutil
 
+from pants.backend.jvm.tasks.jvm_compile.analysis_rebaser import AnalysisRebaser
 from pants.util.contextutil import temporary_dir
 
 
@@ -27,6 +28,7 @@ class AnalysisTools(object):
     self._pants_buildroot = pants_buildroot.encode('utf-8')
     self._pants_workdir = pants_workdir.encode('utf-8')
     self._analysis_cls = analysis_cls
+    self._rebaser = AnalysisRebaser(parser.current_test_header)
 
   def split_to_paths(self, analysis_path, split_path_pairs, catchall_path=None):
     """Split an analysis file.
@@ -53,12 +55,24 @@ class AnalysisTools(object):
     merged_analysis.write_to_path(merged_analysis_path)
 
   def rebase_from_path(self, infile_path, outfile_path, old_base, new_base):
-    self.parser.rebase_from_path(infile_path, outfile_path, old_base, new_base, java_home=None)
+    self._rebase_from_path(infile_path, outfile_path, [(old_base, new_base)])
+
+  def _rebase_from_path(self, infile_path, outfile_path, rebase_mappings, java_home=None):
+    """Rebases with the `AnalysisRebaser` if it can, or else with the parser."""
+    if self._rebaser.rebase_from_path(infile_path, outfile_path, rebase_mappings, java_home):
+      return
+    with temporary_dir() as tmp_analysis_dir:
+      for index, (old_base, new_base) in enumerate(rebase_mappings):
+        if index == len(rebase_mappings) - 1:
+          rebased_path = outfile_path
+        else:
+          rebased_path = os.path.join(tmp_analysis_dir, 'analysis.{}'.format(index))
+        self.parser.rebase_from_path(infile_path, rebased_path, old_base, new_base, java_home)
+        infile_path = rebased_path
 
   def relativize(self, src_analysis, relativized_analysis):
     with temporary_dir() as tmp_analysis_dir:
-      tmp_analysis_file1 = os.path.join(tmp_analysis_dir, 'analysis.relativized.1')
-      tmp_analysis_file2 = os.path.join(tmp_analysis_dir, 'analysis.relativized.2')
+      tmp_analysis_file = os.path.join(tmp_analysis_dir, 'analysis.relativized')
 
       # NOTE: We can't port references to deps on the Java home. This is because different JVM
       # implementations on different systems have different structures, and there's not
@@ -70,24 +84,20 @@ class AnalysisTools(object):
       # Work on a tmpfile, for safety.
       # Start with rebasing working directory,
       # because build root cannot be subdirectory of working directory.
-      # TODO: Change to one call to zincutils when API will be made: https://github.com/pantsbuild/zincutils/issues/8.
-      self.parser.rebase_from_path(src_analysis, tmp_analysis_file1,
-                                   self._pants_workdir, self._PANTS_WORKDIR_PLACEHOLDER, self._java_home)
-      self.parser.rebase_from_path(tmp_analysis_file1, tmp_analysis_file2,
-                                   self._pants_buildroot, self._PANTS_BUILDROOT_PLACEHOLDER, self._java_home)
+      self._rebase_from_path(src_analysis, tmp_analysis_file,
+                             [(self._pants_workdir, self._PANTS_WORKDIR_PLACEHOLDER),
+                              (self._pants_buildroot, self._PANTS_BUILDROOT_PLACEHOLDER)],
+                             self._java_home)
 
-      shutil.move(tmp_analysis_file2, relativized_analysis)
+      shutil.move(tmp_analysis_file, relativized_analysis)
 
   def localize(self, src_analysis, localized_analysis):
     with temporary_dir() as tmp_analysis_dir:
-      tmp_analysis_file1 = os.path.join(tmp_analysis_dir, 'analysis.1')
-      tmp_analysis_file2 = os.path.join(tmp_analysis_dir, 'analysys.2')
+      tmp_analysis_file = os.path.join(tmp_analysis_dir, 'analysis')
 
       # Work on a tmpfile, for safety.
-      # TODO: Change to one call to zincutils when API will be made: https://github.com/pantsbuild/zincutils/issues/8.
-      self.parser.rebase_from_path(src_analysis, tmp_analysis_file1,
-                                   self._PANTS_WORKDIR_PLACEHOLDER, self._pants_workdir)
-      self.parser.rebase_from_path(tmp_analysis_file1, tmp_analysis_file2,
-                                   self._PANTS_BUILDROOT_PLACEHOLDER, self._pants_buildroot)
+      self._rebase_from_path(src_analysis, tmp_analysis_file,
+                             [(self._PANTS_WORKDIR_PLACEHOLDER, self._pants_workdir),
+                              (self._PANTS_BUILDROOT_PLACEHOLDER, self._pants_buildroot)])
 
-      shutil.move(tmp_analysis_file2, localized_analysis)
+      shutil.move(tmp_analysis_file, localized_analysis)
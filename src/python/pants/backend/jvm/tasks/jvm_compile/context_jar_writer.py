@@ -0,0 +1,176 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+
+from pants.base.hash_utils import hash_file
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import fast_relpath, safe_concurrent_create, safe_delete, safe_walk
+
+
+class ContextJarWriter(object):
+  """Writes the classes directories of compile contexts to their jars, rewriting only what changed.
+
+  Next to each jar it writes, the writer saves an index of the jar's entries, recording the digest
+  of each entry's file content when it was jarred: a class recompiled to the same size within the
+  filesystem's mtime granularity still differs in content.  When the jar is written again after an
+  incremental compile, the classes directory is diffed against that index: if classes were only
+  added, they're appended to the jar in place; if any were changed or deleted, the jar is rebuilt,
+  but the entries of unchanged classes are copied across from the old jar rather than read from
+  the classes directory again.  Either way, a jar with no changes is left untouched.
+
+  The index also serves the names in the jar, so that readers needn't re-scan the zip.
+
+  Safe to use from multiple threads, so long as each jar is only written by one at a time.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._names = {}  # jar file -> (jar stamp, names).
+
+  def write(self, jar_file, classes_dir):
+    """Updates jar_file to hold exactly the directories and files under classes_dir.
+
+    :param string jar_file: The jar to write.
+    :param string classes_dir: The directory to jar.
+    :returns: The names of the entries in the jar.
+    :rtype: list of string
+    """
+    entries = list(self._walk(classes_dir))
+    index = self._read_index(jar_file)
+
+    if index is None:
+      self._rewrite(jar_file, entries, unchanged=frozenset())
+    else:
+      unchanged = {name for name, _, stamp in entries if index.get(name, False) == stamp}
+      if len(unchanged) < len(index):
+        # Entries were changed or deleted.
+        self._rewrite(jar_file, entries, unchanged)
+      elif len(unchanged) < len(entries):
+        self._append(jar_file, [entry for entry in entries if entry[0] not in unchanged])
+
+    return self._write_index(jar_file, entries)
+
+  def names(self, jar_file):
+    """Returns the names of the entries in the given jar, as `ZipFile.namelist` would.
+
+    :param string jar_file: The jar to list.
+    :rtype: list of string
+    """
+    stamp = self._stamp(jar_file)
+    with self._lock:
+      names = self._names.get(jar_file)
+    if names is not None and names[0] == stamp:
+      return names[1]
+
+    index = self._read_index(jar_file, stamp)
+    if index is not None:
+      names = list(index)
+    else:
+      with open_zip(jar_file, mode='r') as jar:
+        names = jar.namelist()
+    with self._lock:
+      self._names[jar_file] = (stamp, names)
+    return names
+
+  @staticmethod
+  def _index_file(jar_file):
+    return '{}.index'.format(jar_file)
+
+  @staticmethod
+  def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime]
+
+  @classmethod
+  def _walk(cls, classes_dir):
+    """Yields (name, path, stamp) for each directory and file to jar, in jarring order.
+
+    Files are stamped with the digest of their content.  Directories are named with a trailing
+    slash, as in a zip, and have no stamp: their entries have no content to go stale.
+    """
+    for abs_sub_dir, dirnames, filenames in safe_walk(classes_dir):
+      for dirname in dirnames:
+        path = os.path.join(abs_sub_dir, dirname)
+        yield '{}/'.format(fast_relpath(path, classes_dir)), path, None
+      for filename in filenames:
+        path = os.path.join(abs_sub_dir, filename)
+        yield fast_relpath(path, classes_dir), path, hash_file(path)
+
+  def _read_index(self, jar_file, jar_stamp=None):
+    """Returns an ordered map of the jar's entry names to stamps, or None if it has no valid index.
+
+    An index is only valid for the jar it was written with: if the jar has been changed or
+    replaced since, its entries are unknown.
+    """
+    try:
+      with open(self._index_file(jar_file), 'rb') as fp:
+        index = json.load(fp)
+      if index['jar'] != (jar_stamp or self._stamp(jar_file)):
+        return None
+      return OrderedDict(index['entries'])
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+      return None
+
+  def _write_index(self, jar_file, entries):
+    jar_stamp = self._stamp(jar_file)
+    index = {
+      'jar': jar_stamp,
+      'entries': [[name, stamp] for name, _, stamp in entries],
+    }
+
+    def write_index(path):
+      with open(path, 'wb') as fp:
+        json.dump(index, fp)
+
+    # Write the index to a temporary file and rename it into place, so that a failure part way
+    # through can't leave behind an index that doesn't match the jar.
+    safe_concurrent_create(write_index, self._index_file(jar_file))
+    names = [name for name, _, _ in entries]
+    with self._lock:
+      self._names[jar_file] = (jar_stamp, names)
+    return names
+
+  @staticmethod
+  def _open_jar(jar_file, mode):
+    return open_zip(jar_file, mode=mode, compression=zipfile.ZIP_STORED)
+
+  def _append(self, jar_file, entries):
+    with self._open_jar(jar_file, mode='a') as jar:
+      for name, path, _ in entries:
+        jar.write(path, name)
+
+  def _rewrite(self, jar_file, entries, unchanged):
+    # Build the new jar alongside the old one, to copy unchanged entries from it, and then replace
+    # it: so a failure part way through leaves the old jar and its still-valid index in place.
+    tmp_jar_file = '{}.tmp'.format(jar_file)
+    with self._open_jar(tmp_jar_file, mode='w') as jar:
+      if unchanged:
+        with self._open_jar(jar_file, mode='r') as old_jar:
+          self._write_entries(jar, entries, unchanged, old_jar)
+      else:
+        self._write_entries(jar, entries, unchanged, None)
+    # Invalidate the index before replacing the jar it describes.
+    safe_delete(self._index_file(jar_file))
+    os.rename(tmp_jar_file, jar_file)
+
+  @staticmethod
+  def _write_entries(jar, entries, unchanged, old_jar):
+    for name, path, _ in entries:
+      if name in unchanged:
+        old_info = old_jar.getinfo(name)
+        info = zipfile.ZipInfo(name, old_info.date_time)
+        info.external_attr = old_info.external_attr
+        info.compress_type = zipfile.ZIP_STORED
+        jar.writestr(info, old_jar.read(old_info))
+      else:
+        jar.write(path, name)
+
@@ -15,13 +15,15 @@ from pants.backend.jvm.subsystems.java import Java
 from pants.backend.jvm.subsystems.jvm_platform import JvmPlatform
 from pants.backend.jvm.subsystems.scala_platform import ScalaPlatform
 from pants.backend.jvm.targets.jar_library import JarLibrary
+from pants.backend.jvm.tasks.classpath_products import MemoizedClasspaths
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
+from pants.backend.jvm.tasks.jvm_compile.analysis_index import AnalysisIndex
 from pants.backend.jvm.tasks.jvm_compile.compile_context import CompileContext
-from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
-                                                                 Job)
+from pants.backend.jvm.tasks.jvm_compile.context_jar_writer import ContextJarWriter
 from pants.backend.jvm.tasks.nailgun_task import NailgunTaskBase
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
+from pants.base.execution_graph import ExecutionFailure, ExecutionGraph, Job, reduced_dependencies
 from pants.base.fingerprint_strategy import TaskIdentityFingerprintStrategy
 from pants.base.worker_pool import WorkerPool
 from pants.base.workunit import WorkUnitLabel
@@ -30,8 +32,9 @@ from pants.build_graph.target import Target
 from pants.goal.products import MultipleRootedProducts
 from pants.option.custom_types import list_option
 from pants.reporting.reporting_utils import items_to_report_element
-from pants.util.dirutil import fast_relpath, safe_delete, safe_mkdir, safe_walk
+from pants.util.dirutil import safe_delete, safe_mkdir
 from pants.util.fileutil import create_size_estimators
+from pants.util.memo import memoized_property
 
 
 class ResolvedJarAwareTaskIdentityFingerprintStrategy(TaskIdentityFingerprintStrategy):
@@ -140,6 +143,15 @@ class JvmCompile(NailgunTaskBase):
              fingerprint=True,
              help='Capture compilation output to per-target logs.')
 
+    register('--persist-analysis-index', advanced=True, action='store_true', default=False,
+             help='Save the products and dependencies parsed from each analysis file under the '
+                  'workdir, so later runs needn\'t parse the analyses of unchanged targets again. '
+                  'There is one entry per analysis file path and kind of data parsed, recording '
+                  'the file\'s inode, size, mtime and content digest. An entry is used as is while '
+                  'the inode, size and mtime match, and once they don\'t, only if the file\'s '
+                  'digest still does; otherwise it is stale, so the analysis is parsed again and '
+                  'the entry overwritten.')
+
   @classmethod
   def prepare(cls, options, round_manager):
     super(JvmCompile, cls).prepare(options, round_manager)
@@ -294,10 +306,19 @@ class JvmCompile(NailgunTaskBase):
 
     self._analysis_tools = self.create_analysis_tools()
 
+    self._context_jar_writer = ContextJarWriter()
+
   @property
   def _analysis_parser(self):
     return self._analysis_tools.parser
 
+  @memoized_property
+  def _analysis_index(self):
+    cache_dir = None
+    if self.get_options().persist_analysis_index:
+      cache_dir = os.path.join(self.workdir, 'analysis-index')
+    return AnalysisIndex(self._analysis_parser, cache_dir=cache_dir)
+
   def _fingerprint_strategy(self, classpath_products):
     return ResolvedJarAwareTaskIdentityFingerprintStrategy(self, classpath_products)
 
@@ -394,14 +415,16 @@ class JvmCompile(NailgunTaskBase):
       safe_mkdir(cc.classes_dir)
       self.validate_analysis(cc.analysis_file)
 
-    # Get the classpath generated by upstream JVM tasks and our own prepare_compile().
+    # Get the classpath generated by upstream JVM tasks and our own prepare_compile().  It doesn't
+    # change while the chunk compiles, so the classpaths of the jobs can share their work.
     classpath_products = self.context.products.get_data('runtime_classpath')
+    classpaths = MemoizedClasspaths(classpath_products, self._confs)
 
     extra_compile_time_classpath = self._compute_extra_classpath(
         extra_compile_time_classpath_elements)
 
     # Now create compile jobs for each invalid target one by one.
-    jobs = self._create_compile_jobs(classpath_products,
+    jobs = self._create_compile_jobs(classpaths,
                                      compile_contexts,
                                      extra_compile_time_classpath,
                                      invalid_targets,
@@ -483,18 +506,17 @@ class JvmCompile(NailgunTaskBase):
     # Build a mapping of srcs to classes for each context.
     classes_by_src_by_context = defaultdict(dict)
     for compile_context in compile_contexts:
-      # Walk the context's jar to build a set of unclaimed classfiles.
+      # List the context's jar to build a set of unclaimed classfiles.
       unclaimed_classes = set()
-      with compile_context.open_jar(mode='r') as jar:
-        for name in jar.namelist():
-          if not name.endswith('/'):
-            unclaimed_classes.add(os.path.join(compile_context.classes_dir, name))
+      for name in self._context_jar_writer.names(compile_context.jar_file):
+        if not name.endswith('/'):
+          unclaimed_classes.add(os.path.join(compile_context.classes_dir, name))
 
       # Grab the analysis' view of which classfiles were generated.
       classes_by_src = classes_by_src_by_context[compile_context]
       if os.path.exists(compile_context.analysis_file):
-        products = self._analysis_parser.parse_products_from_path(compile_context.analysis_file,
-                                                                  compile_context.classes_dir)
+        products = self._analysis_index.products(compile_context.analysis_file,
+                                                 compile_context.classes_dir)
         for src, classes in products.items():
           relsrc = os.path.relpath(src, buildroot)
           classes_by_src[relsrc] = classes
@@ -529,7 +551,7 @@ class JvmCompile(NailgunTaskBase):
     if product_deps_by_src is not None:
       for compile_context in compile_contexts:
         product_deps_by_src[compile_context.target] = \
-            self._analysis_parser.parse_deps_from_path(compile_context.analysis_file)
+            self._analysis_index.deps(compile_context.analysis_file)
 
   def _compute_strict_dependencies(self, target):
     """Compute the 'strict' compile target dependencies for the given target.
@@ -553,21 +575,22 @@ class JvmCompile(NailgunTaskBase):
       yield dep
 
   def _compute_classpath_entries(self,
-                                 classpath_products,
+                                 classpaths,
                                  compile_context,
                                  extra_compile_time_classpath):
     # Generate a classpath specific to this compile and target.
     target = compile_context.target
     if compile_context.strict_deps:
       classpath_targets = list(self._compute_strict_dependencies(target))
-      pruned = [t.address.spec for t in target.closure(bfs=True) if t not in classpath_targets]
+      pruned = [t.address.spec for t in classpaths.closure(target) if t not in classpath_targets]
       self.context.log.debug(
           'Using strict classpath for {}, which prunes the following dependencies: {}'.format(
             target.address.spec, pruned))
     else:
-      classpath_targets = target.closure(bfs=True)
-    return ClasspathUtil.compute_classpath(classpath_targets, classpath_products,
-                                           extra_compile_time_classpath, self._confs)
+      classpath_targets = None
+    return classpaths.classpath(target,
+                                classpath_targets=classpath_targets,
+                                extra_classpath_tuples=extra_compile_time_classpath)
 
   def _upstream_analysis(self, compile_contexts, classpath_entries):
     """Returns tuples of classes_dir->analysis_file for the closure of the target."""
@@ -587,7 +610,7 @@ class JvmCompile(NailgunTaskBase):
   def exec_graph_key_for_target(self, compile_target):
     return "compile({})".format(compile_target.address.spec)
 
-  def _create_compile_jobs(self, classpath_products, compile_contexts, extra_compile_time_classpath,
+  def _create_compile_jobs(self, classpaths, compile_contexts, extra_compile_time_classpath,
                            invalid_targets, invalid_vts_partitioned):
     class Counter(object):
       def __init__(self, size, initial=0):
@@ -643,7 +666,7 @@ class JvmCompile(NailgunTaskBase):
 
       if not hit_cache:
         # Compute the compile classpath for this target.
-        cp_entries = self._compute_classpath_entries(classpath_products,
+        cp_entries = self._compute_classpath_entries(classpaths,
                                                      compile_context,
                                                      extra_compile_time_classpath)
         # TODO: always provide transitive analysis, but not always all classpath entries?
@@ -685,18 +708,21 @@ class JvmCompile(NailgunTaskBase):
       # Update the products with the latest classes.
       self._register_vts([compile_context])
 
+    # Each target must wait for the invalid targets in its closure, but it's enough to wait on the
+    # nearest of them, and only on those that no other nearest one depends on.
+    invalid_dependencies_by_target = reduced_dependencies(invalid_targets,
+                                                          lambda t: t.dependencies)
+
     jobs = []
-    invalid_target_set = set(invalid_targets)
     for vts in invalid_vts_partitioned:
       assert len(vts.targets) == 1, ("Requested one target per partition, got {}".format(vts))
 
       # Invalidated targets are a subset of relevant targets: get the context for this one.
       compile_target = vts.targets[0]
       compile_context = compile_contexts[compile_target]
-      compile_target_closure = compile_target.closure()
 
       # dependencies of the current target which are invalid for this chunk
-      invalid_dependencies = (compile_target_closure & invalid_target_set) - [compile_target]
+      invalid_dependencies = invalid_dependencies_by_target[compile_target]
 
       jobs.append(Job(self.exec_graph_key_for_target(compile_target),
                       functools.partial(work_for_vts, vts, compile_context),
@@ -715,14 +741,10 @@ class JvmCompile(NailgunTaskBase):
     allow the jars to be used as compile _inputs_ as well. Currently using jar'd compile outputs as
     compile inputs would make the compiler's analysis useless.
       see https://github.com/twitter-forks/sbt/tree/stuhood/output-jars
+
+    After an incremental compile, only the entries of classes that changed are rewritten.
     """
-    root = compile_context.classes_dir
-    with compile_context.open_jar(mode='w') as jar:
-      for abs_sub_dir, dirnames, filenames in safe_walk(root):
-        for name in dirnames + filenames:
-          abs_filename = os.path.join(abs_sub_dir, name)
-          arcname = fast_relpath(abs_filename, root)
-          jar.write(abs_filename, arcname)
+    self._context_jar_writer.write(compile_context.jar_file, compile_context.classes_dir)
 
   def validate_analysis(self, path):
     """Throws a TaskError for invalid analysis files."""
@@ -13,7 +13,7 @@ from pants.base.exceptions import TaskError
 from pants.java import util
 from pants.java.distribution.distribution import DistributionLocator
 from pants.java.executor import SubprocessExecutor
-from pants.java.nailgun_executor import NailgunExecutor, NailgunProcessGroup
+from pants.java.nailgun_executor import NailgunExecutor, NailgunExecutorPool, NailgunProcessGroup
 from pants.task.task import Task, TaskBase
 
 
@@ -29,6 +29,13 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
              help='Timeout (secs) for nailgun startup.')
     register('--nailgun-connect-attempts', advanced=True, default=5,
              help='Max attempts for nailgun connects.')
+    register('--nailgun-pool-size', advanced=True, type=int, default=0,
+             help='Run this many nailgun servers per classpath and jvm options fingerprint, '
+                  'dispatching each run to the least loaded server. If 0, a single nailgun server '
+                  'is used and restarted whenever the fingerprint changes.')
+    register('--nailgun-pool-fingerprints', advanced=True, type=int, default=2,
+             help='When using a nailgun pool, keep servers alive for this many fingerprints, '
+                  'retiring those of the least recently used fingerprint first.')
     cls.register_jvm_tool(register,
                           'nailgun-server',
                           classpath=[
@@ -66,6 +73,15 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     """
     if self.get_options().use_nailgun:
       classpath = os.pathsep.join(self.tool_classpath('nailgun-server'))
+      if self.get_options().nailgun_pool_size > 0:
+        return NailgunExecutorPool(self._identity,
+                                   self._executor_workdir,
+                                   classpath,
+                                   self._dist,
+                                   pool_size=self.get_options().nailgun_pool_size,
+                                   max_fingerprints=self.get_options().nailgun_pool_fingerprints,
+                                   connect_timeout=self.get_options().nailgun_timeout_seconds,
+                                   connect_attempts=self.get_options().nailgun_connect_attempts)
       return NailgunExecutor(self._identity,
                              self._executor_workdir,
                              classpath,
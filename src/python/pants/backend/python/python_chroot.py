@@ -88,6 +88,11 @@ class PythonChroot(object):
     self._key_generator = CacheKeyGenerator()
     self._build_invalidator = BuildInvalidator(self._artifact_cache_root)
 
+  @property
+  def interpreter(self):
+    """The interpreter this chroot is built for."""
+    return self._interpreter
+
   def delete(self):
     """Deletes this chroot from disk if it has been dumped."""
     safe_rmtree(self.path())
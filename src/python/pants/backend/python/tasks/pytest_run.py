@@ -23,6 +23,7 @@ from six.moves import configparser
 from pants.backend.python.python_requirement import PythonRequirement
 from pants.backend.python.python_setup import PythonRepos, PythonSetup
 from pants.backend.python.targets.python_tests import PythonTests
+from pants.backend.python.tasks.pytest_worker import PytestWorker
 from pants.backend.python.tasks.python_task import PythonTask
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError, TestFailedTaskError
@@ -116,6 +117,16 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
     register('--shard',
              help='Subset of tests to run, in the form M/N, 0 <= M < N. For example, 1/3 means '
                   'run tests number 2, 5, 8, 11, ...')
+    register('--workers', action='store_true', default=False, advanced=True,
+             help='Run tests in pytest worker processes. A worker keeps pytest and the third '
+                  'party requirements of the test pex imported and forks a fresh child for each '
+                  'test run, saving interpreter startup and import time. Test pexes with the same '
+                  'interpreter and requirements share a worker, and workers are shut down once all '
+                  'tests have run. Not used with --profile or when passing --pdb, which need a '
+                  'directly spawned pytest process.')
+    register('--worker-idle-timeout', type=int, default=600, advanced=True,
+             help='Seconds a pytest worker may sit idle before exiting, should pants fail to shut '
+                  'it down; 0 to never exit.')
 
   @classmethod
   def supports_passthru_args(cls):
@@ -123,6 +134,7 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
 
   def __init__(self, *args, **kwargs):
     super(PytestRun, self).__init__(*args, **kwargs)
+    self._workers = {}
 
   def _test_target_filter(self):
     def target_filter(target):
@@ -145,7 +157,10 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
         # into thinking the terminal window is narrower than it is.
         cols = os.environ.get('COLUMNS', 80)
         with environment_as(COLUMNS=str(int(cols) - 30)):
-          self.run_tests(test_targets, workunit)
+          try:
+            self.run_tests(test_targets, workunit)
+          finally:
+            self._terminate_workers()
 
   def run_tests(self, targets, workunit):
     if self.get_options().fast:
@@ -442,9 +457,34 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
                                             chroot.path(),
                                             pex,
                                             workunit) as coverage_args:
-          yield pex, shard_args + junit_args + coverage_args
+          yield pex, chroot, shard_args + junit_args + coverage_args
+
+  def _use_worker(self, args):
+    if not self.get_options().workers:
+      return False
+    # Profiling is set up by the pex runtime at process start and --pdb needs our stdin, so both
+    # require a directly spawned pytest process.
+    return not self.get_options().profile and '--pdb' not in args
+
+  def _worker_for(self, chroot):
+    fingerprint = PytestWorker.fingerprint_chroot(chroot)
+    worker = self._workers.get(fingerprint)
+    if worker is None:
+      worker = PytestWorker(chroot,
+                            workdir=os.path.join(self.workdir, 'workers', fingerprint),
+                            idle_timeout=self.get_options().worker_idle_timeout)
+      self._workers[fingerprint] = worker
+    return worker
+
+  def _terminate_workers(self):
+    for worker in self._workers.values():
+      try:
+        worker.terminate()
+      except PytestWorker.NonResponsiveProcess as e:
+        self.context.log.warn('Failed to terminate {}: {}'.format(worker, e))
+    self._workers.clear()
 
-  def _do_run_tests_with_args(self, pex, workunit, args):
+  def _do_run_tests_with_args(self, pex, workunit, args, chroot=None):
     try:
       # The pytest runner we use accepts a --pdb argument that will launch an interactive pdb
       # session on any test failure.  In order to support use of this pass-through flag we must
@@ -458,7 +498,8 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
       if profile:
         env['PEX_PROFILE_FILENAME'] = '{0}.subprocess.{1:.6f}'.format(profile, time.time())
       with environment_as(**env):
-        rc = self._spawn_and_wait(pex, workunit, args=args, setsid=True)
+        rc = self._spawn_and_wait(pex, workunit, args=args, setsid=True,
+                                  chroot=chroot if self._use_worker(args) else None)
         return PythonTestResult.rc(rc)
     except TestFailedTaskError:
       # _spawn_and_wait wraps the test runner in a timeout, so it could
@@ -518,10 +559,10 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
     if not sources:
       return PythonTestResult.rc(0)
 
-    with self._test_runner(targets, workunit) as (pex, test_args):
+    with self._test_runner(targets, workunit) as (pex, chroot, test_args):
 
       def run_and_analyze(resultlog_path):
-        result = self._do_run_tests_with_args(pex, workunit, args)
+        result = self._do_run_tests_with_args(pex, workunit, args, chroot=chroot)
         failed_targets = self._get_failed_targets_from_resultlogs(resultlog_path, targets)
         return result.with_failed_targets(failed_targets)
 
@@ -552,7 +593,17 @@ class PytestRun(TestRunnerTaskMixin, PythonTask):
     process = self._spawn(pex, workunit, args, setsid=False)
     return process.wait()
 
-  def _spawn(self, pex, workunit, args, setsid=False):
+  def _spawn(self, pex, workunit, args, setsid=False, chroot=None):
+    # When handed the chroot the pex was built from, run via a pytest worker for that chroot.
+    if chroot is not None:
+      try:
+        return self._worker_for(chroot).submit(args,
+                                               chroot=chroot.path(),
+                                               stdout=workunit.output('stdout'),
+                                               stderr=workunit.output('stderr'))
+      except PytestWorker.Error as e:
+        self.context.log.warn('Falling back to spawning pytest directly: {}'.format(e))
+
     # NB: We don't use pex.run(...) here since it makes a point of running in a clean environment,
     # scrubbing all `PEX_*` environment overrides and we use overrides when running pexes in this
     # task.
@@ -0,0 +1,376 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import select
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from textwrap import dedent
+
+from pex.pex_info import PexInfo
+
+from pants.pantsd.process_manager import ProcessManager
+from pants.util.contextutil import environment_as
+from pants.util.dirutil import safe_delete, safe_file_dump, safe_mkdir, safe_open
+from pants.util.process_handler import ProcessHandler
+
+
+logger = logging.getLogger(__name__)
+
+
+# The worker runs inside the test pex via `PEX_INTERPRETER=1`, so it can only rely on the stdlib,
+# pytest and the pex's own requirements - in particular it cannot import pants.
+_WORKER_MAIN = dedent("""
+  import json
+  import os
+  import socket
+  import sys
+  import traceback
+
+
+  def preload():
+    # Importing pytest and the top level modules of every requirement in the pex is the whole
+    # point of the worker: forked children inherit these modules already initialized.
+    import pytest
+    try:
+      import pkg_resources
+    except ImportError:
+      return
+    for dist in list(pkg_resources.working_set):
+      if dist.has_metadata('top_level.txt'):
+        for module in dist.get_metadata_lines('top_level.txt'):
+          try:
+            __import__(module)
+          except Exception:
+            pass
+
+
+  def redirect(fd, path, flags):
+    target = os.open(path, flags, 0o644)
+    os.dup2(target, fd)
+    os.close(target)
+
+
+  def run_batch(server, worker_chroot, request):
+    server.close()
+    os.setpgid(0, 0)
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+
+    # The worker may have been spawned from an older chroot with the same requirements; point
+    # sys.path at the chroot holding the sources under test.
+    sys.path[:] = [request['chroot'] if entry == worker_chroot else entry for entry in sys.path]
+    pythonpath = [entry for entry in os.environ.get('PYTHONPATH', '').split(os.pathsep) if entry]
+    sys.path[:0] = [entry for entry in pythonpath if entry not in sys.path]
+
+    redirect(0, os.devnull, os.O_RDONLY)
+    redirect(1, request['stdout'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    redirect(2, request['stderr'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+
+    import pytest
+    sys.argv = ['pytest'] + request['args']
+    return pytest.main(request['args'])
+
+
+  def send(conn, message):
+    conn.sendall((json.dumps(message) + '\\n').encode('utf-8'))
+
+
+  def handle(server, worker_chroot, conn):
+    request = json.loads(conn.makefile('rb').readline().decode('utf-8'))
+    pid = os.fork()
+    if pid == 0:
+      rc = 1
+      try:
+        rc = run_batch(server, worker_chroot, request)
+      except SystemExit as e:
+        rc = e.code if isinstance(e.code, int) else int(e.code is not None)
+      except BaseException:
+        traceback.print_exc()
+      finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(rc or 0)
+
+    # Put the child in its own process group from both sides of the fork so the client can
+    # signal the whole batch as soon as it learns the pid.
+    try:
+      os.setpgid(pid, pid)
+    except OSError:
+      pass
+    send(conn, {'pid': pid})
+    _, status = os.waitpid(pid, 0)
+    rc = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    send(conn, {'rc': rc})
+
+
+  def main(fingerprint, worker_chroot, idle_timeout):
+    preload()
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('127.0.0.1', 0))
+    server.listen(16)
+    if idle_timeout > 0:
+      server.settimeout(idle_timeout)
+
+    sys.stdout.write('pytest worker {} started on port {}.\\n'
+                     .format(fingerprint, server.getsockname()[1]))
+    sys.stdout.flush()
+
+    while True:
+      try:
+        conn, _ = server.accept()
+      except socket.timeout:
+        return
+      try:
+        conn.settimeout(None)
+        handle(server, worker_chroot, conn)
+      except Exception:
+        traceback.print_exc()
+      finally:
+        conn.close()
+
+
+  main(sys.argv[1], sys.argv[2], float(sys.argv[3]))
+""")
+
+
+class PytestWorkerProcessHandler(ProcessHandler):
+  """A `ProcessHandler` for a single test batch running in a forked pytest worker child.
+
+  The batch's stdout and stderr are captured to files by the child and copied to the given
+  streams as they grow while the batch runs.
+  """
+
+  # How often to copy new batch output to the streams while waiting for the batch to complete.
+  _POLL_INTERVAL = 0.1
+
+  def __init__(self, sock, stdout_path, stderr_path, stdout=None, stderr=None):
+    self._sock = sock
+    # NB: Unbuffered, so that a response is never held in a buffer `select` can't see.
+    self._responses = sock.makefile('rb', 0)
+    self._outputs = [(path, io.open(path, 'rb'), stream)
+                     for path, stream in ((stdout_path, stdout), (stderr_path, stderr))]
+    self._pid = None
+    self._rc = None
+
+  def _read_response(self, key):
+    line = self._responses.readline()
+    if not line:
+      raise PytestWorker.Error('Lost connection to pytest worker awaiting {}.'.format(key))
+    return json.loads(line.decode('utf-8'))[key]
+
+  @property
+  def pid(self):
+    """The pid of the forked child running this batch."""
+    if self._pid is None:
+      self._pid = self._read_response('pid')
+    return self._pid
+
+  def wait(self):
+    if self._rc is None:
+      try:
+        self.pid
+        while not select.select([self._sock], [], [], self._POLL_INTERVAL)[0]:
+          self._copy_output()
+        self._rc = self._read_response('rc')
+      finally:
+        self._sock.close()
+        self._copy_output()
+        for path, fp, _ in self._outputs:
+          fp.close()
+          safe_delete(path)
+    return self._rc
+
+  def _copy_output(self):
+    for _, fp, stream in self._outputs:
+      if not fp.closed:
+        data = fp.read()
+        if data and stream is not None:
+          stream.write(data)
+
+  def _signal(self, sig):
+    # NB: This is called from the timeout thread while `wait` blocks, so only signal a child whose
+    # pid `wait` has already read.
+    if self._rc is None and self._pid is not None:
+      try:
+        # The child leads its own process group, so kill any processes the tests spawned too.
+        os.killpg(self._pid, sig)
+      except OSError as e:
+        logger.debug('Failed to signal pytest worker child {}: {}'.format(self._pid, e))
+
+  def kill(self):
+    self._signal(signal.SIGKILL)
+
+  def terminate(self):
+    self._signal(signal.SIGTERM)
+
+
+class PytestWorker(ProcessManager):
+  """Runs pytest batches in a long-lived worker launched from a test pex.
+
+  The worker process keeps pytest and the pex's third party requirements imported and forks a
+  fresh child per batch for isolation, much like a nailgun server does for jvm tools. Workers are
+  identified by the interpreter and requirement distributions of the chroot they were launched
+  from, so test chroots that differ only in first party sources share a worker. An idle worker exits on
+  its own after `idle_timeout` seconds.
+  """
+
+  class Error(Exception):
+    """Indicates a problem starting or communicating with a pytest worker."""
+
+  # 'pytest worker 3c5a... started on port 53785.'
+  _WORKER_PORT_REGEX = re.compile(r'.*\s+port\s+(\d+)\.$')
+
+  _SPAWN_LOCK = threading.Lock()
+  _SELECT_WAIT = 1
+
+  @staticmethod
+  def fingerprint_chroot(chroot):
+    """Compute the worker fingerprint for the given test chroot.
+
+    :param chroot: The chroot tests will be run from.
+    :type chroot: :class:`pants.backend.python.python_chroot.PythonChroot`
+    :returns: A hexstring identifying the interpreter and requirements of the chroot.
+    """
+    digest = hashlib.sha1()
+    digest.update(str(chroot.interpreter.identity).encode('utf-8'))
+    pex_info = PexInfo.from_pex(chroot.path())
+    for dist, dist_hash in sorted(pex_info.distributions.items()):
+      digest.update('{}={}'.format(dist, dist_hash).encode('utf-8'))
+    return digest.hexdigest()
+
+  def __init__(self, chroot, workdir, idle_timeout=600, connect_timeout=30):
+    """
+    :param chroot: The test chroot to launch the worker from.
+    :type chroot: :class:`pants.backend.python.python_chroot.PythonChroot`
+    :param string workdir: A directory to hold the worker's own stdout and stderr.
+    :param float idle_timeout: Seconds of inactivity after which the worker exits; 0 to never exit.
+    :param float connect_timeout: Seconds to wait for a freshly spawned worker to start listening.
+    """
+    self._pex = chroot.pex()
+    self._pex_path = chroot.path()
+    self._fingerprint = self.fingerprint_chroot(chroot)
+    super(PytestWorker, self).__init__(name='pytest_worker_{}'.format(self._fingerprint[:16]))
+    self._workdir = workdir
+    self._worker_stdout = os.path.join(workdir, 'stdout')
+    self._worker_stderr = os.path.join(workdir, 'stderr')
+    self._idle_timeout = idle_timeout
+    self._connect_timeout = connect_timeout
+
+  def __str__(self):
+    return 'PytestWorker({name}, pid={pid} socket={socket})'.format(
+      name=self.name, pid=self.pid, socket=self.socket)
+
+  @property
+  def fingerprint(self):
+    return self._fingerprint
+
+  def _is_running(self):
+    # The fingerprint is passed as the first worker argument so we can detect stale pids. We match
+    # on substrings since preloaded modules (setproctitle, for one) may rewrite the process argv.
+    cmdline = self.cmdline or []
+    return (self.is_alive() and any(self._fingerprint in arg for arg in cmdline) and
+            bool(self.socket))
+
+  def ensure_running(self):
+    """Starts the worker if it is not already running."""
+    with self._SPAWN_LOCK:
+      if not self._is_running():
+        if self.is_alive():
+          self.terminate()
+        self._spawn_worker()
+
+  def _spawn_worker(self):
+    safe_mkdir(self._workdir)
+    safe_file_dump(self._worker_stdout, '')
+    safe_file_dump(self._worker_stderr, '')
+    main = os.path.join(self._workdir, 'pytest_worker_main.py')
+    safe_file_dump(main, _WORKER_MAIN)
+
+    logger.debug('Spawning pytest worker {} from {}'.format(self.name, self._pex_path))
+    self.daemon_spawn(post_fork_child_opts=dict(main=main))
+    self.await_pid(self._connect_timeout)
+    self.write_socket(self._await_port(self._connect_timeout))
+    # Drop any cached handle on a previous worker process so liveness checks see the new one.
+    self._process = None
+    logger.debug('Spawned {}'.format(self))
+
+  def _await_port(self, timeout):
+    """Blocks for the worker to bind and emit a listening port in its stdout."""
+    with safe_open(self._worker_stdout, 'r') as worker_stdout:
+      start_time = time.time()
+      while 1:
+        readable, _, _ = select.select([worker_stdout], [], [], self._SELECT_WAIT)
+        if readable:
+          line = worker_stdout.readline()
+          match = self._WORKER_PORT_REGEX.match(line.strip())
+          if match:
+            return match.group(1)
+
+        if (time.time() - start_time) > timeout:
+          raise self.Error('Failed to read pytest worker output after {} seconds! See {}'
+                           .format(timeout, self._worker_stderr))
+
+  def post_fork_child(self, main):
+    """Post-fork() child callback for ProcessManager.daemon_spawn()."""
+    with environment_as(PEX_INTERPRETER='1'):
+      cmdline = self._pex.cmdline([main, self._fingerprint, self._pex_path,
+                                   str(self._idle_timeout)])
+      subproc = subprocess.Popen(cmdline,
+                                 stdin=safe_open(os.devnull, 'r'),
+                                 stdout=safe_open(self._worker_stdout, 'w'),
+                                 stderr=safe_open(self._worker_stderr, 'w'),
+                                 close_fds=True)
+    self.write_pid(subproc.pid)
+
+  def submit(self, args, chroot=None, cwd=None, env=None, stdout=None, stderr=None):
+    """Submits a test batch to the worker, starting the worker if needed.
+
+    :param list args: The arguments to pass to `pytest.main`.
+    :param string chroot: The chroot holding the sources under test; defaults to the worker's pex.
+    :param string cwd: The working directory for the batch; defaults to the current directory.
+    :param dict env: The environment for the batch; defaults to the current environment.
+    :param stdout: An optional stream to copy the batch's stdout to.
+    :param stderr: An optional stream to copy the batch's stderr to.
+    :returns: A handler for the running batch.
+    :rtype: :class:`PytestWorkerProcessHandler`
+    """
+    self.ensure_running()
+
+    stdout_path = self._tempfile('stdout')
+    stderr_path = self._tempfile('stderr')
+    request = dict(args=list(args),
+                   chroot=chroot or self._pex_path,
+                   cwd=cwd or os.getcwd(),
+                   env=dict(os.environ if env is None else env),
+                   stdout=stdout_path,
+                   stderr=stderr_path)
+    try:
+      sock = socket.create_connection(('127.0.0.1', self.socket), self._connect_timeout)
+      sock.settimeout(None)
+      sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+    except (IOError, OSError) as e:
+      raise self.Error('Failed to submit batch to {}: {}'.format(self, e))
+    return PytestWorkerProcessHandler(sock, stdout_path, stderr_path, stdout=stdout, stderr=stderr)
+
+  def _tempfile(self, suffix):
+    safe_mkdir(self._workdir)
+    fd, path = tempfile.mkstemp(dir=self._workdir, suffix='.{}'.format(suffix))
+    os.close(fd)
+    return path
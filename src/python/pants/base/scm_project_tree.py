@@ -44,33 +44,9 @@ class ScmProjectTree(ProjectTree):
     return self._reader.exists(self._scm_relpath(relpath))
 
   def walk(self, relpath, topdown=True):
-    for path, dirnames, filenames in self._do_walk(self._scm_relpath(relpath), topdown=topdown):
+    for path, dirnames, filenames in self._reader.walk(self._scm_relpath(relpath), topdown=topdown):
       yield (os.path.relpath(os.path.join(self._scm_worktree, path), self.build_root), dirnames, filenames)
 
-  def _do_walk(self, scm_relpath, topdown):
-    """Helper method for _walk"""
-    if self._reader.isdir(scm_relpath):
-      filenames = []
-      dirnames = []
-      dirpaths = []
-      for filename in self._reader.listdir(scm_relpath):
-        path = os.path.join(scm_relpath, filename)
-        if self._reader.isdir(path):
-          dirnames.append(filename)
-          dirpaths.append(path)
-        else:
-          filenames.append(filename)
-
-      if topdown:
-        yield (scm_relpath, dirnames, filenames)
-
-      for dirpath in dirpaths:
-        for item in self._do_walk(dirpath, topdown=topdown):
-          yield item
-
-      if not topdown:
-        yield (scm_relpath, dirnames, filenames)
-
   def __eq__(self, other):
     return (
       (type(other) == type(self)) and
@@ -7,9 +7,11 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import collections
 import functools
+import heapq
 import multiprocessing
 import os
 from abc import abstractmethod
+from multiprocessing.pool import ThreadPool
 from Queue import Queue
 
 from twitter.common.collections.orderedset import OrderedSet
@@ -193,6 +195,92 @@ class FailSlowHelper(object):
     return maybe_fail_slow(executable, promise, plan, fail_slow=fail_slow)
 
 
+class ReadyQueue(object):
+  """Tracks which plans in an execution graph are ready to execute.
+
+  The graph is walked once up-front to count each plan's unsatisfied dependencies. A plan becomes
+  ready when that count drops to zero. Ready plans are served in priority order. When weighting by
+  critical path, the plans with the longest chain of dependees waiting on them go first. Otherwise
+  plans go in execution graph walk order.
+  """
+
+  def __init__(self, execution_graph, critical_path=True):
+    """
+    :param execution_graph: The execution graph to schedule.
+    :type execution_graph: :class:`pants.engine.exp.scheduler.ExecutionGraph`
+    :param bool critical_path: `True` to prioritize ready plans by the length of their longest chain
+                               of dependees.
+    """
+    self._nodes = []
+    self._node_by_promise = {}
+    self._dependees = []
+    self._pending = []
+    for promise, plan in execution_graph.walk():
+      index = len(self._nodes)
+      self._nodes.append((promise, plan))
+      # The walk is post-order, so all of a plan's dependencies have been indexed by now.
+      dependencies = set(self._node_by_promise[pr] for pr in plan.promises)
+      self._pending.append(len(dependencies))
+      self._dependees.append([])
+      for dependency in dependencies:
+        self._dependees[dependency].append(index)
+      self._node_by_promise[promise] = index
+      for subject in plan.subjects:
+        self._node_by_promise[promise.rebind(subject)] = index
+
+    self._weights = [1] * len(self._nodes)
+    if critical_path:
+      for index in reversed(range(len(self._nodes))):
+        dependees = self._dependees[index]
+        if dependees:
+          self._weights[index] = 1 + max(self._weights[dependee] for dependee in dependees)
+
+    self._done = set()
+    self._ready = []
+    for index, pending in enumerate(self._pending):
+      if pending == 0:
+        self._push(index)
+
+  def _push(self, index):
+    heapq.heappush(self._ready, (-self._weights[index], index))
+
+  def __len__(self):
+    """Return the number of plans not yet satisfied."""
+    return len(self._nodes) - len(self._done)
+
+  def has_ready(self):
+    """Return `True` if there is a plan ready to execute."""
+    return bool(self._ready)
+
+  def pop_ready(self):
+    """Remove and return the highest priority plan that is ready to execute.
+
+    :returns: A tuple of the promise the plan satisfies and the plan itself.
+    :rtype: tuple of (:class:`pants.engine.exp.scheduler.Promise`,
+                      :class:`pants.engine.exp.scheduler.Plan`)
+    """
+    _, index = heapq.heappop(self._ready)
+    return self._nodes[index]
+
+  def satisfy(self, promise):
+    """Mark the plan that produces the given promise as satisfied.
+
+    Any of the plan's dependees left with no unsatisfied dependencies become ready. Marking a plan
+    satisfied more than once, say via the promises for each of its subjects, is a no-op.
+
+    :param promise: A promise produced by an executed plan.
+    :type promise: :class:`pants.engine.exp.scheduler.Promise`
+    """
+    index = self._node_by_promise.get(promise)
+    if index is None or index in self._done:
+      return
+    self._done.add(index)
+    for dependee in self._dependees[index]:
+      self._pending[dependee] -= 1
+      if self._pending[dependee] == 0:
+        self._push(dependee)
+
+
 class Engine(AbstractClass):
   """An engine for running a pants command line."""
 
@@ -268,12 +356,43 @@ class Engine(AbstractClass):
       """
       return cls(error=error, root_products=None)
 
-  def __init__(self, local_scheduler):
+  _NOT_STORED = object()
+
+  def __init__(self, local_scheduler, product_store=None):
     """
     :param local_scheduler: The local scheduler for creating execution graphs.
     :type local_scheduler: :class:`pants.engine.exp.scheduler.LocalScheduler`
+    :param product_store: An optional store to memoize plan products in across runs.
+    :type product_store: :class:`pants.engine.exp.storage.ProductStore`
     """
     self._local_scheduler = local_scheduler
+    self._product_store = product_store
+
+  @property
+  def product_store(self):
+    """Return the store plan products are memoized in, if any.
+
+    :rtype: :class:`pants.engine.exp.storage.ProductStore`
+    """
+    return self._product_store
+
+  def _stored_product(self, plan, binding):
+    """Look up the product of the given bound plan in the product store.
+
+    :returns: A tuple of the plan's store key, which is `None` if the product can't be stored,
+              and the stored product, which is `Engine._NOT_STORED` if there is none.
+    """
+    if self._product_store is None:
+      return None, self._NOT_STORED
+    key = self._product_store.key_for(plan, binding)
+    if key is None:
+      return None, self._NOT_STORED
+    return key, self._product_store.get(key, self._NOT_STORED)
+
+  def _store_product(self, key, product):
+    # Failures are never memoized so that they are retried on the next run.
+    if key is not None and not isinstance(product, FailedToProduce):
+      self._product_store.put(key, product)
 
   def execute(self, build_request, fail_slow=False):
     """Executes the the requested build.
@@ -319,7 +438,10 @@ class LocalSerialEngine(FailSlowHelper, Engine):
         product = inputs
       else:
         binding = plan.bind(inputs)
-        product = self.safe_execute(binding.execute, promise, plan, fail_slow=fail_slow)
+        key, product = self._stored_product(plan, binding)
+        if product is self._NOT_STORED:
+          product = self.safe_execute(binding.execute, promise, plan, fail_slow=fail_slow)
+          self._store_product(key, product)
 
       # Index the product across all promises we made for it.
       for subject in plan.subjects:
@@ -366,33 +488,59 @@ def _execute_plan(func, promise, subjects, debug, *args, **kwargs):
   return result
 
 
-class LocalMultiprocessEngine(Engine):
-  """An engine that runs tasks locally and in parallel when possible using a process pool."""
+class LocalConcurrentEngine(Engine):
+  """An engine that runs tasks locally and in parallel when possible using worker pools.
 
-  def __init__(self, local_scheduler, pool_size=None, debug=False):
+  Plans are submitted to the pool chosen by `_pool_for` as soon as all of their inputs have been
+  produced.
+  """
+
+  def __init__(self, local_scheduler, pool_size=None, debug=False, product_store=None,
+               critical_path=True):
     """
     :param local_scheduler: The local scheduler for creating execution graphs.
     :type local_scheduler: :class:`pants.engine.exp.scheduler.LocalScheduler`
-    :param int pool_size: The number of worker processes to use; by default 1 process per core will
-                          be used.
+    :param int pool_size: The number of workers to use; by default 1 worker per core will be used.
     :param bool debug: `True` to turn on pickling error debug mode (slower); false by default.
+    :param product_store: An optional store to memoize plan products in across runs.
+    :type product_store: :class:`pants.engine.exp.storage.ProductStore`
+    :param bool critical_path: `True` to submit ready plans with the longest chains of dependees
+                               first; otherwise ready plans are submitted in walk order.
     """
-    super(LocalMultiprocessEngine, self).__init__(local_scheduler)
+    super(LocalConcurrentEngine, self).__init__(local_scheduler, product_store=product_store)
     self._pool_size = pool_size if pool_size and pool_size > 0 else multiprocessing.cpu_count()
-    self._pool = multiprocessing.Pool(self._pool_size)
     self._debug = debug
+    self._critical_path = critical_path
+
+  @property
+  def _capacity(self):
+    """Return the number of plans to keep in flight across all pools."""
+    return self._pool_size
+
+  @abstractmethod
+  def _pool_for(self, execution_graph, plan):
+    """Return the pool to execute the given plan on.
+
+    :returns: A tuple of the pool and `True` if plans executed on the pool must be picklable.
+    :rtype: tuple of (:class:`multiprocessing.pool.Pool`, bool)
+    """
+
+  @abstractmethod
+  def close(self):
+    """Shut down this engine's pools, waiting for any outstanding work to complete."""
 
   class Executor(FailSlowHelper):
-    def __init__(self, pool, pool_size, fail_slow=False, debug=False):
-      super(LocalMultiprocessEngine.Executor, self).__init__()
+    def __init__(self, engine, execution_graph, fail_slow=False, debug=False):
+      super(LocalConcurrentEngine.Executor, self).__init__()
 
-      self._pool = pool
-      self._pool_size = pool_size
+      self._engine = engine
+      self._execution_graph = execution_graph
       self._fail_slow = fail_slow
       self._debug = debug
 
       self._results = Queue()
       self._products_by_promise = {}
+      self._store_keys_by_promise = {}
 
     def submit(self, promise, plan):
       inputs = self.collect_inputs(self._products_by_promise, promise, plan)
@@ -401,7 +549,17 @@ class LocalMultiprocessEngine(Engine):
         result = (promise, plan.subjects, inputs)
         self._results.put(result)
       else:
-        func, args, kwargs = plan.bind(inputs)
+        binding = plan.bind(inputs)
+        key, product = self._engine._stored_product(plan, binding)
+        if product is not Engine._NOT_STORED:
+          self._results.put((promise, plan.subjects, product))
+          return
+        if key is not None:
+          self._store_keys_by_promise[promise] = key
+        func, args, kwargs = binding
+
+        pool, pickled = self._engine._pool_for(self._execution_graph, plan)
+        debug = self._debug and pickled
 
         # A no-arg callable that, when executed, produces the promised product.
         executable = functools.partial(func, *args, **kwargs)
@@ -420,11 +578,22 @@ class LocalMultiprocessEngine(Engine):
                                          maybe_fail_slow_executor,
                                          promise,
                                          plan.subjects,
-                                         self._debug)
+                                         debug)
 
-        if self._debug:
+        if debug:
           _try_pickle(execute_plan)
-        self._pool.apply_async(execute_plan, callback=self._results.put)
+        pool.apply_async(execute_plan, callback=functools.partial(self._put_result, promise, plan))
+
+    def _put_result(self, promise, plan, result):
+      # Re-associate the product with our own promise and plan; subjects need not survive the
+      # pickle round trip through a process pool equal to the originals, and if they don't the
+      # promises they satisfy would never be found.
+      if not isinstance(result, Exception):
+        _, _, product = result
+        if isinstance(product, FailedToProduce):
+          product = FailedToProduce(promise, plan, error=product.error)
+        result = (promise, plan.subjects, product)
+      self._results.put(result)
 
     def gather_one_result(self):
       results = self._results.get()
@@ -435,6 +604,7 @@ class LocalMultiprocessEngine(Engine):
         raise results
 
       promise, subjects, product = results
+      self._engine._store_product(self._store_keys_by_promise.pop(promise, None), product)
       for subject in subjects:
         promised = promise.rebind(subject)
         self._products_by_promise[promised] = product
@@ -444,49 +614,108 @@ class LocalMultiprocessEngine(Engine):
       return self.collect_root_outputs(self._products_by_promise, execution_graph)
 
   def reduce(self, execution_graph, fail_slow=False):
-    executor = self.Executor(self._pool, self._pool_size, fail_slow=fail_slow, debug=self._debug)
+    executor = self.Executor(self, execution_graph, fail_slow=fail_slow, debug=self._debug)
 
-    # ExecutionGraph nodes move from `pending_submission` to `in_flight` to `satisfied_promises`.
-    pending_submission = {}
-    in_flight = {}
-    satisfied_promises = set()
+    ready_queue = ReadyQueue(execution_graph, critical_path=self._critical_path)
 
-    def submit_satisfied_pending():
-      for promise, plan in pending_submission.items():
-        if plan.promises.issubset(satisfied_promises):
-          in_flight[promise] = pending_submission.pop(promise)
-          executor.submit(promise, plan)
-
-    def process_one_result():
-      # One result can satisfy many promises when a planner has scheduled bulk operations so index
+    # The main reduction loop:
+    # 1. Submit the highest priority ready plans until the pools are saturated.
+    # 2. Gather a single result to free up a processing slot, marking the promises it satisfies;
+    #    this may make more plans ready.
+    #
+    # Readiness is tracked by counting each plan's unsatisfied dependencies up front, so no step
+    # ever needs to rescan pending plans and full pools never block plans elsewhere in the graph
+    # that are ready to go.
+    in_flight = 0
+    while True:
+      while in_flight < self._capacity and ready_queue.has_ready():
+        promise, plan = ready_queue.pop_ready()
+        executor.submit(promise, plan)
+        in_flight += 1
+      if not in_flight:
+        break
+      # One result can satisfy many promises when a planner has scheduled bulk operations so mark
       # them all.
       for satisfied_promise in executor.gather_one_result():
-        if satisfied_promise in in_flight:
-          in_flight.pop(satisfied_promise)
-        satisfied_promises.add(satisfied_promise)
+        ready_queue.satisfy(satisfied_promise)
+      in_flight -= 1
 
-    # The main reduction loop:
-    # 1. Mark nodes that are pending submission to the worker pool.
-    # 2. Submit nodes to the worker pool when their inputs are satisfied.
-    # 3. Gather a single result when the pool is full to free up a processing slot.
-    #
-    # Of note here is the fact that we need build no node-readiness data structures up front and
-    # we limit pending submissions to the number of pool workers.  This gives us a bounded number
-    # of items to check for submission readiness, ie: we'll never need to scan more than the pool
-    # size, commonly the number of cores, no matter the size and shape of the execution graph.
-    for promise, plan in execution_graph.walk():
-      pending_submission[promise] = plan
-      submit_satisfied_pending()
-      # Saturate the pool before we block on a result for maximum processing parallelism.
-      if len(in_flight) == self._pool_size:
-        process_one_result()
+    return executor.finish(execution_graph)
 
-    # Consume the tail of pending submissions and nodes in_flight.
-    while pending_submission or in_flight:
-      submit_satisfied_pending()
-      process_one_result()
 
-    return executor.finish(execution_graph)
+class LocalMultiprocessEngine(LocalConcurrentEngine):
+  """An engine that runs tasks locally and in parallel when possible using a process pool.
+
+  Plans from planners that hint they are I/O bound can be routed to an in-process thread pool
+  instead, sparing them and their products the trip through pickling.
+  """
+
+  def __init__(self, local_scheduler, pool_size=None, debug=False, product_store=None,
+               critical_path=True, io_pool_size=0):
+    """
+    :param local_scheduler: The local scheduler for creating execution graphs.
+    :type local_scheduler: :class:`pants.engine.exp.scheduler.LocalScheduler`
+    :param int pool_size: The number of worker processes to use; by default 1 process per core will
+                          be used.
+    :param bool debug: `True` to turn on pickling error debug mode (slower); false by default.
+    :param product_store: An optional store to memoize plan products in across runs.
+    :type product_store: :class:`pants.engine.exp.storage.ProductStore`
+    :param bool critical_path: `True` to submit ready plans with the longest chains of dependees
+                               first; otherwise ready plans are submitted in walk order.
+    :param int io_pool_size: The number of threads to run I/O bound plans on; by default I/O bound
+                             plans run on the process pool like any other.
+    """
+    super(LocalMultiprocessEngine, self).__init__(local_scheduler,
+                                                  pool_size=pool_size,
+                                                  debug=debug,
+                                                  product_store=product_store,
+                                                  critical_path=critical_path)
+    self._pool = multiprocessing.Pool(self._pool_size)
+    self._io_pool_size = max(0, io_pool_size)
+    self._io_pool = ThreadPool(self._io_pool_size) if self._io_pool_size else None
+
+  @property
+  def _capacity(self):
+    return self._pool_size + self._io_pool_size
+
+  def _pool_for(self, execution_graph, plan):
+    if self._io_pool and execution_graph.is_io_bound(plan):
+      return self._io_pool, False
+    return self._pool, True
+
+  def close(self):
+    for pool in (self._pool, self._io_pool):
+      if pool:
+        pool.close()
+        pool.join()
+
+
+class LocalThreadedEngine(LocalConcurrentEngine):
+  """An engine that runs tasks locally and in parallel when possible using a thread pool.
+
+  Neither plans nor their products need to be picklable, so this engine suits graphs dominated by
+  I/O bound plans that release the GIL while they fetch, read files or run subprocesses.
+  """
+
+  def __init__(self, local_scheduler, pool_size=None, product_store=None, critical_path=True):
+    """
+    :param local_scheduler: The local scheduler for creating execution graphs.
+    :type local_scheduler: :class:`pants.engine.exp.scheduler.LocalScheduler`
+    :param int pool_size: The number of worker threads to use; by default 1 thread per core will
+                          be used.
+    :param product_store: An optional store to memoize plan products in across runs.
+    :type product_store: :class:`pants.engine.exp.storage.ProductStore`
+    :param bool critical_path: `True` to submit ready plans with the longest chains of dependees
+                               first; otherwise ready plans are submitted in walk order.
+    """
+    super(LocalThreadedEngine, self).__init__(local_scheduler,
+                                              pool_size=pool_size,
+                                              product_store=product_store,
+                                              critical_path=critical_path)
+    self._pool = ThreadPool(self._pool_size)
+
+  def _pool_for(self, execution_graph, plan):
+    return self._pool, False
 
   def close(self):
     self._pool.close()
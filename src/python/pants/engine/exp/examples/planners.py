@@ -95,6 +95,11 @@ class GlobalIvyResolvePlanner(TaskPlanner):
   def goal_name(self):
     return 'resolve'
 
+  @property
+  def io_bound(self):
+    # Resolves spend their time fetching artifacts.
+    return True
+
   @property
   def product_types(self):
     return {Classpath: [[Jar]]}
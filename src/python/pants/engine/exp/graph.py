@@ -69,13 +69,12 @@ class Graph(object):
     """
     self._address_mapper = address_mapper
 
-    # TODO(John Sirois): This will need to be eliminated in favor of just using the AddressMapper
-    # caching or else also expose an invalidation interface based on address.spec_path - aka
-    # AddressMapper.namespace.
-    #
-    # Our resolution cache.
+    # Our resolution cache, invalidated by address.spec_path - aka AddressMapper.namespace.
     self._resolved_by_address = {}
 
+    # The addresses whose resolved objects inline the object at a given address.
+    self._dependees_by_address = collections.defaultdict(set)
+
     self._inline = inline
 
   def resolve(self, address):
@@ -152,6 +151,7 @@ class Graph(object):
         return self._hydrate(type(item), **hydrated_args)
       elif isinstance(item, Address):
         if self._inline:
+          self._dependees_by_address[item].add(address)
           return self._resolve_recursively(item, resolve_path)
         else:
           # TODO(John Sirois): Implement lazy cycle checks across Resolver chains.
@@ -164,6 +164,47 @@ class Graph(object):
     self._resolved_by_address[address] = resolved
     return resolved
 
+  def invalidate_namespace(self, namespace):
+    """Invalidate the objects addressed in the given namespace.
+
+    The namespace's address family is re-parsed on next access.  Any resolved objects that inline
+    objects from the namespace, transitively, are dropped too; all other resolved objects stay
+    cached.
+
+    :param string namespace: The namespace to invalidate; ie: an `Address.spec_path`.
+    :returns: The addresses whose resolved objects were dropped.
+    :rtype: set of :class:`pants.build_graph.address.Address`
+    """
+    self._address_mapper.invalidate_namespace(namespace)
+    return self._invalidate_resolved(namespace)
+
+  def invalidate_build_file(self, path):
+    """Invalidate the objects addressed in the namespace of the given BUILD file.
+
+    See `invalidate_namespace`.
+
+    :param string path: The path of the build file; either absolute or relative to the build root.
+    :returns: The addresses whose resolved objects were dropped.
+    :rtype: set of :class:`pants.build_graph.address.Address`
+    """
+    namespace = self._address_mapper.invalidate_build_file(path)
+    return self._invalidate_resolved(namespace)
+
+  def _invalidate_resolved(self, namespace):
+    addresses = set(self._resolved_by_address) | set(self._dependees_by_address)
+    invalid = [address for address in addresses if address.spec_path == namespace]
+    visited = set()
+    dropped = set()
+    while invalid:
+      address = invalid.pop()
+      if address in visited:
+        continue
+      visited.add(address)
+      if self._resolved_by_address.pop(address, None) is not None:
+        dropped.add(address)
+      invalid.extend(self._dependees_by_address.pop(address, ()))
+    return dropped
+
   @staticmethod
   def _hydrate(item_type, **kwargs):
     try:
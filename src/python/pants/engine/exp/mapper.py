@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import re
+from collections import defaultdict
 
 from pants.build_graph.address import Address
 from pants.engine.exp import parsers
@@ -184,8 +185,9 @@ class AddressMapper(object):
   """Maps addresses to the objects they point to.
 
   An address mapper serves as its own cache of the BUILD files it has parsed.  Although it has no
-  knowledge of BUILD file contents, it does expose an `invalidate_build_file` for external agents
-  aware of file changes to mark the corresponding address namespaces as being in-need of re-parsing.
+  knowledge of BUILD file contents, it does expose `invalidate_build_file` and
+  `invalidate_namespace` for external agents aware of file changes to mark the corresponding
+  address namespaces as being in-need of re-parsing.
   """
 
   def __init__(self, build_root, build_pattern=None, parser=None):
@@ -205,6 +207,7 @@ class AddressMapper(object):
     self._build_root = os.path.realpath(build_root)
     self._build_pattern = re.compile(build_pattern or r'^BUILD(\.[a-zA-Z0-9_-]+)?$')
     self._parser = parser
+    self._parsed_paths_by_namespace = defaultdict(set)
 
   def _find_build_files(self, dir_path):
     abs_dir_path = os.path.join(self._build_root, dir_path)
@@ -220,8 +223,15 @@ class AddressMapper(object):
   def _normalize_parse_path(path):
     return os.path.realpath(path)
 
+  def _namespace(self, path):
+    namespace = os.path.relpath(os.path.dirname(path), self._build_root)
+    return '' if namespace == '.' else namespace
+
   @memoized_method
   def _parse(self, path):
+    # Remember the parse so that invalidating the namespace forgets it even if the BUILD file has
+    # since been deleted.
+    self._parsed_paths_by_namespace[self._namespace(path)].add(path)
     return AddressMap.parse(path, parser=self._parser)
 
   @memoized_method
@@ -267,6 +277,8 @@ class AddressMapper(object):
     existing paths or marking paths as having been deleted.
 
     :param string path: The path of the build file; either absolute or relative to the build root.
+    :returns: The namespace that was invalidated.
+    :rtype: string
     """
     # TODO(John Sirois): replace @memoized caches with hand-build local caches if needed when
     # considering concurrency implications of a seperate thread calling invalidate while other
@@ -275,7 +287,20 @@ class AddressMapper(object):
     normalized_path = self._normalize_parse_path(path)
 
     self._parse.forget(self, normalized_path)
-    namespace = os.path.relpath(os.path.dirname(normalized_path), self._build_root)
+    namespace = self._namespace(normalized_path)
+    self.invalidate_namespace(namespace)
+    return namespace
+
+  def invalidate_namespace(self, namespace):
+    """Force all the build files in the given namespace to be re-parsed on next access.
+
+    The address family of the namespace is recalculated from scratch on next access, picking up
+    added, modified and deleted BUILD files alike.  Other namespaces are left untouched.
+
+    :param string namespace: The namespace to invalidate; ie: an `Address.spec_path`.
+    """
+    for path in self._parsed_paths_by_namespace.pop(namespace, ()):
+      self._parse.forget(self, path)
     self.family.forget(self, namespace)
 
   def walk_addressables(self, rel_path=None, path_excludes=None):
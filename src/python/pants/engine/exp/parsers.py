@@ -6,9 +6,12 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import functools
+import hashlib
 import importlib
 import inspect
+import re
 import threading
+from collections import OrderedDict
 from json.decoder import JSONDecoder
 from json.encoder import JSONEncoder
 
@@ -16,24 +19,33 @@ import six
 
 from pants.build_graph.address import Address
 from pants.engine.exp.objects import Resolvable, Serializable
-from pants.util.memo import memoized
 
 
-@memoized
+# Successfully imported types by name.  A plain dict since this is consulted for every object
+# decoded without a symbol table.
+_imported_types = {}
+
+
 def _import(typename):
+  imported = _imported_types.get(typename)
+  if imported is not None:
+    return imported
+
   modulename, _, symbolname = typename.rpartition('.')
   if not modulename:
     raise ParseError('Expected a fully qualified type name, given {}'.format(typename))
   try:
     mod = importlib.import_module(modulename)
     try:
-      return getattr(mod, symbolname)
+      imported = getattr(mod, symbolname)
     except AttributeError:
       raise ParseError('The symbol {} was not found in module {} when attempting to convert '
                        'type name {}'.format(symbolname, modulename, typename))
   except ImportError as e:
     raise ParseError('Failed to import type name {} from module {}: {}'
                      .format(typename, modulename, e))
+  _imported_types[typename] = imported
+  return imported
 
 
 def _as_type(type_or_name):
@@ -52,6 +64,50 @@ def _read(path):
     raise ParseError('Problem reading path {}: {}'.format(path, e))
 
 
+class _ParseCache(object):
+  """A bounded cache of parsed objects keyed by the digest of the parsed document.
+
+  Re-parsing an unchanged BUILD file, say after its namespace is invalidated, is then just a digest
+  of its contents.  Since the parsed objects are shared across parses they must not be mutated.
+  """
+
+  def __init__(self, max_entries=10000):
+    self._max_entries = max_entries
+    self._objects_by_key = OrderedDict()
+    self._lock = threading.Lock()
+
+  @staticmethod
+  def key(contents, *extra):
+    """Return a key for the given document contents and anything else the parse depends on."""
+    digest = hashlib.sha1(contents if isinstance(contents, bytes) else contents.encode('utf-8'))
+    return (digest.hexdigest(),) + extra
+
+  def parse(self, key, parse):
+    """Return the objects parsed under key, calling `parse` to produce them if they're not cached.
+
+    Parse errors are not cached.
+    """
+    with self._lock:
+      objects = self._objects_by_key.pop(key, None)
+      if objects is not None:
+        self._objects_by_key[key] = objects
+        return list(objects)
+
+    objects = parse()
+    with self._lock:
+      self._objects_by_key[key] = objects
+      while len(self._objects_by_key) > self._max_entries:
+        self._objects_by_key.popitem(last=False)
+    return list(objects)
+
+  def clear(self):
+    with self._lock:
+      self._objects_by_key.clear()
+
+
+_json_parse_cache = _ParseCache()
+
+
 def _object_decoder(obj, symbol_table):
   # A magic field will indicate type and this can be used to wrap the object in a type.
   type_alias = obj.get('type_alias', None)
@@ -62,11 +118,45 @@ def _object_decoder(obj, symbol_table):
     return symbol(**obj)
 
 
-@memoized(key_factory=lambda t: tuple(sorted(t.items())) if t is not None else None)
-def _get_decoder(symbol_table=None):
-  decoder = functools.partial(_object_decoder,
-                              symbol_table=symbol_table.__getitem__ if symbol_table else _as_type)
-  return JSONDecoder(encoding='UTF-8', object_hook=decoder, strict=True)
+def _symbol_table_key(symbol_table):
+  return tuple(sorted(symbol_table.items())) if symbol_table is not None else None
+
+
+_decoders = {}
+
+
+def _get_decoder(symbol_table, symbol_table_key):
+  decoder = _decoders.get(symbol_table_key)
+  if decoder is None:
+    object_hook = functools.partial(_object_decoder,
+                                    symbol_table=(symbol_table.__getitem__ if symbol_table
+                                                  else _as_type))
+    decoder = JSONDecoder(encoding='UTF-8', object_hook=object_hook, strict=True)
+    _decoders[symbol_table_key] = decoder
+  return decoder
+
+
+_COMMENT_LINE_RE = re.compile(r'^[ \t]*#.*$', re.MULTILINE)
+_WHITESPACE_RE = re.compile(r'\s*')
+
+
+def _fast_decode(decoder, json):
+  # JSON strings can't span lines, so a line starting with `#` is always a comment.  Once those are
+  # blanked out, a well-formed document is just a series of whitespace separated objects and can be
+  # decoded in one pass.  Anything else is left to the slow path which produces detailed errors.
+  json = _COMMENT_LINE_RE.sub('', json)
+  objects = []
+  end = _WHITESPACE_RE.match(json).end()
+  while end < len(json):
+    if json[end] not in '{[':
+      return None
+    try:
+      obj, end = decoder.raw_decode(json, end)
+    except ValueError:
+      return None
+    objects.append(obj)
+    end = _WHITESPACE_RE.match(json, end).end()
+  return objects
 
 
 def parse_json(path, symbol_table=None):
@@ -79,6 +169,8 @@ def parse_json(path, symbol_table=None):
   This includes `namedtuple` subtypes as well as any custom class with an `_asdict` method defined;
   see :class:`pants.engine.exp.serializable.Serializable`.
 
+  Parses are cached by the digest of the document and the symbol table.
+
   :param string path: The path of a json encoded document with extra support for blank lines,
                       comments and multiple top-level objects.
   :returns: A list of decoded json data.
@@ -86,9 +178,17 @@ def parse_json(path, symbol_table=None):
   :raises: :class:`ParseError` if there were any problems encountered parsing the given `json`.
   """
   json = _read(path)
+  symbol_table_key = _symbol_table_key(symbol_table)
+  decoder = _get_decoder(symbol_table, symbol_table_key)
+
+  def parse():
+    objects = _fast_decode(decoder, json)
+    return objects if objects is not None else _decode(path, json, decoder)
+
+  return _json_parse_cache.parse(_ParseCache.key(json, symbol_table_key), parse)
 
-  decoder = _get_decoder(symbol_table)
 
+def _decode(path, json, decoder):
   # Strip comment lines and blank lines, which we allow, but preserve enough information about the
   # stripping to constitute a reasonable error message that can be used to find the portion of the
   # JSON document containing the error.
@@ -214,6 +314,8 @@ def python_assignments_parser(symbol_table=None):
   Only Serializable objects assigned to top-level variables will be collected and returned.  These
   objects will be addressable via their top-level variable names in the parsed namespace.
 
+  Each returned parser caches its parses by the digest of the parsed python code.
+
   :param dict symbol_table: An optional symbol table to expose to the python file being parsed.
   :returns: A callable that accepts a string path and returns a list of decoded addressable,
             Serializable objects.  The callable will raise :class:`ParseError` if there were any
@@ -227,8 +329,13 @@ def python_assignments_parser(symbol_table=None):
   for alias, symbol in (symbol_table or {}).items():
     parse_globals[alias] = functools.partial(aliased, alias, symbol)
 
+  parse_cache = _ParseCache()
+
   def parse(path):
     python = _read(path)
+    return parse_cache.parse(_ParseCache.key(python), functools.partial(parse_python, python))
+
+  def parse_python(python):
     symbols = {}
     six.exec_(python, parse_globals, symbols)
 
@@ -262,6 +369,8 @@ def python_callbacks_parser(symbol_table):
   Only Serializable objects with `name`s will be collected and returned.  These objects will be
   addressable via their name in the parsed namespace.
 
+  Each returned parser caches its parses by the digest of the parsed python code.
+
   :param dict symbol_table: The symbol table to expose to the python file being parsed.
   :returns: A callable that accepts a string path and returns a list of decoded addressable,
             Serializable objects.  The callable will raise :class:`ParseError` if there were any
@@ -284,12 +393,16 @@ def python_callbacks_parser(symbol_table):
     parse_globals[alias] = functools.partial(registered, alias, symbol)
 
   lock = threading.Lock()
+  parse_cache = _ParseCache()
 
-  def parse(path):
-    python = _read(path)
+  def parse_python(python):
     with lock:
       del objects[:]
       six.exec_(python, parse_globals, {})
       return list(objects)
 
+  def parse(path):
+    python = _read(path)
+    return parse_cache.parse(_ParseCache.key(python), functools.partial(parse_python, python))
+
   return parse
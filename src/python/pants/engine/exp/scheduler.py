@@ -398,6 +398,17 @@ class TaskPlanner(AbstractClass):
     :param object configuration: An optional requested configuration for the product.
     """
 
+  @property
+  def io_bound(self):
+    """Return `True` if the plans this planner creates spend most of their time waiting on I/O.
+
+    Engines may use this hint to run the plans in-process on threads instead of shipping them to
+    other processes.
+
+    :rtype: bool
+    """
+    return False
+
   def finalize_plans(self, plans):
     """Subclasses can override to finalize the plans they created.
 
@@ -643,6 +654,15 @@ class ExecutionGraph(object):
       for promise, plan in self._walk_plan(root_promise, plans):
         yield promise, plan
 
+  def is_io_bound(self, plan):
+    """Return `True` if the planner of the given plan hinted that it is I/O bound.
+
+    :param plan: A plan in this graph.
+    :type plan: :class:`Plan`
+    :rtype: bool
+    """
+    return self._product_mapper.is_io_bound(plan)
+
   def _walk_plan(self, promise, plans):
     plan = self._product_mapper.promised(promise)
     if plan not in plans:
@@ -722,8 +742,10 @@ class ProductMapper(object):
 
   def __init__(self):
     self._promises = {}
+    self._io_bound_plans = set()
 
-  def register_promises(self, product_type, plan, primary_subject=None, configuration=None):
+  def register_promises(self, product_type, plan, primary_subject=None, configuration=None,
+                        io_bound=False):
     """Registers the promises the given plan will satisfy when executed.
 
     :param type product_type: The product type the plan will produce when executed.
@@ -732,6 +754,7 @@ class ProductMapper(object):
     :param primary_subject: An optional primary subject.  If supplied, the registered promise for
                             this subject will be returned.
     :param object configuration: An optional promised configuration.
+    :param bool io_bound: `True` if the plan's planner hinted its plans are I/O bound.
     :returns: The promise for the primary subject of one was supplied.
     :rtype: :class:`Promise`
     :raises: :class:`ProductMapper.InvalidRegistrationError` if a primary subject was supplied but
@@ -745,6 +768,8 @@ class ProductMapper(object):
       if primary_subject == subject.primary:
         primary_promise = promise
       self._promises[promise] = plan
+    if io_bound:
+      self._io_bound_plans.add(plan)
 
     if primary_subject and not primary_promise:
       raise self.InvalidRegistrationError('The subject {} is not part of the final plan!: {}'
@@ -761,6 +786,15 @@ class ProductMapper(object):
     """
     return self._promises.get(promise)
 
+  def is_io_bound(self, plan):
+    """Return `True` if the given plan was registered as I/O bound.
+
+    :param plan: A registered plan.
+    :type plan: :class:`Plan`
+    :rtype: bool
+    """
+    return plan in self._io_bound_plans
+
 
 class LocalScheduler(Scheduler):
   """A scheduler that formulates an execution graph locally."""
@@ -821,13 +855,17 @@ class LocalScheduler(Scheduler):
         finalized_plans = planner.finalize_plans(plans)
         if finalized_plans is not plans:
           for finalized_plan in finalized_plans:
-            self._product_mapper.register_promises(product_type, finalized_plan)
+            self._product_mapper.register_promises(product_type, finalized_plan,
+                                                   io_bound=planner.io_bound)
 
     return ExecutionGraph(root_promises, self._product_mapper)
 
   # A synthetic planner that lifts products defined directly on targets into the product
   # namespace.
   class NoPlanner(object):
+    # Lifting a product off its subject is too cheap to be worth shipping to another process.
+    io_bound = True
+
     @classmethod
     def finalize_plans(cls, plans):
       return plans
@@ -869,7 +907,8 @@ class LocalScheduler(Scheduler):
     try:
       primary_promise = self._product_mapper.register_promises(product_type, plan,
                                                                primary_subject=subject,
-                                                               configuration=configuration)
+                                                               configuration=configuration,
+                                                               io_bound=planner.io_bound)
       self._plans_by_product_type_by_planner[planner][product_type].add(plan)
       return primary_promise
     except ProductMapper.InvalidRegistrationError:
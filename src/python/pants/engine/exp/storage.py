@@ -0,0 +1,145 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+
+try:
+  import cPickle as pickle
+except ImportError:
+  import pickle
+
+
+class ProductStore(object):
+  """A content-addressed store of the products of executed plans.
+
+  Products are keyed by the identity of the function or task type that produced them, the plan's
+  subjects and the plan's inputs after binding; so a plan whose inputs are unchanged from a
+  previous `Engine.execute` is served its product from the store instead of being re-executed.
+
+  The store holds at most `max_entries` products, evicting the least recently used first.
+  """
+
+  class Stats(object):
+    """Hit-rate instrumentation for a `ProductStore`."""
+
+    def __init__(self):
+      self.hits = 0
+      self.misses = 0
+      self.evictions = 0
+      self.uncacheable = 0
+
+    @property
+    def lookups(self):
+      return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+      """Return the fraction of lookups served from the store; 0 if there have been none.
+
+      :rtype: float
+      """
+      return self.hits / self.lookups if self.lookups else 0.0
+
+    def __repr__(self):
+      return ('ProductStore.Stats(hits={}, misses={}, evictions={}, uncacheable={}, hit_rate={:.2%})'
+              .format(self.hits, self.misses, self.evictions, self.uncacheable, self.hit_rate))
+
+  def __init__(self, max_entries=10000):
+    """
+    :param int max_entries: The maximum number of products to hold.
+    """
+    if max_entries < 1:
+      raise ValueError('A ProductStore must be able to hold at least 1 product, given {}'
+                       .format(max_entries))
+    self._max_entries = max_entries
+    self._products = OrderedDict()
+    self._lock = threading.Lock()
+    self._stats = self.Stats()
+
+  @property
+  def stats(self):
+    """Return the hit-rate instrumentation for this store.
+
+    :rtype: :class:`ProductStore.Stats`
+    """
+    return self._stats
+
+  def __len__(self):
+    return len(self._products)
+
+  @staticmethod
+  def _identity(func_or_task_type):
+    # Only module-level functions and types have an identity that is stable across runs; lambdas,
+    # closures and bound methods could alias each other by name.
+    name = getattr(func_or_task_type, '__name__', None)
+    module = sys.modules.get(getattr(func_or_task_type, '__module__', None))
+    if not name or getattr(module, name, None) is not func_or_task_type:
+      return None
+    return '{}.{}'.format(module.__name__, name)
+
+  @staticmethod
+  def _fingerprint(value):
+    return hashlib.sha1(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+  def key_for(self, plan, binding):
+    """Return the store key for the product of the given bound plan.
+
+    :param plan: The plan that will be executed.
+    :type plan: :class:`pants.engine.exp.scheduler.Plan`
+    :param binding: The binding of the plan to its promised inputs.
+    :type binding: :class:`pants.engine.exp.scheduler.Binding`
+    :returns: The key for the plan's product or `None` if the product can't be stored because
+              the plan's function can't be identified or its inputs can't be fingerprinted.
+    :rtype: string
+    """
+    identity = self._identity(plan.func_or_task_type.value)
+    if identity is not None:
+      try:
+        digest = hashlib.sha1(identity.encode('utf-8'))
+        for subject in sorted(self._fingerprint(s.primary) for s in plan.subjects):
+          digest.update(subject)
+        for name, value in sorted(binding.kwargs.items()):
+          digest.update(name.encode('utf-8'))
+          digest.update(self._fingerprint(value))
+        return digest.hexdigest()
+      except Exception:
+        # Pickle can raise things other than PickleError instances; see `engine._try_pickle`.
+        pass
+    with self._lock:
+      self._stats.uncacheable += 1
+    return None
+
+  def get(self, key, default=None):
+    """Return the product stored under key, or `default` if there is none.
+
+    :param string key: A key returned by `key_for`.
+    """
+    with self._lock:
+      if key in self._products:
+        product = self._products.pop(key)
+        self._products[key] = product
+        self._stats.hits += 1
+        return product
+      self._stats.misses += 1
+      return default
+
+  def put(self, key, product):
+    """Store the product under key, evicting the least recently used products as needed.
+
+    :param string key: A key returned by `key_for`.
+    :param product: The product to store.
+    """
+    with self._lock:
+      self._products.pop(key, None)
+      self._products[key] = product
+      while len(self._products) > self._max_entries:
+        self._products.popitem(last=False)
+        self._stats.evictions += 1
@@ -5,13 +5,18 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import json
 import os
+import struct
+import time
+import zipfile
 from abc import abstractmethod
 from collections import OrderedDict
 from zipfile import ZIP_DEFLATED, ZIP_STORED
 
+from pants.base.hash_utils import hash_file
 from pants.util.contextutil import open_tar, open_zip
-from pants.util.dirutil import safe_walk
+from pants.util.dirutil import safe_concurrent_create, safe_delete, safe_walk
 from pants.util.meta import AbstractClass
 from pants.util.strutil import ensure_text
 
@@ -85,22 +90,139 @@ class ZipArchiver(Archiver):
     self.compression = compression
     self.extension = extension
 
-  def create(self, basedir, outdir, name, prefix=None):
+  def create(self, basedir, outdir, name, prefix=None, index_file=None):
+    """Creates an archive of all files found under basedir to a file at outdir of the given name.
+
+    If prefix is specified, it should be prepended to all archive paths.
+
+    If index_file is specified, the digest of the content of each file archived is recorded there.
+    When an archive is next created at the same path with the same index, the entries of files
+    whose content is unchanged are copied across from the old archive as they are, without being
+    compressed again: only the entries of new and changed files are compressed.
+    """
     zippath = os.path.join(outdir, '{}.{}'.format(name, self.extension))
-    with open_zip(zippath, 'w', compression=self.compression) as zip:
-      # For symlinks, we want to archive the actual content of linked files but
-      # under the relpath derived from symlink.
-      for root, _, files in safe_walk(basedir, followlinks=True):
-        root = ensure_text(root)
-        for file in files:
-          file = ensure_text(file)
-          full_path = os.path.join(root, file)
-          relpath = os.path.relpath(full_path, basedir)
-          if prefix:
-            relpath = os.path.join(ensure_text(prefix), relpath)
+    if index_file is None:
+      with open_zip(zippath, 'w', compression=self.compression) as zip:
+        for full_path, relpath in self._walk(basedir, prefix):
           zip.write(full_path, relpath)
+      return zippath
+
+    entries = [(full_path, relpath, hash_file(full_path))
+               for full_path, relpath in self._walk(basedir, prefix)]
+    index = self._read_index(index_file, zippath)
+    unchanged = {relpath for _, relpath, digest in entries
+                 if index is not None and index.get(relpath) == digest}
+
+    # Build the new archive alongside the old one, to copy unchanged entries from it, and then
+    # replace it: so a failure part way through leaves the old archive and its index in place.
+    tmp_zippath = '{}.tmp'.format(zippath)
+    with open_zip(tmp_zippath, 'w', compression=self.compression) as zip:
+      if unchanged:
+        with open_zip(zippath, 'r') as old_zip:
+          self._write_entries(zip, entries, unchanged, old_zip)
+      else:
+        self._write_entries(zip, entries, unchanged, None)
+    # Invalidate the index before replacing the archive it describes.
+    safe_delete(index_file)
+    os.rename(tmp_zippath, zippath)
+    self._write_index(index_file, zippath, entries)
     return zippath
 
+  @staticmethod
+  def _walk(basedir, prefix):
+    # For symlinks, we want to archive the actual content of linked files but
+    # under the relpath derived from symlink.
+    for root, _, files in safe_walk(basedir, followlinks=True):
+      root = ensure_text(root)
+      for file in files:
+        file = ensure_text(file)
+        full_path = os.path.join(root, file)
+        relpath = os.path.relpath(full_path, basedir)
+        if prefix:
+          relpath = os.path.join(ensure_text(prefix), relpath)
+        yield full_path, relpath
+
+  @staticmethod
+  def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime]
+
+  @classmethod
+  def _read_index(cls, index_file, zippath):
+    """Returns a map of the archive's entry names to digests, or None if it has no valid index.
+
+    An index is only valid for the archive it was written with: if the archive has been changed or
+    replaced since, its entries are unknown.
+    """
+    try:
+      with open(index_file, 'rb') as fp:
+        index = json.load(fp)
+      if index['archive'] != cls._stamp(zippath):
+        return None
+      return dict(index['entries'])
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+      return None
+
+  @classmethod
+  def _write_index(cls, index_file, zippath, entries):
+    index = {
+      'archive': cls._stamp(zippath),
+      'entries': [[relpath, digest] for _, relpath, digest in entries],
+    }
+
+    def write_index(path):
+      with open(path, 'wb') as fp:
+        json.dump(index, fp)
+
+    safe_concurrent_create(write_index, index_file)
+
+  def _write_entries(self, zip, entries, unchanged, old_zip):
+    for full_path, relpath, _ in entries:
+      old_info = old_zip.NameToInfo.get(relpath) if relpath in unchanged else None
+      if old_info is not None and old_info.compress_type == self.compression:
+        self._copy_entry(zip, old_zip, old_info, full_path)
+      else:
+        zip.write(full_path, relpath)
+
+  @staticmethod
+  def _copy_entry(zip, old_zip, old_info, full_path):
+    """Copies an entry's compressed data from old_zip to zip as is, along with its CRC and sizes.
+
+    The entry's header is written just as `ZipFile.write` would write it for full_path, whose
+    content must be that of the entry.
+    """
+    st = os.stat(full_path)
+    info = zipfile.ZipInfo(old_info.filename, time.localtime(st.st_mtime)[0:6])
+    info.external_attr = (st.st_mode & 0xFFFF) << 16
+    info.compress_type = old_info.compress_type
+    info.file_size = old_info.file_size
+    info.compress_size = old_info.compress_size
+    info.CRC = old_info.CRC
+    info.flag_bits = 0x00
+    info.header_offset = zip.fp.tell()
+    zip._writecheck(info)
+    zip._didModify = True
+    zip64 = zip._allowZip64 and info.file_size * 1.05 > zipfile.ZIP64_LIMIT
+    zip.fp.write(info.FileHeader(zip64))
+
+    # The compressed data follows the old entry's local header, whose name and extra field may
+    # differ in length from those recorded in the central directory.
+    old_zip.fp.seek(old_info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, old_zip.fp.read(zipfile.sizeFileHeader))
+    old_zip.fp.seek(header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH],
+                    os.SEEK_CUR)
+    remaining = info.compress_size
+    while remaining:
+      chunk = old_zip.fp.read(min(remaining, 1024 * 1024))
+      if not chunk:
+        raise zipfile.BadZipfile('Truncated entry {} in {}'.format(old_info.filename,
+                                                                     old_zip.filename))
+      zip.fp.write(chunk)
+      remaining -= len(chunk)
+
+    zip.filelist.append(info)
+    zip.NameToInfo[info.filename] = info
+
 
 TAR = TarArchiver('w:', 'tar')
 TGZ = TarArchiver('w:gz', 'tar.gz')
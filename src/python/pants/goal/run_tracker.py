@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import json
 import multiprocessing
 import os
+import re
 import sys
 import threading
 import time
@@ -22,6 +23,8 @@ from pants.base.worker_pool import SubprocPool, WorkerPool
 from pants.base.workunit import WorkUnit
 from pants.goal.aggregated_timings import AggregatedTimings
 from pants.goal.artifact_cache_stats import ArtifactCacheStats
+from pants.goal.sampling_profiler import SamplingProfiler
+from pants.option.custom_types import list_option
 from pants.reporting.report import Report
 from pants.stats.statsdb import StatsDBFactory
 from pants.subsystem.subsystem import Subsystem
@@ -72,6 +75,13 @@ class RunTracker(Subsystem):
              help='Number of threads for background work.')
     register('--stats-local-json-file', advanced=True, default=None,
              help='Write stats to this local json file on run completion.')
+    register('--profile-workunits', advanced=True, type=list_option, default=[],
+             help='Profile the workunits with these names or paths (eg: zinc or '
+                  'main:compile:zinc) with a sampling profiler.  A collapsed-stack file for '
+                  'each profiled workunit is written under the run info dir and linked from the '
+                  'report.')
+    register('--profile-sample-interval', advanced=True, type=float, default=0.005,
+             help='Sample the stacks of profiled workunits this often, in seconds.')
 
   def __init__(self, *args, **kwargs):
     super(RunTracker, self).__init__(*args, **kwargs)
@@ -113,6 +123,11 @@ class RunTracker(Subsystem):
     # Log of success/failure/aborted for each workunit.
     self.outcomes = {}
 
+    # Samples the stacks of the workunits we were asked to profile, if any.
+    self._profiled_workunits = frozenset(self.get_options().profile_workunits)
+    self._profiler = (SamplingProfiler(self.get_options().profile_sample_interval)
+                      if self._profiled_workunits else None)
+
     # Number of threads for foreground work.
     self._num_foreground_workers = self.get_options().num_foreground_workers
 
@@ -217,6 +232,7 @@ class RunTracker(Subsystem):
     outcome = WorkUnit.FAILURE  # Default to failure we will override if we get success/abort.
     try:
       self.report.start_workunit(workunit)
+      self._start_profiling(workunit)
       yield workunit
     except KeyboardInterrupt:
       outcome = WorkUnit.ABORTED
@@ -336,10 +352,29 @@ class RunTracker(Subsystem):
       # If the goal is clean-all then the run info dir no longer exists, so ignore that error.
       self.run_info.add_info('outcome', outcome_str, ignore_errors=True)
 
+    if self._profiler:
+      self._profiler.close()
+
     self.report.close()
     self.store_stats()
 
+  def _start_profiling(self, workunit):
+    if self._profiler and (workunit.name in self._profiled_workunits or
+                           workunit.path() in self._profiled_workunits):
+      self._profiler.start(workunit.id)
+
+  def _stop_profiling(self, workunit):
+    stacks = self._profiler.stop(workunit.id) if self._profiler else None
+    if stacks is not None:
+      path = os.path.join(self.run_info_dir, 'profiles', '{workunit_path}-{id}.collapsed'
+                          .format(workunit_path=re.sub(r'\W', '_', workunit.path()),
+                                  id=workunit.id))
+      SamplingProfiler.write_collapsed(path, stacks)
+      self.report.log(workunit, Report.INFO,
+                      'Wrote {} stack samples to {}'.format(sum(stacks.values()), path))
+
   def end_workunit(self, workunit):
+    self._stop_profiling(workunit)
     self.report.end_workunit(workunit)
     path, duration, self_time, is_tool = workunit.end()
 
@@ -0,0 +1,106 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import sys
+import threading
+import time
+from collections import Counter
+
+from pants.util.dirutil import safe_open
+
+
+class SamplingProfiler(object):
+  """Profiles threads by periodically sampling their stacks from a dedicated thread.
+
+  Each profile collects the stacks seen on one thread between `start` and `stop`, keyed by the
+  caller; eg: by workunit id.  Sampling only costs the profiled threads the time the sampling
+  thread spends holding the GIL, so it's suitable for turning on in production runs.
+
+  Stacks are collected in the "collapsed" format consumed by flame graph tools: one line per
+  distinct stack, its frames from outermost to innermost separated by semicolons, followed by the
+  number of times it was sampled.
+  """
+
+  def __init__(self, interval_secs=0.005):
+    """
+    :param float interval_secs: The time to wait between samples.
+    """
+    self._interval_secs = interval_secs
+    self._lock = threading.Lock()
+    self._profiles = {}  # key -> (thread id, Counter of collapsed stack -> samples).
+    self._frame_names = {}  # code object -> frame name.
+    self._sampler = None
+    self._stopped = threading.Event()
+
+  def start(self, key, thread_id=None):
+    """Start profiling a thread.
+
+    :param key: A hashable key to stop the profile with.
+    :param int thread_id: The ident of the thread to profile; the calling thread by default.
+    """
+    with self._lock:
+      self._profiles[key] = (thread_id or threading.current_thread().ident, Counter())
+      if self._sampler is None:
+        self._sampler = threading.Thread(target=self._sample, name='sampling-profiler')
+        self._sampler.daemon = True
+        self._sampler.start()
+
+  def stop(self, key):
+    """Stop a profile.
+
+    :param key: The key the profile was started with.
+    :returns: A Counter of the collapsed stacks sampled, or `None` if there's no such profile.
+    :rtype: :class:`collections.Counter`
+    """
+    with self._lock:
+      _, stacks = self._profiles.pop(key, (None, None))
+      return stacks
+
+  def close(self):
+    """Stop the sampling thread; any profiles still running are abandoned."""
+    self._stopped.set()
+    if self._sampler is not None:
+      self._sampler.join()
+
+  @staticmethod
+  def write_collapsed(path, stacks):
+    """Write stacks to a file in the collapsed format.
+
+    :param string path: The path of the file to write.
+    :param stacks: A Counter of collapsed stacks, as returned by `stop`.
+    """
+    with safe_open(path, 'w') as fp:
+      for stack, samples in sorted(stacks.items()):
+        fp.write('{} {}\n'.format(stack, samples))
+
+  def _frame_name(self, code):
+    name = self._frame_names.get(code)
+    if name is None:
+      name = '{}({}:{})'.format(code.co_name, code.co_filename, code.co_firstlineno)
+      # Semicolons separate frames and a space separates the count in the collapsed format.
+      name = name.replace(';', '_').replace(' ', '_')
+      self._frame_names[code] = name
+    return name
+
+  def _collapse(self, frame):
+    names = []
+    while frame is not None:
+      names.append(self._frame_name(frame.f_code))
+      frame = frame.f_back
+    return ';'.join(reversed(names))
+
+  def _sample(self):
+    while not self._stopped.is_set():
+      time.sleep(self._interval_secs)
+      frames = sys._current_frames()
+      with self._lock:
+        for thread_id, stacks in self._profiles.values():
+          frame = frames.get(thread_id)
+          if frame is not None:
+            stacks[self._collapse(frame)] += 1
+      # Drop our references to the sampled frames promptly.
+      frames = frame = None
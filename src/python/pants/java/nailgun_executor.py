@@ -12,6 +12,7 @@ import re
 import select
 import threading
 import time
+from collections import defaultdict
 from contextlib import closing
 
 from six import string_types
@@ -75,7 +76,9 @@ class NailgunExecutor(Executor, ProcessManager):
   _PANTS_OWNER_ARG_PREFIX = b'-Dpants.nailgun.owner'
   _PANTS_NG_ARG = '='.join((_PANTS_NG_ARG_PREFIX, get_buildroot()))
 
-  _NAILGUN_SPAWN_LOCK = threading.Lock()
+  # Executors are created per invocation, so spawn locks are shared per identity across instances.
+  _NAILGUN_SPAWN_LOCKS_LOCK = threading.Lock()
+  _NAILGUN_SPAWN_LOCKS = defaultdict(threading.Lock)
   _SELECT_WAIT = 1
   _PROCESS_NAME = b'java'
 
@@ -170,13 +173,26 @@ class NailgunExecutor(Executor, ProcessManager):
                           old_dist=self.cmd, new_dist=self._distribution.java))
     return running, updated
 
+  @property
+  def _spawn_lock(self):
+    with self._NAILGUN_SPAWN_LOCKS_LOCK:
+      return self._NAILGUN_SPAWN_LOCKS[self._identity]
+
+  def prewarm(self, jvm_options, classpath):
+    """Ensures a nailgun server is running for the given jvm options and classpath.
+
+    :param list jvm_options: JVM options the server should be launched with.
+    :param list classpath: The classpath of the programs the server will run.
+    """
+    self._get_nailgun_client(jvm_options, classpath, stdout=None, stderr=None)
+
   def _get_nailgun_client(self, jvm_options, classpath, stdout, stderr):
     """This (somewhat unfortunately) is the main entrypoint to this class via the Runner. It handles
        creation of the running nailgun server as well as creation of the client."""
     classpath = self._nailgun_classpath + classpath
     new_fingerprint = self._fingerprint(jvm_options, classpath, self._distribution.version)
 
-    with self._NAILGUN_SPAWN_LOCK:
+    with self._spawn_lock:
       running, updated = self._check_nailgun_state(new_fingerprint)
 
       if running and updated:
@@ -272,3 +288,160 @@ class NailgunExecutor(Executor, ProcessManager):
                          close_fds=True)
 
     self.write_pid(subproc.pid)
+
+
+class NailgunExecutorPool(Executor):
+  """Executes java programs via a pool of nailgun servers sharing a task identity.
+
+  Unlike a single `NailgunExecutor`, which kills and respawns its server whenever the classpath or
+  jvm options fingerprint changes, the pool keeps `pool_size` servers per fingerprint and dispatches
+  each run to the server with the fewest runs in flight from this process. The first run for a
+  fingerprint pre-warms the rest of its servers in the background. Servers for up to
+  `max_fingerprints` fingerprints are kept alive; those of the least recently used fingerprint are
+  retired when a new fingerprint pushes the pool over that limit.
+  """
+
+  # Load is tracked per member across executor instances, since tasks create one per invocation.
+  _LOCK = threading.Lock()
+  _in_flight = defaultdict(int)
+  _prewarmed = set()
+
+  _LAST_USED_KEY = 'last_used'
+
+  def __init__(self, identity, workdir, nailgun_classpath, distribution, pool_size=2,
+               max_fingerprints=2, ins=None, connect_timeout=10, connect_attempts=5):
+    super(NailgunExecutorPool, self).__init__(distribution=distribution)
+
+    if not isinstance(workdir, string_types):
+      raise ValueError('Workdir must be a path string, not: {workdir}'.format(workdir=workdir))
+    if pool_size < 1:
+      raise ValueError('The pool size must be at least 1, given: {}'.format(pool_size))
+    if max_fingerprints < 1:
+      raise ValueError('At least 1 fingerprint must be kept, given: {}'.format(max_fingerprints))
+
+    self._identity = identity
+    self._workdir = workdir
+    self._nailgun_classpath = maybe_list(nailgun_classpath)
+    self._pool_size = pool_size
+    self._max_fingerprints = max_fingerprints
+    self._ins = ins
+    self._connect_timeout = connect_timeout
+    self._connect_attempts = connect_attempts
+    self._member_regex = re.compile(r'^{}-([0-9a-f]+)-(\d+)$'.format(re.escape(identity)))
+
+  def __str__(self):
+    return 'NailgunExecutorPool({identity}, dist={dist}, size={size})'.format(
+      identity=self._identity, dist=self._distribution, size=self._pool_size)
+
+  def _member_name(self, fingerprint, slot):
+    return '{}-{}-{}'.format(self._identity, fingerprint[:12], slot)
+
+  def _member(self, name):
+    return NailgunExecutor(name,
+                           os.path.join(self._workdir, name),
+                           self._nailgun_classpath,
+                           self._distribution,
+                           ins=self._ins,
+                           connect_timeout=self._connect_timeout,
+                           connect_attempts=self._connect_attempts)
+
+  def _select_member(self, fingerprint):
+    """Claims the least loaded member for the fingerprint; callers must `_release` it."""
+    with self._LOCK:
+      names = [self._member_name(fingerprint, slot) for slot in range(self._pool_size)]
+      name = min(names, key=lambda n: self._in_flight[n])
+      self._in_flight[name] += 1
+      return name
+
+  def _release(self, name):
+    with self._LOCK:
+      self._in_flight[name] -= 1
+
+  def _claim_prewarm(self, fingerprint):
+    with self._LOCK:
+      key = (self._identity, fingerprint)
+      if key in self._prewarmed:
+        return False
+      self._prewarmed.add(key)
+      return True
+
+  def _prewarm(self, fingerprint, skip, jvm_options, classpath):
+    def warm(name):
+      try:
+        self._member(name).prewarm(jvm_options, classpath)
+      except Exception as e:
+        # A failed pre-warm just means the first run dispatched to this member spawns it instead.
+        logger.debug('Failed to pre-warm nailgun {}: {}'.format(name, e))
+
+    for slot in range(self._pool_size):
+      name = self._member_name(fingerprint, slot)
+      if name != skip:
+        thread = threading.Thread(target=warm, args=(name,), name='prewarm-{}'.format(name))
+        thread.daemon = True
+        thread.start()
+
+  def _pool_members(self):
+    """Returns a dict of fingerprint prefix to member names for all members with metadata."""
+    metadata_root = os.path.join(get_buildroot(), ProcessManager.PID_DIR_NAME)
+    members = defaultdict(list)
+    if os.path.isdir(metadata_root):
+      for name in os.listdir(metadata_root):
+        match = self._member_regex.match(name)
+        if match:
+          members[match.group(1)].append(name)
+    return members
+
+  def _last_used(self, names):
+    return max(ProcessManager.read_metadata_by_name(name, self._LAST_USED_KEY, float) or 0
+               for name in names)
+
+  def _retire_stale(self, fingerprint):
+    members = self._pool_members()
+    current = fingerprint[:12]
+    stale = sorted((fp for fp in members if fp != current),
+                   key=lambda fp: self._last_used(members[fp]))
+    excess = len(stale) + 1 - self._max_fingerprints
+    for fp in stale[:max(excess, 0)]:
+      with self._LOCK:
+        busy = any(self._in_flight[name] for name in members[fp])
+      if busy:
+        continue
+      for name in members[fp]:
+        logger.debug('Retiring least recently used nailgun {}'.format(name))
+        try:
+          ProcessManager(name=name, process_name=NailgunExecutor._PROCESS_NAME).terminate()
+        except ProcessManager.NonResponsiveProcess as e:
+          logger.warning('Failed to retire nailgun {}: {}'.format(name, e))
+
+  def _runner(self, classpath, main, jvm_options, args, cwd=None):
+    """Runner factory. Called via Executor.execute()."""
+    command = self._create_command(classpath, main, jvm_options, args)
+    fingerprint = NailgunExecutor._fingerprint(jvm_options,
+                                               self._nailgun_classpath + classpath,
+                                               self._distribution.version)
+
+    class Runner(self.Runner):
+      @property
+      def executor(this):
+        return self
+
+      @property
+      def command(this):
+        return list(command)
+
+      def run(this, stdout=None, stderr=None, cwd=None):
+        name = self._select_member(fingerprint)
+        try:
+          if self._claim_prewarm(fingerprint):
+            self._prewarm(fingerprint, name, jvm_options, classpath)
+            self._retire_stale(fingerprint)
+          member = self._member(name)
+          return member.runner(classpath, main, jvm_options, args, cwd=cwd).run(stdout=stdout,
+                                                                                stderr=stderr,
+                                                                                cwd=cwd)
+        finally:
+          # NB: Recorded after the run since spawning a member purges its metadata.
+          ProcessManager.write_metadata_by_name(name, self._LAST_USED_KEY, repr(time.time()))
+          self._release(name)
+
+    return Runner()
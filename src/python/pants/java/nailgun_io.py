@@ -6,7 +6,6 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import errno
-import io
 import os
 import select
 import socket
@@ -20,8 +19,10 @@ class NailgunStreamReader(threading.Thread):
   """Reads input from stdin and emits Nailgun 'stdin' chunks over a socket."""
 
   SELECT_TIMEOUT = 1
+  # Large reads mean fewer select/read/send round trips per byte when pumping bulk input.
+  BUF_SIZE = 64 * 1024
 
-  def __init__(self, in_fd, sock, buf_size=io.DEFAULT_BUFFER_SIZE, select_timeout=SELECT_TIMEOUT):
+  def __init__(self, in_fd, sock, buf_size=BUF_SIZE, select_timeout=SELECT_TIMEOUT):
     """
     :param file in_fd: the input file descriptor (e.g. sys.stdin) to read from.
     :param socket sock: the socket to emit nailgun protocol chunks over.
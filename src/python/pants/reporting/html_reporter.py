@@ -21,6 +21,7 @@ from pants.base.mustache import MustacheRenderer
 from pants.base.workunit import WorkUnit, WorkUnitLabel
 from pants.reporting.linkify import linkify
 from pants.reporting.report import Report
+from pants.reporting.report_writer import ReportWriter
 from pants.reporting.reporter import Reporter
 from pants.reporting.reporting_utils import items_to_report_element
 from pants.util.dirutil import safe_mkdir
@@ -37,6 +38,9 @@ class HtmlReporter(Reporter):
   significantly faster, and profiles showed that the difference was non-trivial in short
   pants runs.
 
+  All file writes happen on a dedicated writer thread, so that reporting doesn't block the callers
+  of the Reporter callbacks on disk I/O.
+
   TODO: The entire HTML reporting system, and the pants server that backs it, should be
   rewritten to use some modern webapp framework, instead of this combination of server-side
   ad-hoc templates and client-side spaghetti code.
@@ -59,11 +63,11 @@ class HtmlReporter(Reporter):
     self._buildroot = get_buildroot()
     self._html_path_base = os.path.relpath(self._html_dir, self._buildroot)
 
-    # We write the main report body to this file object.
-    self._report_file = None
+    # We write the main report body, and everything else, via this writer.
+    self._writer = ReportWriter(self._html_dir)
 
     # We redirect stdout, stderr etc. of tool invocations to these files.
-    self._output_files = defaultdict(dict)  # workunit_id -> {path -> fileobj}.
+    self._output_paths = defaultdict(set)  # workunit_id -> {path}.
     self._linkify_memo = {}
 
     # Map from filename to timestamp (ms since the epoch) of when we last overwrote that file.
@@ -78,15 +82,14 @@ class HtmlReporter(Reporter):
   def open(self):
     """Implementation of Reporter callback."""
     safe_mkdir(os.path.dirname(self._html_dir))
-    self._report_file = open(self.report_path(), 'w')
+    # Create the report file up front, so it can be served before the first write lands.
+    open(self.report_path(), 'w').close()
+    self._writer.start()
 
   def close(self):
     """Implementation of Reporter callback."""
-    self._report_file.close()
-    # Make sure everything's closed.
-    for files in self._output_files.values():
-      for f in files.values():
-        f.close()
+    # Finishes all pending writes and makes sure everything's closed.
+    self._writer.close()
 
   # Creates a collapsible div in which to nest the reporting for a workunit.
   # To add content to this div, append it to ${'#WORKUNITID-content'}.
@@ -304,22 +307,14 @@ class HtmlReporter(Reporter):
                     lambda: render_cache_stats(self.run_tracker.artifact_cache_stats),
                     force=force_overwrite)
 
-    for f in self._output_files[workunit.id].values():
-      f.close()
+    for path in self._output_paths.pop(workunit.id, ()):
+      self._writer.close_file(path)
 
   def handle_output(self, workunit, label, s):
     """Implementation of Reporter callback."""
-    if os.path.exists(self._html_dir):  # Make sure we're not immediately after a clean-all.
-      path = os.path.join(self._html_dir, '{}.{}'.format(workunit.id, label))
-      output_files = self._output_files[workunit.id]
-      if path not in output_files:
-        f = open(path, 'w')
-        output_files[path] = f
-      else:
-        f = output_files[path]
-      f.write(self._htmlify_text(s).encode('utf-8'))
-      # We must flush in the same thread as the write.
-      f.flush()
+    path = os.path.join(self._html_dir, '{}.{}'.format(workunit.id, label))
+    self._output_paths[workunit.id].add(path)
+    self._writer.append(path, self._htmlify_text(s).encode('utf-8'))
 
   _log_level_css_map = {
     Report.FATAL: 'fatal',
@@ -430,9 +425,7 @@ class HtmlReporter(Reporter):
 
   def _emit(self, s):
     """Append content to the main report file."""
-    if os.path.exists(self._html_dir):  # Make sure we're not immediately after a clean-all.
-      self._report_file.write(s)
-      self._report_file.flush()  # We must flush in the same thread as the write.
+    self._writer.append(self.report_path(), s)
 
   def _overwrite(self, filename, func, force=False):
     """Overwrite a file with the specified contents.
@@ -447,9 +440,7 @@ class HtmlReporter(Reporter):
     last_overwrite_time = self._last_overwrite_time.get(filename) or now
     # Overwrite only once per second.
     if (now - last_overwrite_time >= 1000) or force:
-      if os.path.exists(self._html_dir):  # Make sure we're not immediately after a clean-all.
-        with open(os.path.join(self._html_dir, filename), 'w') as f:
-          f.write(func())
+      self._writer.overwrite(os.path.join(self._html_dir, filename), func())
       self._last_overwrite_time[filename] = now
 
   def _htmlify_text(self, s):
@@ -0,0 +1,134 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from six.moves.queue import Empty, Queue
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReportWriter(object):
+  """Writes report files from a dedicated thread.
+
+  Callers queue up writes and return immediately, only blocking if the writer falls more than
+  `max_queued` writes behind.  The writer drains the queue in batches: consecutive appends to a
+  file in a batch are coalesced into a single write and each file is flushed once per batch.
+
+  Writes to a file happen in the order they were queued, so the files written are byte-identical
+  to those written by the equivalent synchronous writes.
+  """
+
+  _APPEND = 'append'
+  _OVERWRITE = 'overwrite'
+  _CLOSE = 'close'
+  _STOP = 'stop'
+
+  def __init__(self, root_dir, max_queued=1000, max_batch=1000, name='report-writer'):
+    """
+    :param string root_dir: The directory the report files live under.  Writes are dropped when it
+                            does not exist; ie: immediately after a clean-all.
+    :param int max_queued: The maximum number of writes to queue before callers block.
+    :param int max_batch: The maximum number of queued writes to handle in one batch.
+    :param string name: The name of the writer thread.
+    """
+    self._root_dir = root_dir
+    self._max_batch = max_batch
+    self._queue = Queue(maxsize=max_queued)
+    self._files = {}  # path -> fileobj.
+    self._thread = threading.Thread(target=self._run, name=name)
+    self._thread.daemon = True
+
+  def start(self):
+    """Start the writer thread."""
+    self._thread.start()
+
+  def append(self, path, data):
+    """Append data to the file at path, creating the file if it doesn't exist.
+
+    :param string path: The path of the file to append to.
+    :param data: The string to append; either bytes or unicode, but consistently one or the other
+                 for any given path.
+    """
+    self._queue.put((self._APPEND, path, data))
+
+  def overwrite(self, path, data):
+    """Replace the contents of the file at path with data.
+
+    Later appends to the file append to data.
+    """
+    self._queue.put((self._OVERWRITE, path, data))
+
+  def close_file(self, path):
+    """Close the file at path, if open, once all writes queued for it so far are done."""
+    self._queue.put((self._CLOSE, path, None))
+
+  def close(self):
+    """Finish all queued writes, close all files and stop the writer thread."""
+    self._queue.put((self._STOP, None, None))
+    self._thread.join()
+
+  def _run(self):
+    stopped = False
+    while not stopped:
+      batch = [self._queue.get()]
+      while len(batch) < self._max_batch:
+        try:
+          batch.append(self._queue.get_nowait())
+        except Empty:
+          break
+      try:
+        stopped = self._write_batch(batch)
+      except Exception:
+        # Never let the writer die, since writers that can't enqueue would block forever.
+        logger.exception('Failed to write a batch of report output.')
+        stopped = any(op == self._STOP for op, _, _ in batch)
+    self._close_all()
+
+  def _write_batch(self, batch):
+    # Only check for a clean-all once per batch rather than once per write.
+    writable = os.path.isdir(self._root_dir)
+    pending = OrderedDict()  # path -> list of data to append.
+    stopped = False
+    for op, path, data in batch:
+      if op == self._APPEND:
+        pending.setdefault(path, []).append(data)
+      elif op == self._STOP:
+        stopped = True
+      else:
+        self._append(path, pending.pop(path, None), writable)
+        # Both close any open handle: an overwrite would otherwise leave it writing at its old
+        # offset.
+        fp = self._files.pop(path, None)
+        if fp:
+          fp.close()
+        if op == self._OVERWRITE and writable:
+          with open(path, 'w') as fp:
+            fp.write(data)
+    for path, chunks in pending.items():
+      self._append(path, chunks, writable)
+    return stopped
+
+  def _append(self, path, chunks, writable):
+    if not chunks or not writable:
+      return
+    fp = self._files.get(path)
+    if fp is None:
+      fp = open(path, 'a')
+      self._files[path] = fp
+    # Slicing keeps the join the same string type as the chunks.
+    fp.write(chunks[0][:0].join(chunks))
+    fp.flush()
+
+  def _close_all(self):
+    for fp in self._files.values():
+      fp.close()
+    self._files.clear()
@@ -18,6 +18,7 @@ from pants.reporting.plaintext_reporter import LabelFormat, PlainTextReporter, T
 from pants.reporting.quiet_reporter import QuietReporter
 from pants.reporting.report import Report, ReportingError
 from pants.reporting.reporting_server import ReportingServerManager
+from pants.reporting.trace_reporter import TraceReporter
 from pants.subsystem.subsystem import Subsystem
 from pants.util.dirutil import relative_symlink, safe_mkdir, safe_rmtree
 
@@ -33,6 +34,9 @@ class Reporting(Subsystem):
     register('--reports-dir', advanced=True, metavar='<dir>',
              default=os.path.join(register.bootstrap.pants_workdir, 'reports'),
              help='Write reports to this dir.')
+    register('--trace-file', advanced=True, metavar='<path>', default=None,
+             help='Stream the start and end of each workunit to this file in Chrome trace-event '
+                  'format, for viewing the run as a timeline in chrome://tracing.')
     register('--template-dir', advanced=True, metavar='<dir>', default=None,
              help='Find templates for rendering in this dir.')
     register('--console-label-format', advanced=True, type=dict_option,
@@ -85,6 +89,13 @@ class Reporting(Subsystem):
     html_reporter = HtmlReporter(run_tracker, html_reporter_settings)
     report.add_reporter('html', html_reporter)
 
+    # Set up trace reporting, if requested.
+    if self.get_options().trace_file:
+      trace_file = os.path.abspath(self.get_options().trace_file)
+      trace_reporter_settings = TraceReporter.Settings(log_level=Report.INFO, trace_file=trace_file)
+      report.add_reporter('trace', TraceReporter(run_tracker, trace_reporter_settings))
+      run_tracker.run_info.add_info('trace_file', trace_file)
+
     # Add some useful RunInfo.
     run_tracker.run_info.add_info('default_report', html_reporter.report_path())
     port = ReportingServerManager().socket
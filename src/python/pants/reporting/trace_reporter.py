@@ -0,0 +1,99 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import os
+import threading
+from collections import namedtuple
+
+from pants.base.workunit import WorkUnit
+from pants.reporting.report_writer import ReportWriter
+from pants.reporting.reporter import Reporter
+from pants.util.dirutil import safe_mkdir_for
+
+
+class TraceReporter(Reporter):
+  """Streams workunit begin and end events to a file in Chrome trace-event format.
+
+  The file can be loaded into chrome://tracing (or any viewer that understands the format) to see
+  the timeline of a run, with one track per thread that ran workunits.
+
+  Events are written as the workunits start and end, via a `ReportWriter`, in the JSON array
+  format.  The closing bracket is only written when the report is closed, but viewers accept
+  traces without it, so the trace of a run that dies part way through can still be loaded.
+  """
+
+  # Trace settings.
+  #   trace_file: The path to write the trace to.
+  Settings = namedtuple('Settings', Reporter.Settings._fields + ('trace_file',))
+
+  _separators = (',', ':')
+
+  def __init__(self, run_tracker, settings):
+    super(TraceReporter, self).__init__(run_tracker, settings)
+    self._trace_file = settings.trace_file
+    self._writer = ReportWriter(os.path.dirname(self._trace_file), name='trace-writer')
+    self._pid = os.getpid()
+
+    # The thread ids that have been named in the trace so far.
+    self._named_tids = set()
+
+    # We end each workunit's event on the track it began on, since the viewers pair begin and end
+    # events by thread; the background root workunit, for one, can end on a different thread.
+    self._tids = {}  # workunit id -> thread id.
+
+  def open(self):
+    """Implementation of Reporter callback."""
+    safe_mkdir_for(self._trace_file)
+    self._writer.start()
+    self._writer.append(self._trace_file, '[\n')
+    self._emit(name='process_name', ph='M', args={'name': 'pants'})
+
+  def close(self):
+    """Implementation of Reporter callback."""
+    # Close with an event that doesn't need a trailing comma, so the complete trace is valid JSON.
+    self._writer.append(self._trace_file, self._event(name='process_sort_index', ph='M',
+                                                      args={'sort_index': 0}))
+    self._writer.append(self._trace_file, '\n]\n')
+    self._writer.close()
+
+  def start_workunit(self, workunit):
+    """Implementation of Reporter callback."""
+    thread = threading.current_thread()
+    tid = thread.ident
+    if tid not in self._named_tids:
+      self._named_tids.add(tid)
+      self._emit(name='thread_name', ph='M', tid=tid, args={'name': thread.name})
+    self._tids[workunit.id] = tid
+    self._emit(name=workunit.name,
+               cat=','.join(sorted(workunit.labels)),
+               ph='B',
+               ts=self._micros(workunit.start_time),
+               tid=tid,
+               args={'path': workunit.path(), 'cmd': workunit.cmd} if workunit.cmd else
+                    {'path': workunit.path()})
+
+  def end_workunit(self, workunit):
+    """Implementation of Reporter callback."""
+    tid = self._tids.pop(workunit.id, None) or threading.current_thread().ident
+    self._emit(name=workunit.name,
+               cat=','.join(sorted(workunit.labels)),
+               ph='E',
+               ts=self._micros(workunit.end_time),
+               tid=tid,
+               args={'outcome': WorkUnit.outcome_string(workunit.outcome())})
+
+  @staticmethod
+  def _micros(secs):
+    return int(secs * 1000000)
+
+  def _event(self, tid=0, **event):
+    event.update(pid=self._pid, tid=tid)
+    return json.dumps(event, separators=self._separators, sort_keys=True)
+
+  def _emit(self, **event):
+    self._writer.append(self._trace_file, self._event(**event) + ',\n')
@@ -6,9 +6,12 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import posixpath
 import StringIO
 import subprocess
+import threading
 import traceback
+from collections import OrderedDict
 from contextlib import contextmanager
 
 from pants.scm.scm import Scm
@@ -275,6 +278,29 @@ class Git(Scm):
     return GitRepositoryReader(self, rev)
 
 
+class _TreeCache(object):
+  """A thread-safe LRU cache of parsed git trees, keyed by tree sha."""
+
+  def __init__(self, max_entries):
+    self._max_entries = max_entries
+    self._trees = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, sha):
+    with self._lock:
+      tree = self._trees.pop(sha, None)
+      if tree is not None:
+        self._trees[sha] = tree
+      return tree
+
+  def put(self, sha, tree):
+    with self._lock:
+      self._trees.pop(sha, None)
+      self._trees[sha] = tree
+      while len(self._trees) > self._max_entries:
+        self._trees.popitem(last=False)
+
+
 class GitRepositoryReader(object):
   """
   Allows reading from files and directory information from an arbitrary git
@@ -282,13 +308,21 @@ class GitRepositoryReader(object):
 
   """
 
+  # A tree's contents are fixed by its sha, so parsed trees are shared by the readers of all revs.
+  _tree_cache = _TreeCache(max_entries=100000)
+
   def __init__(self, scm, rev):
     self.scm = scm
     self.rev = rev
     self._cat_file_process = None
     # Trees is a dict from path to [list of Dir, Symlink or File objects]
     self._trees = {}
+    self._root_tree_sha = None
     self._realpath_cache = {'.': './', '': './'}
+    # A dict from symlink blob sha to the symlink's target.
+    self._symlink_targets = {}
+    # The paths whose whole subtree has been read into _trees.
+    self._listed_paths = set()
 
   def _maybe_start_cat_file_process(self):
     if not self._cat_file_process:
@@ -397,6 +431,97 @@ class GitRepositoryReader(object):
     tree = self._read_tree(path[:-1])
     return tree.keys()
 
+  def walk(self, relpath, topdown=True):
+    """Like os.walk, but reads from the git repository.
+
+    The whole subtree is listed with a single `git ls-tree -r` rather than by reading its trees
+    one at a time.  Like `isdir`, this follows symlinks to directories within the repo.
+
+    :returns: a generator of (dirpath, dirnames, filenames) tuples.
+    """
+    path = self._safe_realpath(relpath)
+    if not path or not path.endswith('/'):
+      return
+    path = self._fixup_dot_relative(path[:-1])
+    if not self._is_listed(path):
+      self._read_subtrees(path)
+    for item in self._walk_trees(relpath, path, topdown):
+      yield item
+
+  def _walk_trees(self, relpath, path, topdown):
+    tree = self._read_tree(path)
+    dirnames = []
+    filenames = []
+    for name, obj in tree.items():
+      if isinstance(obj, self.Dir) or (isinstance(obj, self.Symlink) and
+                                       self.isdir(os.path.join(relpath, name))):
+        dirnames.append(name)
+      else:
+        filenames.append(name)
+
+    if topdown:
+      yield (relpath, dirnames, filenames)
+
+    for name in dirnames:
+      if isinstance(tree[name], self.Dir):
+        children = self._walk_trees(os.path.join(relpath, name), posixpath.join(path, name),
+                                    topdown)
+      else:
+        children = self.walk(os.path.join(relpath, name), topdown)
+      for item in children:
+        yield item
+
+    if not topdown:
+      yield (relpath, dirnames, filenames)
+
+  def _is_listed(self, path):
+    while True:
+      if path in self._listed_paths:
+        return True
+      if not path:
+        return False
+      path = posixpath.dirname(path)
+
+  def _read_subtrees(self, path):
+    """Read the tree at path and all the trees under it, with a single `git ls-tree -r`."""
+    cmd = self.scm._create_git_cmdline(['ls-tree', '-r', '-t', '-z', '{}:{}'.format(self.rev, path)])
+    process, out = self.scm._invoke(cmd)
+    if process.returncode != 0:
+      raise self.GitDiedException("Git ls-tree failed while trying to list '{}'.".format(path))
+
+    # Each record is (mode ' ' type ' ' sha '\t' path), and trees are listed before their contents.
+    trees = {EMPTY_STRING: {}}
+    symlink_shas = set()
+    for record in out.split(NUL):
+      if not record:
+        continue
+      info, relpath = record.split(b'\t', 1)
+      mode, _, sha = info.split(SPACE)
+      parent, name = posixpath.split(relpath)
+      obj = self._make_object(mode, name, sha)
+      trees.setdefault(parent, {})[name] = obj
+      if isinstance(obj, self.Dir):
+        trees.setdefault(relpath, {})
+      elif isinstance(obj, self.Symlink) and sha not in self._symlink_targets:
+        symlink_shas.add(sha)
+
+    subpaths = [posixpath.join(path, relpath) if relpath else path for relpath in trees]
+    for subpath, tree in zip(subpaths, trees.values()):
+      self._trees.setdefault(subpath, tree)
+    for subpath in subpaths:
+      sha = self._tree_sha(subpath)
+      if sha:
+        self._tree_cache.put(sha, self._trees[subpath])
+    self._listed_paths.add(path)
+
+    # Walks follow symlinks to find out which are directories, so fetch their targets up front.
+    symlink_shas = list(symlink_shas)
+    for sha, result in zip(symlink_shas, self._read_objects_from_repo(symlink_shas)):
+      if result:
+        _, object_type, data = result
+        assert object_type == 'blob'
+        self._symlink_targets[sha] = data
+
   @contextmanager
   def open(self, relpath):
     """Read a file out of the repository at a certain revision.
@@ -473,8 +598,7 @@ class GitRepositoryReader(object):
           raise self.SymlinkLoopException(self.rev, relpath)
         # A git symlink is stored as a blob containing the name of the target.
         # Read that blob.
-        object_type, path_data = self._read_object_from_repo(sha=obj.sha)
-        assert object_type == 'blob'
+        path_data = self._read_symlink(obj.sha)
 
         if path_data[0] == '/':
           # In the event of an absolute path, just return that path
@@ -511,11 +635,34 @@ class GitRepositoryReader(object):
     path = self._fixup_dot_relative(path)
 
     tree = self._trees.get(path)
-    if tree:
+    if tree is not None:
       return tree
+
+    sha = self._tree_sha(path)
+    tree = self._tree_cache.get(sha) if sha else None
+    if tree is None:
+      if sha:
+        object_type, tree_data = self._read_object_from_repo(sha=sha)
+      else:
+        sha, object_type, tree_data = self._read_object_with_sha(rev=self.rev, relpath=path)
+        if not path:
+          self._root_tree_sha = sha
+      assert object_type == 'tree'
+      tree = self._parse_tree(tree_data)
+      self._tree_cache.put(sha, tree)
+    self._trees[path] = tree
+    return tree
+
+  def _tree_sha(self, path):
+    """Return the sha of the tree at path, if known from its already read parent tree."""
+    if not path:
+      return self._root_tree_sha
+    parent_path, name = posixpath.split(path)
+    obj = self._trees.get(parent_path, {}).get(name)
+    return obj.sha if isinstance(obj, self.Dir) else None
+
+  def _parse_tree(self, tree_data):
     tree = {}
-    object_type, tree_data = self._read_object_from_repo(rev=self.rev, relpath=path)
-    assert object_type == 'tree'
     # The tree data here is (mode ' ' filename \0 20-byte-sha)*
     i = 0
     while i < len(tree_data):
@@ -530,30 +677,76 @@ class GitRepositoryReader(object):
       name = tree_data[start:i]
       sha = tree_data[i + 1:i + 1 + GIT_HASH_LENGTH].encode('hex')
       i += 1 + GIT_HASH_LENGTH
-      if mode == '120000':
-        tree[name] = self.Symlink(name, sha)
-      elif mode == '40000':
-        tree[name] = self.Dir(name, sha)
-      else:
-        tree[name] = self.File(name, sha)
-    self._trees[path] = tree
+      tree[name] = self._make_object(mode, name, sha)
     return tree
 
+  def _make_object(self, mode, name, sha):
+    if mode == '120000':
+      return self.Symlink(name, sha)
+    elif mode in ('40000', '040000'):  # cat-file and ls-tree format tree modes differently.
+      return self.Dir(name, sha)
+    else:
+      return self.File(name, sha)
+
+  def _read_symlink(self, sha):
+    """Return the target of the symlink stored in the blob with the given sha."""
+    # A git symlink is stored as a blob containing the name of the target.
+    path_data = self._symlink_targets.get(sha)
+    if path_data is None:
+      object_type, path_data = self._read_object_from_repo(sha=sha)
+      assert object_type == 'blob'
+      self._symlink_targets[sha] = path_data
+    return path_data
+
   def _read_object_from_repo(self, rev=None, relpath=None, sha=None):
     """Read an object from the git repo.
     This is implemented via a pipe to git cat-file --batch
     """
+    _, object_type, blob = self._read_object_with_sha(rev=rev, relpath=relpath, sha=sha)
+    return object_type, blob
+
+  def _read_object_with_sha(self, rev=None, relpath=None, sha=None):
     if sha:
-      spec = sha + '\n'
+      spec = sha
     else:
       assert rev is not None
       assert relpath is not None
       relpath = self._fixup_dot_relative(relpath)
-      spec = '{}:{}\n'.format(rev, relpath)
+      spec = '{}:{}'.format(rev, relpath)
+
+    result = self._read_objects_from_repo([spec])[0]
+    if result is None:
+      raise self.MissingFileException(rev, relpath)
+    return result
+
+  def _read_objects_from_repo(self, specs):
+    """Read objects from the git repo, pipelining the requests to git cat-file --batch.
 
+    :returns: a list with a (sha, object type, data) tuple for each spec, or None if the spec
+              names a missing object.
+    """
+    if not specs:
+      return []
     self._maybe_start_cat_file_process()
-    self._cat_file_process.stdin.write(spec)
+    requests = ''.join('{}\n'.format(spec) for spec in specs)
+    if len(specs) == 1:
+      self._write_requests(requests)
+      return [self._read_response(requests)]
+
+    # Git stops reading requests while its output pipe is full, so we must read responses while
+    # writing requests.
+    writer = threading.Thread(target=self._write_requests, args=(requests,))
+    writer.daemon = True
+    writer.start()
+    responses = [self._read_response('{}\n'.format(spec)) for spec in specs]
+    writer.join()
+    return responses
+
+  def _write_requests(self, requests):
+    self._cat_file_process.stdin.write(requests)
     self._cat_file_process.stdin.flush()
+
+  def _read_response(self, spec):
     header = None
     while not header:
       header = self._cat_file_process.stdout.readline()
@@ -564,9 +757,9 @@ class GitRepositoryReader(object):
     parts = header.rsplit(SPACE, 2)
     if len(parts) == 2:
       assert parts[1] == 'missing'
-      raise self.MissingFileException(rev, relpath)
+      return None
 
-    _, object_type, object_len = parts
+    sha, object_type, object_len = parts
 
     # Read the object data
     blob = self._cat_file_process.stdout.read(int(object_len))
@@ -574,7 +767,7 @@ class GitRepositoryReader(object):
     # Read the trailing newline
     assert self._cat_file_process.stdout.read(1) == '\n'
     assert len(blob) == int(object_len)
-    return object_type, blob
+    return sha, object_type, blob
 
   def __del__(self):
     if self._cat_file_process:
@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
 
 from pants.subsystem.subsystem import Subsystem
@@ -25,23 +26,40 @@ class StatsDBFactory(Subsystem):
              default=os.path.join(register.bootstrap.pants_bootstrapdir, 'stats', 'statsdb.sqlite'),
              help='Location of statsdb file.')
 
+  def __init__(self, *args, **kwargs):
+    super(StatsDBFactory, self).__init__(*args, **kwargs)
+    self._db = None
+
   def get_db(self):
-    """Returns a StatsDB instance configured by this factory."""
-    ret = StatsDB(self.get_options().path)
-    ret.ensure_tables()
-    return ret
+    """Returns the StatsDB instance configured by this factory."""
+    if self._db is None:
+      self._db = StatsDB(self.get_options().path)
+      self._db.ensure_tables()
+    return self._db
 
 
 class StatsDB(object):
+  """A local sqlite database of the stats of pants runs.
+
+  A `StatsDB` holds a single connection open for its lifetime, in write-ahead logging mode so that
+  readers (eg: the reporting server) don't block the writes at the end of each run, and each run's
+  stats are inserted in one batched transaction.
+  """
+
+  _TIMING_TABLES = ('cumulative_timings', 'self_timings')
+
   def __init__(self, path):
     super(StatsDB, self).__init__()
     self._path = path
+    self._conn = None
+    self._conn_pid = None
+    self._lock = threading.RLock()
 
   def ensure_tables(self):
     with self._cursor() as c:
-      def create_index(tab, col):
-        c.execute("""CREATE INDEX IF NOT EXISTS {tab}_{col}_idx ON {tab}({col})""".format(
-          tab=tab, col=col))
+      def create_index(tab, *cols):
+        c.execute("""CREATE INDEX IF NOT EXISTS {tab}_{name}_idx ON {tab}({cols})""".format(
+          tab=tab, name='_'.join(cols), cols=', '.join(cols)))
 
       c.execute("""
         CREATE TABLE IF NOT EXISTS run_info (
@@ -56,6 +74,7 @@ class StatsDB(object):
         )
       """)
       create_index('run_info', 'cmd_line')
+      create_index('run_info', 'timestamp')
 
       def create_timings_table(tab):
         c.execute("""
@@ -67,50 +86,76 @@ class StatsDB(object):
           )
         """.format(tab=tab))
         create_index(tab, 'label')
+        create_index(tab, 'run_info_id')
 
-      create_timings_table('cumulative_timings')
-      create_timings_table('self_timings')
+      for table in self._TIMING_TABLES:
+        create_timings_table(table)
+
+      c.execute("""
+        CREATE TABLE IF NOT EXISTS artifact_cache_stats (
+          run_info_id TEXT,
+          cache_name TEXT,
+          target TEXT,
+          hit INTEGER,  -- 1 for a hit, 0 for a miss.
+          FOREIGN KEY (run_info_id) REFERENCES run_info(id)
+        )
+      """)
+      create_index('artifact_cache_stats', 'target')
+      create_index('artifact_cache_stats', 'run_info_id')
 
   def insert_stats(self, stats):
     try:
-      with self._cursor() as c:
-        ri = stats['run_info']
+      ri = stats['run_info']
+      try:
+        run_info_row = [ri['id'], int(float(ri['timestamp'])), ri['machine'], ri['user'],
+                        ri['version'], ri['buildroot'], ri['outcome'], ri['cmd_line']]
+      except KeyError as e:
+        raise StatsDBError('Failed to insert stats. Key {} not found in RunInfo: {}'.format(
+          e.args[0], str(ri)))
+
+      rid = ri['id']
+      timing_rows = {}
+      for table in self._TIMING_TABLES:
+        timing_rows[table] = rows = []
+        for timing in stats[table]:
+          try:
+            rows.append((rid, timing['label'], self._to_ms(timing['timing'])))
+          except KeyError as e:
+            raise StatsDBError('Failed to insert stats. Key {} not found in timing: {}'.format(
+              e.args[0], str(timing)))
+
+      # Older stats may not have cache stats; the hits and misses are (target, cause) pairs.
+      cache_rows = []
+      for cache_stat in stats.get('artifact_cache_stats', ()):
         try:
-          c.execute("""INSERT INTO run_info VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    [ri['id'], int(float(ri['timestamp'])), ri['machine'], ri['user'],
-                     ri['version'], ri['buildroot'], ri['outcome'], ri['cmd_line']])
+          for hit, key in ((1, 'hits'), (0, 'misses')):
+            cache_rows.extend((rid, cache_stat['cache_name'], target_and_cause[0], hit)
+                              for target_and_cause in cache_stat[key])
         except KeyError as e:
-          raise StatsDBError('Failed to insert stats. Key {} not found in RunInfo: {}'.format(
-            e.args[0], str(ri)))
-
-        rid = ri['id']
-        for table in ['cumulative_timings', 'self_timings']:
-          timings = stats[table]
-          for timing in timings:
-            try:
-              c.execute("""INSERT INTO {} VALUES (?, ?, ?)""".format(table),
-                        [rid, timing['label'], self._to_ms(timing['timing'])])
-            except KeyError as e:
-              raise StatsDBError('Failed to insert stats. Key {} not found in timing: {}'.format(
-                e.args[0], str(timing)))
-
+          raise StatsDBError('Failed to insert stats. Key {} not found in cache stats: {}'.format(
+            e.args[0], str(cache_stat)))
     except KeyError as e:
       raise StatsDBError('Failed to insert stats. Key {} not found in stats object.'.format(
         e.args[0]))
 
+    with self._cursor() as c:
+      c.execute("""INSERT INTO run_info VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", run_info_row)
+      for table, rows in timing_rows.items():
+        c.executemany("""INSERT INTO {} VALUES (?, ?, ?)""".format(table), rows)
+      c.executemany("""INSERT INTO artifact_cache_stats VALUES (?, ?, ?, ?)""", cache_rows)
+
   def get_stats_for_cmd_line(self, timing_table, cmd_line_like):
     """Returns a generator over all (label, timing) pairs for a given cmd line.
 
     :param timing_table: One of 'cumulative_timings' or 'self_timings'.
     :param cmd_line_like: Look at all cmd lines that are LIKE this string, in the sql sense.
     """
-    with self._cursor() as c:
-      for row in c.execute("""
-        SELECT t.label, t.timing
-        FROM {} AS t INNER JOIN run_info AS ri ON (t.run_info_id=ri.id)
-        WHERE ri.cmd_line LIKE ?
-      """.format(timing_table), [cmd_line_like]):
-        yield row
+    where, args = self._cmd_line_clause(cmd_line_like)
+    return self._query("""
+      SELECT t.label, t.timing
+      FROM {} AS t INNER JOIN run_info AS ri ON (t.run_info_id=ri.id)
+      {}
+    """.format(timing_table, where), args)
 
   def get_aggregated_stats_for_cmd_line(self, timing_table, cmd_line_like):
     """Returns a generator over aggregated stats for a given cmd line.
@@ -118,15 +163,82 @@ class StatsDB(object):
     :param timing_table: One of 'cumulative_timings' or 'self_timings'.
     :param cmd_line_like: Look at all cmd lines that are LIKE this string, in the sql sense.
     """
+    where, args = self._cmd_line_clause(cmd_line_like)
+    return self._query("""
+        SELECT date(ri.timestamp, 'unixepoch') as dt, t.label as label, count(*), sum(t.timing)
+        FROM {} AS t INNER JOIN run_info AS ri ON (t.run_info_id=ri.id)
+        {}
+        GROUP BY dt, label
+        ORDER BY dt, label
+      """.format(timing_table, where), args)
+
+  def get_timing_history(self, timing_table, label, since=None, limit=None):
+    """Returns a generator over the (timestamp, timing) of a label, most recent run first.
+
+    Labels are workunit paths, eg: 'main:compile:zinc' for the zinc compile task.
+
+    :param timing_table: One of 'cumulative_timings' or 'self_timings'.
+    :param string label: The label to fetch the history of.
+    :param int since: Only consider runs at or after this time, in seconds since the epoch.
+    :param int limit: Only return the history of this many of the most recent runs.
+    """
+    return self._query("""
+      SELECT ri.timestamp, t.timing
+      FROM {} AS t INNER JOIN run_info AS ri ON (t.run_info_id=ri.id)
+      WHERE t.label=? AND ri.timestamp>=?
+      ORDER BY ri.timestamp DESC
+      LIMIT ?
+    """.format(timing_table), [label, since or 0, -1 if limit is None else limit])
+
+  def get_mean_timings(self, timing_table, label_like='%', since=None):
+    """Returns a generator over (label, runs, mean timing) for labels, ordered by label.
+
+    :param timing_table: One of 'cumulative_timings' or 'self_timings'.
+    :param string label_like: Only consider labels that are LIKE this string, in the sql sense.
+    :param int since: Only consider runs at or after this time, in seconds since the epoch.
+    """
+    return self._query("""
+      SELECT t.label, count(*), avg(t.timing)
+      FROM {} AS t INNER JOIN run_info AS ri ON (t.run_info_id=ri.id)
+      WHERE t.label LIKE ? AND ri.timestamp>=?
+      GROUP BY t.label
+      ORDER BY t.label
+    """.format(timing_table), [label_like, since or 0])
+
+  def get_cache_hit_rates(self, target_like='%', since=None):
+    """Returns a generator over (target, hits, misses) for targets, ordered by target.
+
+    :param string target_like: Only consider target addresses that are LIKE this string, in the
+                               sql sense.
+    :param int since: Only consider runs at or after this time, in seconds since the epoch.
+    """
+    return self._query("""
+      SELECT a.target, sum(a.hit), count(*) - sum(a.hit)
+      FROM artifact_cache_stats AS a INNER JOIN run_info AS ri ON (a.run_info_id=ri.id)
+      WHERE a.target LIKE ? AND ri.timestamp>=?
+      GROUP BY a.target
+      ORDER BY a.target
+    """, [target_like, since or 0])
+
+  def close(self):
+    """Close the connection to the underlying database, if open."""
+    with self._lock:
+      if self._conn is not None:
+        self._conn.close()
+        self._conn = None
+
+  @staticmethod
+  def _cmd_line_clause(cmd_line_like):
+    # Matching everything is the common case, and is much faster without the LIKE.
+    if cmd_line_like == '%':
+      return '', []
+    return 'WHERE ri.cmd_line LIKE ?', [cmd_line_like]
+
+  def _query(self, sql, args):
+    # Fetch eagerly, so callers don't hold the connection while they consume the results.
     with self._cursor() as c:
-      for row in c.execute("""
-          SELECT date(ri.timestamp, 'unixepoch') as dt, t.label as label, count(*), sum(t.timing)
-          FROM {} AS t INNER JOIN run_info AS ri ON (t.run_info_id=ri.id)
-          WHERE ri.cmd_line LIKE ?
-          GROUP BY dt, label
-          ORDER BY dt, label
-        """.format(timing_table), [cmd_line_like]):
-        yield row
+      rows = c.execute(sql, args).fetchall()
+    return iter(rows)
 
   @staticmethod
   def _to_ms(timing_secs):
@@ -135,10 +247,16 @@ class StatsDB(object):
 
   @contextmanager
   def _connection(self):
-    conn = sqlite3.connect(self._path)
-    yield conn
-    conn.commit()
-    conn.close()
+    with self._lock:
+      # sqlite connections must not be used across a fork; eg: by pantsd.
+      if self._conn is None or self._conn_pid != os.getpid():
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn_pid = os.getpid()
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+      # Commits on success and rolls back on failure.
+      with self._conn:
+        yield self._conn
 
   @contextmanager
   def _cursor(self):
@@ -0,0 +1,55 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import unittest
+from textwrap import dedent
+
+from pants.backend.codegen.tasks.protobuf_parse import ProtobufParse
+
+
+class ProtobufParseTest(unittest.TestCase):
+
+  def test_defaults(self):
+    parse = ProtobufParse('com/example/distance_2d-units.proto', dedent("""
+      package com.example;
+
+      message Distance {
+        enum Unit { METERS = 1; }
+        optional Unit unit = 1;
+      }
+    """))
+    self.assertEqual('com.example', parse.java_package)
+    self.assertEqual('Distance2DUnits', parse.outer_class_name)
+    self.assertEqual(['Distance'], parse.messages)
+    self.assertEqual([], parse.enums)
+    self.assertEqual(['com/example/Distance2DUnits.java'], parse.java_sources())
+
+  def test_java_options(self):
+    parse = ProtobufParse('example.proto', dedent("""
+      package example;  // message Commented {}
+      option java_package = "org.pantsbuild.example";
+      option java_outer_classname = "Protos";
+      option java_multiple_files = true;
+
+      /* enum AlsoCommented {
+      } */
+      message Person {
+        option deprecated = true;
+        message Address {}
+      }
+      enum Color { RED = 1; }
+      service Directory {
+        rpc Lookup (Person) returns (Person);
+      }
+    """))
+    self.assertEqual('org.pantsbuild.example', parse.java_package)
+    self.assertEqual(['org/pantsbuild/example/Protos.java',
+                      'org/pantsbuild/example/Person.java',
+                      'org/pantsbuild/example/PersonOrBuilder.java',
+                      'org/pantsbuild/example/Color.java'],
+                     parse.java_sources())
+    self.assertEqual(['Directory'], parse.services)
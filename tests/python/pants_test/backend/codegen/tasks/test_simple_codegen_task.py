@@ -61,6 +61,9 @@ class DummyGen(SimpleCodegenTask):
     self._all_targets = None
     self.setup_for_testing(None, None)
     self.execution_counts = 0
+    self.executed_targets = []
+    self.executed_batches = []
+    self.misattribute_batches = False
 
   def setup_for_testing(self, test_case, all_targets):
     """Gets this dummy generator class ready for testing.
@@ -78,7 +81,23 @@ class DummyGen(SimpleCodegenTask):
 
   def execute_codegen(self, target, target_workdir):
     self.execution_counts += 1
+    self.executed_targets.append(target)
+    self._generate(target, target_workdir)
 
+  def batch_key(self, target):
+    return 'dummy'
+
+  def execute_codegen_batch(self, targets, batch_workdir):
+    self.executed_batches.append(targets)
+    for target in targets:
+      self._generate(target, batch_workdir)
+
+  def find_batch_sources(self, target, batch_workdir):
+    sources = [os.path.relpath(path, batch_workdir)
+               for path in self._dummy_sources_to_generate(target, batch_workdir)]
+    return sources[1:] if self.misattribute_batches else sources
+
+  def _generate(self, target, target_workdir):
     for path in self._dummy_sources_to_generate(target, target_workdir):
       class_name = os.path.basename(path).split('.')[0]
       package_name = os.path.relpath(os.path.dirname(path),
@@ -137,7 +156,7 @@ class SimpleCodegenTaskTest(TaskTestBase):
         '''.format(name=spec_name)))
     return set([self.target(spec) for spec in target_specs])
 
-  def _test_execute_strategy(self, strategy, expected_execution_count):
+  def _test_execute_strategy(self, strategy, expected_execution_count, **options):
     dummy_suffixes = ['a', 'b', 'c']
 
     self.add_to_build_file('gen-lib', '\n'.join(dedent('''
@@ -151,7 +170,7 @@ class SimpleCodegenTaskTest(TaskTestBase):
                        'org.pantsbuild.example Foo{0}'.format(suffix))
 
     targets = [self.target('gen-lib:{suffix}'.format(suffix=suffix)) for suffix in dummy_suffixes]
-    task = self._create_dummy_task(target_roots=targets, strategy=strategy)
+    task = self._create_dummy_task(target_roots=targets, strategy=strategy, **options)
     expected_targets = set(targets)
     found_targets = set(task.codegen_targets())
     self.assertEqual(expected_targets, found_targets,
@@ -167,6 +186,9 @@ class SimpleCodegenTaskTest(TaskTestBase):
   def test_execute_isolated(self):
     self._test_execute_strategy('isolated', 3)
 
+  def test_execute_concurrently(self):
+    self._test_execute_strategy('isolated', 3, worker_count=2)
+
   def _get_duplication_test_targets(self):
     self.add_to_build_file('gen-parent', dedent('''
       dummy_library(name='gen-parent',
@@ -246,6 +268,57 @@ class SimpleCodegenTaskTest(TaskTestBase):
     self._do_test_duplication(targets, allow_dups=False, should_fail=False)
     self._do_test_duplication(targets, allow_dups=True, should_fail=False)
 
+  def test_execute_concurrently_in_dependency_order(self):
+    parent, good, bad = self._get_duplication_test_targets()
+    task = self._create_dummy_task(target_roots=[parent, good, bad], strategy='isolated',
+                                   allow_dups=True, worker_count=3)
+    task.execute()
+    # Dependencies are always generated before their dependees.
+    self.assertEqual(parent, task.executed_targets[0])
+    self.assertEqual({good, bad}, set(task.executed_targets[1:]))
+    # And every target still has its synthetic target injected.
+    self.assertEqual({parent, good, bad},
+                     set(t.derived_from for t in task.context.targets() if t.is_synthetic))
+
+  def _synthetic_sources(self, task):
+    return {t.derived_from: set(t.sources_relative_to_source_root())
+            for t in task.context.targets() if t.is_synthetic}
+
+  def test_execute_batched(self):
+    parent, good, bad = self._get_duplication_test_targets()
+    task = self._create_dummy_task(target_roots=[parent, good, bad], strategy='isolated',
+                                   allow_dups=True, batch_size=2)
+    task.execute()
+    # The parent is generated on its own, since its dependees can't be generated alongside it.
+    self.assertEqual([parent], task.executed_targets)
+    self.assertEqual([{good, bad}], [set(batch) for batch in task.executed_batches])
+    self.assertEqual({parent: {'org/pantsbuild/example/ParentClass'},
+                      good: {'org/pantsbuild/example/ChildClass'},
+                      bad: {'org/pantsbuild/example/ParentClass',
+                            'org/pantsbuild/example/ChildClass'}},
+                     self._synthetic_sources(task))
+
+  def test_execute_batched_unattributed(self):
+    for name in ('a', 'b'):
+      self.add_to_build_file('gen-lib', dedent('''
+        dummy_library(name='{name}',
+          sources=['{name}.dummy'],
+        )
+      '''.format(name=name)))
+      self.create_file('gen-lib/{}.dummy'.format(name),
+                       'org.pantsbuild.example Foo{0}\norg.pantsbuild.example Bar{0}'.format(name))
+    targets = {self.target('gen-lib:a'), self.target('gen-lib:b')}
+    task = self._create_dummy_task(target_roots=targets, strategy='isolated', batch_size=2)
+    task.misattribute_batches = True
+    task.execute()
+    # Falls back to generating each target on its own.
+    self.assertEqual(1, len(task.executed_batches))
+    self.assertEqual(targets, set(task.executed_targets))
+    self.assertEqual({target: {'org/pantsbuild/example/Foo{}'.format(target.name),
+                               'org/pantsbuild/example/Bar{}'.format(target.name)}
+                      for target in targets},
+                     self._synthetic_sources(task))
+
   def test_copy_target_attributes(self):
     self.create_file('fleem/org/pantsbuild/example/fleem.dummy',
                      'org.pantsbuild.example Fleem')
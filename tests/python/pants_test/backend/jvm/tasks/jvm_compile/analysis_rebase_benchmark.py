@@ -0,0 +1,111 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Measures rebasing zinc analysis files with the `AnalysisRebaser` against the parser.
+
+Run with: ./pants run tests/python/pants_test/backend/jvm/tasks/jvm_compile:analysis_rebase_benchmark -- --buildroot=$PWD .pants.d/compile/zinc/*/*/current/analysis
+
+Each analysis is relativized and then localized again, as `AnalysisTools` does when it writes
+and reads artifacts, by both the parser and the rebaser; the outputs of the two are checked to be
+identical.  Pass analyses of large targets to see the difference: their files are often tens of MB.
+"""
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import re
+
+from pants.backend.jvm.tasks.jvm_compile.analysis_rebaser import AnalysisRebaser
+from pants.backend.jvm.tasks.jvm_compile.analysis_tools import AnalysisTools
+from pants.backend.jvm.tasks.jvm_compile.zinc.zinc_analysis_parser import ZincAnalysisParser
+from pants.util.contextutil import temporary_dir
+from pants_test.testutils.benchmark import benchmark_parser, best_of
+
+
+def rebase_with_parser(parser, analysis_path, output_path, rebase_mappings, java_home):
+  with temporary_dir() as tmpdir:
+    for index, (old_base, new_base) in enumerate(rebase_mappings):
+      rebased_path = os.path.join(tmpdir, 'analysis.{}'.format(index))
+      parser.rebase_from_path(analysis_path, rebased_path, old_base, new_base, java_home)
+      analysis_path = rebased_path
+    os.rename(analysis_path, output_path)
+
+
+def rebase_with_rebaser(rebaser, analysis_path, output_path, rebase_mappings, java_home):
+  if not rebaser.rebase_from_path(analysis_path, output_path, rebase_mappings, java_home):
+    raise ValueError('The rebaser deferred {} to the parser.'.format(analysis_path))
+
+
+def time_rebase(rebase_fn, rebaser, analysis_path, output_path, rebase_mappings, java_home, runs):
+  elapsed, _ = best_of(runs, rebase_fn, rebaser, analysis_path, output_path, rebase_mappings,
+                       java_home)
+  return elapsed
+
+
+# Zinc records the jars of the java home it compiled against, rt.jar among them, as binary
+# dependencies: `/src/A.scala -> /usr/lib/jvm/java-8/jre/lib/rt.jar`.
+_RT_JAR = re.compile(br' -> (.+?)(?:/jre)?/lib/rt\.jar\n')
+
+
+def infer_java_home(analysis_path):
+  match = _RT_JAR.search(read(analysis_path))
+  return match.group(1).decode('utf-8') if match else None
+
+
+def read(path):
+  with open(path, 'rb') as fp:
+    return fp.read()
+
+
+def main():
+  parser = benchmark_parser(__doc__)
+  parser.add_argument('analyses', nargs='+', help='The zinc analysis files to rebase.')
+  parser.add_argument('--buildroot', default=os.getcwd(),
+                      help='The build root the analyses were written under.')
+  parser.add_argument('--workdir', default=None,
+                      help='The pants workdir the analyses were written under; .pants.d in the '
+                           'build root by default.')
+  parser.add_argument('--java-home', default=None,
+                      help='The java home whose references are dropped when relativizing; by '
+                           'default, the one whose rt.jar each analysis depends on.')
+  args = parser.parse_args()
+
+  buildroot = args.buildroot.encode('utf-8')
+  workdir = (args.workdir or os.path.join(args.buildroot, '.pants.d')).encode('utf-8')
+  relativize_mappings = [(workdir, AnalysisTools._PANTS_WORKDIR_PLACEHOLDER),
+                         (buildroot, AnalysisTools._PANTS_BUILDROOT_PLACEHOLDER)]
+  localize_mappings = [(new_base, old_base) for old_base, new_base in relativize_mappings]
+
+  zinc_parser = ZincAnalysisParser()
+  rebaser = AnalysisRebaser(zinc_parser.current_test_header)
+
+  totals = {'parser': 0, 'rebaser': 0}
+  with temporary_dir() as tmpdir:
+    for analysis_path in args.analyses:
+      size_mb = os.path.getsize(analysis_path) / (1024 * 1024)
+      java_home = args.java_home or infer_java_home(analysis_path)
+      print('{}: java home {}'.format(analysis_path, java_home))
+      outputs = {}
+      for name, rebase_fn, rebase_with in (('parser', rebase_with_parser, zinc_parser),
+                                           ('rebaser', rebase_with_rebaser, rebaser)):
+        portable_path = os.path.join(tmpdir, '{}.portable'.format(name))
+        localized_path = os.path.join(tmpdir, '{}.localized'.format(name))
+        elapsed = time_rebase(rebase_fn, rebase_with, analysis_path, portable_path,
+                              relativize_mappings, java_home, args.runs)
+        elapsed += time_rebase(rebase_fn, rebase_with, portable_path, localized_path,
+                               localize_mappings, None, args.runs)
+        totals[name] += elapsed
+        outputs[name] = (read(portable_path), read(localized_path))
+        print('{}: {} ({:.1f}MB) in {:.3f}s'.format(name, analysis_path, size_mb, elapsed))
+      if outputs['parser'] != outputs['rebaser']:
+        raise AssertionError('The parser and the rebaser disagree on {}.'.format(analysis_path))
+
+  print('parser:  {:.3f}s'.format(totals['parser']))
+  print('rebaser: {:.3f}s ({:.1f}x faster)'.format(totals['rebaser'],
+                                                   totals['parser'] / totals['rebaser']))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,92 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Measures building the jvm compile job graph over a large generated graph of targets.
+
+Run with: ./pants run tests/python/pants_test/backend/jvm/tasks/jvm_compile:job_graph_benchmark -- --targets=5000
+
+Compares the construction `JvmCompile` uses, which depends each job on the reduced set of its
+nearest invalid dependencies, with depending each job on every invalid target in its closure.
+The closure construction is quadratic in the number of targets, so pass --no-closure to time just
+the reduced construction over graphs much beyond a thousand targets.
+"""
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import random
+
+from pants.base.execution_graph import ExecutionGraph, Job, reduced_dependencies
+from pants.build_graph.address import Address
+from pants.build_graph.build_graph import BuildGraph
+from pants.build_graph.target import Target
+from pants_test.testutils.benchmark import (add_generated_graph_options, benchmark_parser, best_of,
+                                              sample_dependencies)
+
+
+def generate_build_graph(targets, fanout, window, seed):
+  """Returns `targets` targets, each depending on up to `fanout` of the `window` before it."""
+  rng = random.Random(seed)
+  build_graph = BuildGraph(address_mapper=None)
+  generated = []
+  for index in range(targets):
+    address = Address.parse('src/java/t{}'.format(index))
+    dependencies = [generated[d].address for d in sample_dependencies(rng, index, fanout, window)]
+    target = Target(name=address.target_name, address=address, build_graph=build_graph)
+    build_graph.inject_target(target, dependencies=dependencies)
+    generated.append(target)
+  return generated
+
+
+def job(target, dependencies):
+  return Job('compile({})'.format(target.address.spec), lambda: None,
+             ['compile({})'.format(dependency.address.spec) for dependency in dependencies])
+
+
+def closure_jobs(invalid_targets):
+  invalid_target_set = set(invalid_targets)
+  return [job(target, (target.closure() & invalid_target_set) - [target])
+          for target in invalid_targets]
+
+
+def reduced_jobs(invalid_targets):
+  invalid_dependencies_by_target = reduced_dependencies(invalid_targets, lambda t: t.dependencies)
+  return [job(target, invalid_dependencies_by_target[target]) for target in invalid_targets]
+
+
+def time_jobs(jobs_fn, invalid_targets, runs):
+  def build_graph():
+    jobs = jobs_fn(invalid_targets)
+    ExecutionGraph(jobs)
+    return jobs
+
+  elapsed, jobs = best_of(runs, build_graph)
+  return elapsed, sum(len(j.dependencies) for j in jobs)
+
+
+def main():
+  parser = benchmark_parser(__doc__)
+  add_generated_graph_options(parser, targets=5000)
+  parser.add_argument('--invalid', type=float, default=1.0,
+                      help='The fraction of the targets that are invalid.')
+  parser.add_argument('--no-closure', dest='closure', action='store_false', default=True,
+                      help='Skip timing the closure construction for comparison.')
+  args = parser.parse_args()
+
+  targets = generate_build_graph(args.targets, args.fanout, args.window, args.seed)
+  rng = random.Random(args.seed)
+  invalid_targets = [t for t in targets if rng.random() < args.invalid]
+  print('Generated {} targets, {} invalid'.format(len(targets), len(invalid_targets)))
+
+  reduced, reduced_edges = time_jobs(reduced_jobs, invalid_targets, args.runs)
+  print('reduced: {:.3f}s, {} edges'.format(reduced, reduced_edges))
+
+  if args.closure:
+    closure, closure_edges = time_jobs(closure_jobs, invalid_targets, args.runs)
+    print('closure: {:.3f}s, {} edges ({:.1f}x slower)'.format(closure, closure_edges,
+                                                              closure / reduced))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,98 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+from collections import Counter
+
+from pants.backend.jvm.tasks.jvm_compile.analysis_index import AnalysisIndex
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class CountingParser(object):
+  """Parses the lines of a fake analysis as its products and dependencies."""
+
+  def __init__(self):
+    self.parses = Counter()
+
+  def parse_products_from_path(self, infile_path, classes_dir):
+    self.parses['products'] += 1
+    with open(infile_path, 'rb') as fp:
+      return {line: [os.path.join(classes_dir, line + b'.class')] for line in fp.read().split()}
+
+  def parse_deps_from_path(self, infile_path):
+    self.parses['deps'] += 1
+    with open(infile_path, 'rb') as fp:
+      return {line: {line + b'.dep'} for line in fp.read().split()}
+
+
+class AnalysisIndexTest(unittest.TestCase):
+
+  def setUp(self):
+    self.parser = CountingParser()
+
+  def rewrite(self, path, content):
+    # Rename into place, as compiles do.
+    safe_file_dump(path + '.tmp', content)
+    os.rename(path + '.tmp', path)
+
+  def test_parsed_once(self):
+    index = AnalysisIndex(self.parser)
+    with temporary_dir() as tmpdir:
+      analysis_file = os.path.join(tmpdir, 'a.analysis')
+      self.rewrite(analysis_file, 'A')
+
+      self.assertEqual({'A': ['/classes/A.class']}, index.products(analysis_file, '/classes'))
+      self.assertEqual({'A': ['/classes/A.class']}, index.products(analysis_file, '/classes'))
+      self.assertEqual({'A': ['/other/A.class']}, index.products(analysis_file, '/other'))
+      self.assertEqual({'A': {'A.dep'}}, index.deps(analysis_file))
+      self.assertEqual({'A': {'A.dep'}}, index.deps(analysis_file))
+      self.assertEqual(Counter(products=2, deps=1), self.parser.parses)
+
+      self.rewrite(analysis_file, 'B')
+      self.assertEqual({'B': {'B.dep'}}, index.deps(analysis_file))
+      self.assertEqual(Counter(products=2, deps=2), self.parser.parses)
+
+  def test_persisted(self):
+    with temporary_dir() as tmpdir:
+      cache_dir = os.path.join(tmpdir, 'index')
+      analysis_file = os.path.join(tmpdir, 'a.analysis')
+      self.rewrite(analysis_file, 'A')
+
+      self.assertEqual({'A': {'A.dep'}}, AnalysisIndex(self.parser, cache_dir).deps(analysis_file))
+      self.assertEqual(1, len(os.listdir(cache_dir)))
+
+      # A new index, as in a later run, loads the saved analysis for the same content.
+      self.rewrite(analysis_file, 'A')
+      index = AnalysisIndex(self.parser, cache_dir)
+      self.assertEqual({'A': {'A.dep'}}, index.deps(analysis_file))
+      self.assertEqual(Counter(deps=1), self.parser.parses)
+
+      self.rewrite(analysis_file, 'B')
+      self.assertEqual({'B': {'B.dep'}}, index.deps(analysis_file))
+      self.assertEqual(Counter(deps=2), self.parser.parses)
+      # The entry for the analysis is replaced rather than added to.
+      self.assertEqual(1, len(os.listdir(cache_dir)))
+
+      # A corrupt entry is parsed again.
+      for name in os.listdir(cache_dir):
+        safe_file_dump(os.path.join(cache_dir, name), 'garbage')
+      self.assertEqual({'B': {'B.dep'}}, AnalysisIndex(self.parser, cache_dir).deps(analysis_file))
+      self.assertEqual(Counter(deps=3), self.parser.parses)
+
+  def test_persisted_non_ascii_classes_dir(self):
+    with temporary_dir() as tmpdir:
+      cache_dir = os.path.join(tmpdir, 'index')
+      analysis_file = os.path.join(tmpdir, 'a.analysis')
+      self.rewrite(analysis_file, 'A')
+      classes_dir = b'/cl\xc3\xa4sses'
+
+      products = AnalysisIndex(self.parser, cache_dir).products(analysis_file, classes_dir)
+      self.assertEqual(products, AnalysisIndex(self.parser, cache_dir).products(analysis_file,
+                                                                                 classes_dir))
+      self.assertEqual(Counter(products=1), self.parser.parses)
@@ -0,0 +1,220 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.backend.jvm.tasks.jvm_compile.analysis_rebaser import AnalysisRebaser
+from pants.backend.jvm.tasks.jvm_compile.analysis_tools import AnalysisTools
+from pants.util.contextutil import temporary_dir
+
+
+HEADER = b'format version: 5\n'
+
+
+ANALYSIS = HEADER + b"""output mode:
+1 items
+0 -> single
+output directories:
+1 items
+output dir -> /buildroot/.pants.d/compile/zinc/current/classes
+compile options:
+1 items
+0 -> -javabootclasspath/jdk/jre/lib/rt.jar
+products:
+1 items
+/buildroot/src/scala/A.scala -> /buildroot/.pants.d/compile/zinc/current/classes/A.class
+binary dependencies:
+2 items
+/buildroot/src/scala/A.scala -> /buildroot/.pants.d/ivy/jars/org/b.jar
+/buildroot/src/scala/A.scala -> /jdk/jre/lib/rt.jar
+class names:
+1 items
+/buildroot/src/scala/A.scala -> A
+product stamps:
+1 items
+/buildroot/.pants.d/compile/zinc/current/classes/A.class -> lastModified(1)
+binary stamps:
+2 items
+/buildroot/.pants.d/ivy/jars/org/b.jar -> lastModified(2)
+/jdk/jre/lib/rt.jar -> lastModified(3)
+class names:
+2 items
+/buildroot/.pants.d/ivy/jars/org/b.jar -> org.B
+/jdk/jre/lib/rt.jar -> java.lang.Object
+internal apis:
+1 items
+/buildroot/src/scala/A.scala
+AAEBAgMEBQYHCAkKCwwNDg8QERITFBUWFxgZGhscHR4fICEiIw==
+"""
+
+
+# The java home references the parser drops: binary dependencies on the java home's jars, and their
+# binary stamps and class names.  The compile options keep theirs.
+ANALYSIS_WITHOUT_JAVA_HOME = ANALYSIS.replace(b"""binary dependencies:
+2 items
+/buildroot/src/scala/A.scala -> /buildroot/.pants.d/ivy/jars/org/b.jar
+/buildroot/src/scala/A.scala -> /jdk/jre/lib/rt.jar
+""", b"""binary dependencies:
+1 items
+/buildroot/src/scala/A.scala -> /buildroot/.pants.d/ivy/jars/org/b.jar
+""").replace(b"""binary stamps:
+2 items
+/buildroot/.pants.d/ivy/jars/org/b.jar -> lastModified(2)
+/jdk/jre/lib/rt.jar -> lastModified(3)
+class names:
+2 items
+/buildroot/.pants.d/ivy/jars/org/b.jar -> org.B
+/jdk/jre/lib/rt.jar -> java.lang.Object
+""", b"""binary stamps:
+1 items
+/buildroot/.pants.d/ivy/jars/org/b.jar -> lastModified(2)
+class names:
+1 items
+/buildroot/.pants.d/ivy/jars/org/b.jar -> org.B
+""")
+
+
+class RecordingParser(object):
+  """Rebases as the zinc analysis parser does, line by line, recording each rebase."""
+
+  current_test_header = HEADER
+
+  # The stamps' class names are the second 'class names' section.
+  JAVA_HOME_ANYWHERE = {(b'binary dependencies', 0)}
+  JAVA_HOME_PREFIX_ONLY = {(b'binary stamps', 0), (b'class names', 1)}
+
+  def __init__(self):
+    self.rebases = []
+
+  def rebase_from_path(self, infile_path, outfile_path, old_base, new_base, java_home=None):
+    self.rebases.append((old_base, new_base, java_home))
+    with open(infile_path, 'rb') as infile:
+      analysis = infile.read()
+    if java_home:
+      analysis = self._drop_java_home(analysis, java_home.encode('utf-8'))
+    with open(outfile_path, 'wb') as outfile:
+      outfile.write(analysis.replace(old_base, new_base))
+
+  def _drop_java_home(self, analysis, java_home):
+    lines = analysis.splitlines(True)
+    output = [lines.pop(0)]
+    seen = {}
+    while lines:
+      header = lines.pop(0)
+      section = (header[:-2], seen.get(header, 0))
+      seen[header] = section[1] + 1
+      num_items = int(lines.pop(0).split()[0])
+      # Only the internal apis hold blobs on a line of their own.
+      num_lines = num_items * 2 if header == b'internal apis:\n' else num_items
+      items, lines = lines[:num_lines], lines[num_lines:]
+      if section in self.JAVA_HOME_ANYWHERE:
+        items = [item for item in items if java_home not in item]
+      elif section in self.JAVA_HOME_PREFIX_ONLY:
+        items = [item for item in items if not item.startswith(java_home)]
+      num_items = len(items) // 2 if header == b'internal apis:\n' else len(items)
+      output.extend([header, '{} items\n'.format(num_items).encode('ascii')] + items)
+    return b''.join(output)
+
+
+class AnalysisRebaserTest(unittest.TestCase):
+
+  def setUp(self):
+    self.rebaser = AnalysisRebaser(HEADER)
+
+  def test_rebase(self):
+    rebased = self.rebaser.rebase(ANALYSIS, [('/buildroot/.pants.d', '/W'), ('/buildroot', '/B')])
+    self.assertEqual(ANALYSIS.replace(b'/buildroot/.pants.d', b'/W').replace(b'/buildroot', b'/B'),
+                     rebased)
+    self.assertNotIn(b'/buildroot', rebased)
+
+  def test_mappings_applied_in_order(self):
+    rebased = self.rebaser.rebase(ANALYSIS, [('/buildroot', '/B'), ('/buildroot/.pants.d', '/W')])
+    self.assertIn(b'/B/.pants.d/compile', rebased)
+    self.assertNotIn(b'/W', rebased)
+
+  def test_defers_to_parser(self):
+    # Files the parser would reject.
+    self.assertIsNone(self.rebaser.rebase(b'format version: 4\n', [('/buildroot', '/B')]))
+    # Files with references to the java home but without the sections to drop them from.
+    self.assertIsNone(self.rebaser.rebase(HEADER + b'/jdk\n', [('/buildroot', '/B')],
+                                          java_home='/jdk'))
+    # Files where a base could be part of a blob.
+    self.assertIsNone(self.rebaser.rebase(ANALYSIS, [('ERITFBUW', 'x')]))
+
+  def test_drops_java_home(self):
+    self.assertEqual(ANALYSIS_WITHOUT_JAVA_HOME, self.rebaser.rebase(ANALYSIS, [], java_home='/jdk'))
+    self.assertEqual(ANALYSIS_WITHOUT_JAVA_HOME.replace(b'/buildroot', b'/B'),
+                     self.rebaser.rebase(ANALYSIS, [('/buildroot', '/B')], java_home='/jdk'))
+    self.assertEqual(ANALYSIS, self.rebaser.rebase(ANALYSIS, [], java_home='/other-jdk'))
+
+  def test_drops_java_home_as_parser_does(self):
+    with temporary_dir() as tmpdir:
+      analysis_file = os.path.join(tmpdir, 'analysis')
+      with open(analysis_file, 'wb') as fp:
+        fp.write(ANALYSIS)
+      parsed_file = os.path.join(tmpdir, 'analysis.parsed')
+      RecordingParser().rebase_from_path(analysis_file, parsed_file, b'/buildroot', b'/B', '/jdk')
+      with open(parsed_file, 'rb') as fp:
+        self.assertEqual(fp.read(),
+                         self.rebaser.rebase(ANALYSIS, [('/buildroot', '/B')], java_home='/jdk'))
+
+  def test_base_not_in_blobs(self):
+    self.assertEqual(ANALYSIS, self.rebaser.rebase(ANALYSIS, [('/nonexistent', '/x')]))
+    self.assertEqual(ANALYSIS.replace(b'/src/scala', b'/src'),
+                     self.rebaser.rebase(ANALYSIS, [('/src/scala', '/src')]))
+
+
+class AnalysisToolsTest(unittest.TestCase):
+
+  def setUp(self):
+    self.parser = RecordingParser()
+
+  def analysis_tools(self, java_home='/jdk'):
+    return AnalysisTools(java_home, self.parser, analysis_cls=None,
+                         pants_buildroot='/buildroot', pants_workdir='/buildroot/.pants.d')
+
+  def round_trip(self, analysis_tools, analysis):
+    with temporary_dir() as tmpdir:
+      analysis_file = os.path.join(tmpdir, 'analysis')
+      with open(analysis_file, 'wb') as fp:
+        fp.write(analysis)
+      portable_analysis_file = os.path.join(tmpdir, 'analysis.portable')
+      analysis_tools.relativize(analysis_file, portable_analysis_file)
+      with open(portable_analysis_file, 'rb') as fp:
+        portable_analysis = fp.read()
+      analysis_tools.localize(portable_analysis_file, analysis_file)
+      with open(analysis_file, 'rb') as fp:
+        return portable_analysis, fp.read()
+
+  def test_round_trip_without_parser(self):
+    portable, localized = self.round_trip(self.analysis_tools(java_home='/other-jdk'), ANALYSIS)
+    self.assertEqual([], self.parser.rebases)
+    self.assertNotIn(b'/buildroot', portable)
+    self.assertIn(b'/_PANTS_WORKDIR_PLACEHOLDER/compile/zinc/current/classes', portable)
+    self.assertIn(b'/_PANTS_BUILDROOT_PLACEHOLDER/src/scala/A.scala', portable)
+    self.assertEqual(ANALYSIS, localized)
+
+  def test_java_home_dropped_without_parser(self):
+    portable, localized = self.round_trip(self.analysis_tools(), ANALYSIS)
+    self.assertEqual([], self.parser.rebases)
+    self.assertNotIn(b'/jdk/jre/lib/rt.jar ->', portable)
+    self.assertNotIn(b'-> /jdk', portable)
+    self.assertNotIn(b'/buildroot', portable)
+    self.assertEqual(ANALYSIS_WITHOUT_JAVA_HOME, localized)
+
+  def test_rebase_falls_back_to_parser(self):
+    with temporary_dir() as tmpdir:
+      analysis_file = os.path.join(tmpdir, 'analysis')
+      with open(analysis_file, 'wb') as fp:
+        fp.write(b'format version: 4\n/buildroot/A.scala\n')
+      rebased_analysis_file = os.path.join(tmpdir, 'analysis.rebased')
+      self.analysis_tools().rebase_from_path(analysis_file, rebased_analysis_file,
+                                             b'/buildroot', b'/B')
+      with open(rebased_analysis_file, 'rb') as fp:
+        self.assertEqual(b'format version: 4\n/B/A.scala\n', fp.read())
+    self.assertEqual([(b'/buildroot', b'/B', None)], self.parser.rebases)
@@ -0,0 +1,124 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+import mock
+
+from pants.backend.jvm.tasks.jvm_compile.context_jar_writer import ContextJarWriter
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_delete, safe_file_dump
+
+
+class ContextJarWriterTest(unittest.TestCase):
+
+  def setUp(self):
+    self.writer = ContextJarWriter()
+    self.mtime = 1000000000
+
+  def write_class(self, classes_dir, name, content):
+    path = os.path.join(classes_dir, name)
+    safe_file_dump(path, content)
+    # Give each write a distinct mtime, as compiles seconds apart would.
+    self.mtime += 10
+    os.utime(path, (self.mtime, self.mtime))
+
+  def contents(self, jar_file):
+    with open_zip(jar_file, 'r') as jar:
+      return {name: jar.read(name) for name in jar.namelist()}
+
+  def assert_jarred(self, expected, jar_file, classes_dir):
+    names = self.writer.write(jar_file, classes_dir)
+    self.assertEqual(expected, self.contents(jar_file))
+    self.assertEqual(sorted(expected), sorted(names))
+    self.assertEqual(names, ContextJarWriter().names(jar_file))
+
+  def test_write(self):
+    with temporary_dir() as tmpdir:
+      classes_dir = os.path.join(tmpdir, 'classes')
+      jar_file = os.path.join(tmpdir, 'z.jar')
+      self.write_class(classes_dir, 'org/A.class', 'A')
+      self.write_class(classes_dir, 'B.class', 'B')
+      self.assert_jarred({'org/': b'', 'org/A.class': b'A', 'B.class': b'B'}, jar_file, classes_dir)
+
+      # Additions are appended to the jar in place.
+      jar_inode = os.stat(jar_file).st_ino
+      self.write_class(classes_dir, 'org/C.class', 'C')
+      self.assert_jarred({'org/': b'', 'org/A.class': b'A', 'B.class': b'B', 'org/C.class': b'C'},
+                         jar_file, classes_dir)
+      self.assertEqual(jar_inode, os.stat(jar_file).st_ino)
+
+      # An unchanged directory leaves the jar untouched.
+      jar_stat = os.stat(jar_file)
+      self.writer.write(jar_file, classes_dir)
+      self.assertEqual(jar_stat, os.stat(jar_file))
+
+      # Changes and deletions rebuild the jar.
+      self.write_class(classes_dir, 'org/A.class', 'A2')
+      safe_delete(os.path.join(classes_dir, 'B.class'))
+      self.assert_jarred({'org/': b'', 'org/A.class': b'A2', 'org/C.class': b'C'},
+                         jar_file, classes_dir)
+
+  def test_write_without_index(self):
+    with temporary_dir() as tmpdir:
+      classes_dir = os.path.join(tmpdir, 'classes')
+      jar_file = os.path.join(tmpdir, 'z.jar')
+      self.write_class(classes_dir, 'A.class', 'A')
+      with open_zip(jar_file, 'w') as jar:
+        jar.writestr('Stale.class', b'Stale')
+      self.assertEqual(['Stale.class'], self.writer.names(jar_file))
+
+      self.assert_jarred({'A.class': b'A'}, jar_file, classes_dir)
+
+  def test_names_of_replaced_jar(self):
+    with temporary_dir() as tmpdir:
+      classes_dir = os.path.join(tmpdir, 'classes')
+      jar_file = os.path.join(tmpdir, 'z.jar')
+      self.write_class(classes_dir, 'A.class', 'A')
+      self.writer.write(jar_file, classes_dir)
+
+      # The index doesn't describe a jar written by anything else.
+      with open_zip(jar_file, 'w') as jar:
+        jar.writestr('B.class', b'B')
+        jar.writestr('C.class', b'C')
+      self.assertEqual(['B.class', 'C.class'], self.writer.names(jar_file))
+      self.assertEqual(['B.class', 'C.class'], ContextJarWriter().names(jar_file))
+
+  def test_recompiled_with_same_size_and_mtime(self):
+    with temporary_dir() as tmpdir:
+      classes_dir = os.path.join(tmpdir, 'classes')
+      jar_file = os.path.join(tmpdir, 'z.jar')
+      self.write_class(classes_dir, 'A.class', 'A1')
+      self.writer.write(jar_file, classes_dir)
+
+      # A recompile within the filesystem's mtime granularity.
+      path = os.path.join(classes_dir, 'A.class')
+      stat = os.stat(path)
+      safe_file_dump(path, 'A2')
+      os.utime(path, (stat.st_atime, stat.st_mtime))
+      self.assert_jarred({'A.class': b'A2'}, jar_file, classes_dir)
+
+  def test_index_written_atomically(self):
+    with temporary_dir() as tmpdir:
+      classes_dir = os.path.join(tmpdir, 'classes')
+      jar_file = os.path.join(tmpdir, 'z.jar')
+      self.write_class(classes_dir, 'A.class', 'A')
+      self.writer.write(jar_file, classes_dir)
+      with open('{}.index'.format(jar_file), 'rb') as fp:
+        index = fp.read()
+
+      def dump_partially(obj, fp):
+        fp.write(b'{"jar": ')
+        raise IOError('No space left on device')
+
+      self.write_class(classes_dir, 'B.class', 'B')
+      with mock.patch('json.dump', side_effect=dump_partially):
+        with self.assertRaises(IOError):
+          self.writer.write(jar_file, classes_dir)
+      with open('{}.index'.format(jar_file), 'rb') as fp:
+        self.assertEqual(index, fp.read())
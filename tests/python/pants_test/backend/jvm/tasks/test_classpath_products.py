@@ -14,7 +14,8 @@ from pants.backend.jvm.targets.exclude import Exclude
 from pants.backend.jvm.targets.exportable_jvm_library import ExportableJvmLibrary
 from pants.backend.jvm.targets.jvm_target import JvmTarget
 from pants.backend.jvm.tasks.classpath_products import (ArtifactClasspathEntry, ClasspathEntry,
-                                                        ClasspathProducts)
+                                                        ClasspathProducts, MemoizedClasspaths)
+from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.base.exceptions import TaskError
 from pants_test.base_test import BaseTest
 
@@ -399,6 +400,46 @@ class ClasspathProductsTest(BaseTest):
                       ('default', ClasspathEntry(self.path('b/loose/classes/dir')))],
                      classpath)
 
+  def test_memoized_classpaths(self):
+    d = self.make_target('d', JvmTarget)
+    c = self.make_target('c', JvmTarget, dependencies=[d], excludes=[Exclude('com.example')])
+    b = self.make_target('b', JvmTarget, dependencies=[d])
+    a = self.make_target('a', JvmTarget, dependencies=[b, c])
+
+    classpath_product = ClasspathProducts(self.pants_workdir)
+    self.add_jar_classpath_element_for_path(classpath_product, d, self._example_jar_path())
+    for target in (a, b, c, d):
+      classpath_product.add_for_target(target, [('default', self.path(target.name)),
+                                                ('other', self.path(target.name + '-other'))])
+    self.add_excludes_for_targets(classpath_product, a, b, c, d)
+    extra = [('default', self.path('extra.jar')), ('other', self.path('extra-other.jar'))]
+
+    classpaths = MemoizedClasspaths(classpath_product, ['default'])
+    for target in (a, b, c, d, a, b):
+      self.assertEqual(
+        ClasspathUtil.compute_classpath(target.closure(bfs=True), classpath_product, extra,
+                                        ['default']),
+        classpaths.classpath(target, extra_classpath_tuples=extra))
+    self.assertEqual([self.path('a'), self.path('b'), self.path('c'), self.path('d')],
+                     classpaths.classpath(a))
+    self.assertEqual([self.path('b'), self._example_jar_path(), self.path('d')],
+                     classpaths.classpath(b))
+
+  def test_memoized_classpaths_of_given_targets(self):
+    b = self.make_target('b', JvmTarget)
+    a = self.make_target('a', JvmTarget, dependencies=[b], excludes=[Exclude('com.example')])
+
+    classpath_product = ClasspathProducts(self.pants_workdir)
+    self.add_jar_classpath_element_for_path(classpath_product, b, self._example_jar_path())
+    classpath_product.add_for_target(a, [('default', self.path('a'))])
+    self.add_excludes_for_targets(classpath_product, a, b)
+
+    classpaths = MemoizedClasspaths(classpath_product, None)
+    self.assertEqual([a, b], list(classpaths.closure(a)))
+    # Excludes still apply from the whole closure of the target.
+    self.assertEqual([self.path('a')], classpaths.classpath(a, classpath_targets=[a, b]))
+    self.assertEqual([self._example_jar_path()], classpaths.classpath(b, classpath_targets=[b]))
+
   def _example_jar_path(self):
     return self.path('ivy/jars/com.example/lib/jars/123.4.jar')
 
@@ -6,17 +6,24 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import xml.etree.ElementTree as ET
 
+import mock
 from twitter.common.collections import OrderedSet
 
 from pants.backend.jvm.ivy_utils import IvyInfo, IvyModule, IvyModuleRef
+from pants.backend.jvm.jar_dependency_utils import M2Coordinate
+from pants.backend.jvm.subsystems.jar_dependency_management import (JarDependencyManagement,
+                                                                    PinnedJarArtifactSet)
 from pants.backend.jvm.targets.exclude import Exclude
 from pants.backend.jvm.targets.jar_dependency import JarDependency
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.targets.java_library import JavaLibrary
 from pants.backend.jvm.tasks.ivy_resolve import IvyResolve
 from pants.invalidation.cache_manager import VersionedTargetSet
+from pants.ivy.bootstrapper import Bootstrapper
 from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import touch
 from pants_test.jvm.jvm_tool_task_test_base import JvmToolTaskTestBase
 
 
@@ -131,6 +138,121 @@ class IvyResolveTest(JvmToolTaskTestBase):
                                   (u'default', artifact_path(u'bogus1'))]),
                       winning_cp)
 
+  def test_resolve_partitioned_by_artifact_set(self):
+    lib_1a = self.make_target('//:1a', JarLibrary, jars=[JarDependency('org', 'a')])
+    lib_2 = self.make_target('//:2', JarLibrary, jars=[JarDependency('org', 'a')])
+    lib_1b = self.make_target('//:1b', JarLibrary, jars=[JarDependency('org', 'b')])
+    excluding_lib = self.make_target('//:c', JavaLibrary, excludes=[Exclude('org', 'c')])
+    artifact_sets = {lib_1a: PinnedJarArtifactSet([M2Coordinate('org', 'a', '1')]),
+                     lib_2: PinnedJarArtifactSet([M2Coordinate('org', 'a', '2')]),
+                     lib_1b: PinnedJarArtifactSet([M2Coordinate('org', 'a', '1')])}
+
+    context = self.context(target_roots=[lib_1a, lib_2, excluding_lib, lib_1b])
+    task = self.create_task(context)
+    resolved = []
+
+    jar_libraries = []
+
+    def mock_ivy_resolve(targets, *args, **kw):
+      resolved.append(targets)
+      jar_libraries.append(kw['jar_libraries'])
+      return [], {}, 'resolve{}'.format(len(resolved))
+
+    task.ivy_resolve = mock_ivy_resolve
+    task._parse_report = lambda resolve_hash_name, conf: None
+
+    with mock.patch.object(JarDependencyManagement, 'for_target', side_effect=artifact_sets.get):
+      resolve_hash_names = task.resolve_by_artifact_set(
+        executor=None,
+        targets=[lib_1a, lib_2, excluding_lib, lib_1b],
+        classpath_products=mock.Mock())
+    # Each set of pinned artifacts is resolved separately, along with any excludes.
+    self.assertEqual([[lib_1a, excluding_lib, lib_1b], [lib_2, excluding_lib]], resolved)
+    self.assertEqual([{lib_1a, lib_1b}, {lib_2}], jar_libraries)
+    self.assertEqual(['resolve1', 'resolve2'], resolve_hash_names)
+
+    del resolved[:]
+    del jar_libraries[:]
+    with mock.patch.object(JarDependencyManagement, 'for_target', return_value=None):
+      resolve_hash_names = task.resolve_by_artifact_set(
+        executor=None,
+        targets=[lib_1a, lib_2, excluding_lib, lib_1b],
+        classpath_products=mock.Mock())
+    self.assertEqual([[lib_1a, lib_2, excluding_lib, lib_1b]], resolved)
+    self.assertEqual([None], jar_libraries)
+    self.assertEqual(['resolve1'], resolve_hash_names)
+
+    # A plain resolve is a single resolve of all the targets, whatever manages them.
+    del resolved[:]
+    del jar_libraries[:]
+    with mock.patch.object(JarDependencyManagement, 'for_target', side_effect=artifact_sets.get):
+      resolve_hash_name = task.resolve(executor=None,
+                                       targets=[lib_1a, lib_2, excluding_lib, lib_1b],
+                                       classpath_products=mock.Mock())
+    self.assertEqual([[lib_1a, lib_2, excluding_lib, lib_1b]], resolved)
+    self.assertEqual([None], jar_libraries)
+    self.assertEqual('resolve1', resolve_hash_name)
+
+  def test_resolve_by_artifact_set_rejects_mixed_dependencies(self):
+    lib_a = self.make_target('//:a', JarLibrary, jars=[JarDependency('org', 'a')])
+    lib_b = self.make_target('//:b', JarLibrary, jars=[JarDependency('org', 'b')])
+    app = self.make_target('//:app', JavaLibrary, dependencies=[lib_a, lib_b])
+    artifact_sets = {lib_a: PinnedJarArtifactSet([M2Coordinate('org', 'a', '2')]),
+                     lib_b: PinnedJarArtifactSet([M2Coordinate('org', 'b', '3')])}
+
+    context = self.context(target_roots=[app])
+    task = self.create_task(context)
+    task.ivy_resolve = mock.Mock()
+
+    with mock.patch.object(JarDependencyManagement, 'for_target', side_effect=artifact_sets.get):
+      with self.assertRaises(JarDependencyManagement.IncompatibleManagedJarDependencies):
+        task.resolve_by_artifact_set(executor=None,
+                                     targets=[app, lib_a, lib_b],
+                                     classpath_products=mock.Mock())
+    self.assertFalse(task.ivy_resolve.called)
+
+  def test_resolve_partitioned_ivy_xml(self):
+    lib_a = self.make_target('//:a', JarLibrary, jars=[JarDependency('org', 'a')])
+    lib_b = self.make_target('//:b', JarLibrary, jars=[JarDependency('org', 'b')])
+    app = self.make_target('//:app', JavaLibrary, dependencies=[lib_a],
+                           excludes=[Exclude('org', 'c')])
+    artifact_sets = {lib_a: PinnedJarArtifactSet([M2Coordinate('org', 'a', '2')]),
+                     lib_b: PinnedJarArtifactSet([M2Coordinate('org', 'b', '3')])}
+
+    context = self.context(target_roots=[app, lib_b])
+    task = self.create_task(context)
+    task._parse_report = lambda resolve_hash_name, conf: None
+    ivy_xmls = []
+
+    def mock_runner(jvm_options, args, executor):
+      ivy_xmls.append(ET.parse(args[args.index('-ivy') + 1]).getroot())
+      touch(args[args.index('-cachepath') + 1])
+      return mock.Mock()
+
+    ivy = mock.Mock()
+    ivy.runner.side_effect = mock_runner
+    with mock.patch.object(JarDependencyManagement, 'for_target', side_effect=artifact_sets.get):
+      with mock.patch.object(Bootstrapper, 'default_ivy', return_value=ivy):
+        with mock.patch('pants.backend.jvm.tasks.ivy_task_mixin.execute_runner', return_value=0):
+          task.resolve_by_artifact_set(executor=None,
+                                       targets=[app, lib_a, lib_b],
+                                       classpath_products=mock.Mock())
+
+    # Each resolve only pins its own jars with its own set, but takes the excludes of the targets
+    # depending on them.
+    def dependencies(ivy_xml):
+      return [(dep.get('org'), dep.get('name'), dep.get('rev'))
+              for dep in ivy_xml.findall('dependencies/dependency')]
+
+    def excludes(ivy_xml):
+      return [(exclude.get('org'), exclude.get('module'))
+              for exclude in ivy_xml.findall('dependencies/exclude')]
+
+    self.assertEqual([[('org', 'a', '2')], [('org', 'b', '3')]],
+                     [dependencies(ivy_xml) for ivy_xml in ivy_xmls])
+    self.assertEqual([[('org', 'c')], [('org', 'c')]],
+                     [excludes(ivy_xml) for ivy_xml in ivy_xmls])
+
   def test_resolve_multiple_artifacts(self):
     no_classifier = JarDependency('junit', 'junit', rev='4.12')
     classifier = JarDependency('junit', 'junit', rev='4.12', classifier='sources')
@@ -6,9 +6,12 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import shutil
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
 from textwrap import dedent
 
+import mock
 from twitter.common.collections import OrderedSet
 
 from pants.backend.jvm.ivy_utils import (IvyInfo, IvyModule, IvyModuleRef, IvyResolveMappingError,
@@ -22,6 +25,7 @@ from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.build_graph.register import build_file_aliases as register_core
 from pants.ivy.ivy_subsystem import IvySubsystem
 from pants.util.contextutil import temporary_dir, temporary_file_path
+from pants.util.dirutil import safe_file_dump
 from pants_test.base_test import BaseTest
 from pants_test.subsystem.subsystem_util import subsystem_instance
 
@@ -130,6 +134,12 @@ class IvyUtilsGenerateIvyTest(IvyUtilsTestBase):
     _, excludes = IvyUtils.calculate_classpath([self.e], gather_excludes=False)
     self.assertSetEqual(excludes, set())
 
+  def test_jar_libraries(self):
+    morx = self.target('3rdparty:example-morx')
+    jars, excludes = IvyUtils.calculate_classpath([self.e], jar_libraries={morx})
+    self.assertEqual(['morx'], [jar.classifier for jar in jars])
+    self.assertSetEqual(excludes, {Exclude(org='commons-lang', name='commons-lang')})
+
   def test_classifiers(self):
     jars, _ = IvyUtils.calculate_classpath([self.c])
 
@@ -370,6 +380,46 @@ class IvyUtilsGenerateIvyTest(IvyUtilsTestBase):
           with open(output_path, 'r') as outpath:
             self.assertEquals(symlink_bar_path + os.pathsep + symlink_foo_path, outpath.readline())
 
+  def test_symlink_cachepath_manifest(self):
+    with temporary_dir() as mock_cache_dir:
+      with temporary_dir() as symlink_dir:
+        with temporary_dir() as classpath_dir:
+          input_path = os.path.join(classpath_dir, 'inpath')
+          output_path = os.path.join(classpath_dir, 'classpath')
+          foo_path = os.path.join(mock_cache_dir, 'org', 'foo.jar')
+          safe_file_dump(foo_path, 'test jar contents')
+          safe_file_dump(input_path, foo_path)
+
+          result_map = IvyUtils.symlink_cachepath(mock_cache_dir, input_path, symlink_dir,
+                                                  output_path)
+          symlink_foo_path = os.path.join(symlink_dir, 'org', 'foo.jar')
+          self.assertEqual({os.path.realpath(foo_path): symlink_foo_path}, result_map)
+
+          # The same classpath is linked again from the manifest, without touching the farm.
+          with mock.patch('os.symlink') as mock_symlink:
+            self.assertEqual(result_map, IvyUtils.symlink_cachepath(mock_cache_dir, input_path,
+                                                                    symlink_dir, output_path))
+            self.assertFalse(mock_symlink.called)
+
+          # But not if the output has gone missing.
+          os.unlink(output_path)
+          self.assertEqual(result_map, IvyUtils.symlink_cachepath(mock_cache_dir, input_path,
+                                                                  symlink_dir, output_path))
+          with open(output_path, 'r') as outpath:
+            self.assertEqual(symlink_foo_path, outpath.read())
+
+          # Nor if one of its symlinks has gone missing.
+          os.unlink(symlink_foo_path)
+          self.assertEqual(result_map, IvyUtils.symlink_cachepath(mock_cache_dir, input_path,
+                                                                  symlink_dir, output_path))
+          self.assertEqual(os.path.realpath(foo_path), os.readlink(symlink_foo_path))
+
+          # Nor if the cache file a symlink points at has.
+          os.unlink(foo_path)
+          with mock.patch('os.symlink') as mock_symlink:
+            IvyUtils.symlink_cachepath(mock_cache_dir, input_path, symlink_dir, output_path)
+            self.assertTrue(mock_symlink.called)
+
   def test_missing_ivy_report(self):
     self.set_options_for_scope(IvySubsystem.options_scope,
                                cache_dir='DOES_NOT_EXIST',
@@ -381,9 +431,62 @@ class IvyUtilsGenerateIvyTest(IvyUtilsTestBase):
     with self.assertRaises(IvyUtils.IvyResolveReportError):
       IvyUtils.parse_xml_report('INVALID_CACHE_DIR', 'INVALID_REPORT_UNIQUE_NAME', 'default')
 
+  def test_parsed_ivy_report_reused(self):
+    with temporary_dir() as cache_dir:
+      report_path = IvyUtils.xml_report_path(cache_dir, 'some-hash', 'default')
+      shutil.copy('tests/python/pants_test/backend/jvm/tasks/'
+                  'ivy_utils_resources/report_with_diamond.xml',
+                  report_path)
+      ivy_info = IvyUtils.parse_xml_report(cache_dir, 'some-hash', 'default')
+
+      # Each caller gets its own IvyInfo, but the report is only parsed once.
+      with mock.patch.object(IvyUtils, '_parse_xml_report_modules') as mock_parse, \
+           mock.patch.object(IvyUtils, '_load_saved_report') as mock_load:
+        reused_ivy_info = IvyUtils.parse_xml_report(cache_dir, 'some-hash', 'default')
+        self.assertFalse(mock_parse.called)
+        self.assertFalse(mock_load.called)
+      self.assertIsNot(ivy_info, reused_ivy_info)
+      self.assertEqual(ivy_info.modules_by_ref, reused_ivy_info.modules_by_ref)
+
+      # Later runs load the modules saved from the report rather than parsing it again.
+      with mock.patch.object(IvyUtils, '_parsed_reports', OrderedDict()), \
+           mock.patch.object(IvyUtils, '_parse_xml_report_modules') as mock_parse:
+        loaded_ivy_info = IvyUtils.parse_xml_report(cache_dir, 'some-hash', 'default')
+        self.assertFalse(mock_parse.called)
+      self.assertEqual(ivy_info.modules_by_ref, loaded_ivy_info.modules_by_ref)
+      lib = self.make_target(spec=':org1-name1',
+                             target_type=JarLibrary,
+                             jars=[JarDependency(org='org1', name='name1', rev='0.0.1',
+                                                 classifier='tests')])
+      self.assertEqual(ivy_info.get_resolved_jars_for_jar_library(lib),
+                       loaded_ivy_info.get_resolved_jars_for_jar_library(lib))
+
+      # A rewritten report is parsed again.
+      with open(report_path, 'a') as fp:
+        fp.write('\n')
+      with mock.patch.object(IvyUtils, '_parse_xml_report_modules',
+                             return_value=iter([])) as mock_parse:
+        IvyUtils.parse_xml_report(cache_dir, 'some-hash', 'default')
+        self.assertTrue(mock_parse.called)
+
+  def test_parsed_ivy_reports_bounded(self):
+    with temporary_dir() as cache_dir, \
+         mock.patch.object(IvyUtils, '_parsed_reports', OrderedDict()), \
+         mock.patch.object(IvyUtils, '_MAX_PARSED_REPORTS', 2):
+      for resolve_hash_name in ('hash1', 'hash2', 'hash3'):
+        shutil.copy('tests/python/pants_test/backend/jvm/tasks/'
+                    'ivy_utils_resources/report_with_diamond.xml',
+                    IvyUtils.xml_report_path(cache_dir, resolve_hash_name, 'default'))
+        IvyUtils.parse_xml_report(cache_dir, resolve_hash_name, 'default')
+      self.assertEqual([IvyUtils.xml_report_path(cache_dir, resolve_hash_name, 'default')
+                        for resolve_hash_name in ('hash2', 'hash3')],
+                       list(IvyUtils._parsed_reports))
+
   def parse_ivy_report(self, rel_path):
-    path = os.path.join('tests/python/pants_test/backend/jvm/tasks', rel_path)
-    ivy_info = IvyUtils._parse_xml_report(conf='default', path=path)
+    with temporary_dir() as cache_dir:
+      shutil.copy(os.path.join('tests/python/pants_test/backend/jvm/tasks', rel_path),
+                  IvyUtils.xml_report_path(cache_dir, 'some-hash', 'default'))
+      ivy_info = IvyUtils.parse_xml_report(cache_dir, 'some-hash', 'default')
     self.assertIsNotNone(ivy_info)
     return ivy_info
 
@@ -0,0 +1,80 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+import mock
+
+from pants.backend.jvm.tasks.jar_entry_index import JarEntryIndex
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class JarEntryIndexTest(unittest.TestCase):
+
+  def setUp(self):
+    self.mtime = 1000000000
+
+  def write_jar(self, jar_path, *names):
+    with open_zip(jar_path, 'w') as jar:
+      for name in names:
+        jar.writestr(name, b'')
+    # Give each write a distinct mtime, as builds seconds apart would.
+    self.mtime += 10
+    os.utime(jar_path, (self.mtime, self.mtime))
+
+  def hashes(self, *names):
+    return frozenset(JarEntryIndex.hash_name(name) for name in names)
+
+  def test_hashes_and_names(self):
+    with temporary_dir() as tmpdir:
+      jar_a = os.path.join(tmpdir, 'a.jar')
+      jar_b = os.path.join(tmpdir, 'b.jar')
+      self.write_jar(jar_a, 'org/', 'org/A.class', 'org/B.class')
+      self.write_jar(jar_b, 'org/', 'org/B.class', 'org/C.class')
+
+      index = JarEntryIndex(include=lambda name: not name.endswith('/'))
+      self.assertEqual(self.hashes('org/A.class', 'org/B.class'), index.hashes(jar_a))
+      self.assertEqual(self.hashes('org/B.class', 'org/C.class'), index.hashes(jar_b))
+
+      shared = index.hashes(jar_a) & index.hashes(jar_b)
+      self.assertEqual({JarEntryIndex.hash_name('org/B.class'): 'org/B.class'},
+                       index.names(jar_a, shared))
+
+      # A changed jar is indexed again.
+      self.write_jar(jar_a, 'org/D.class')
+      self.assertEqual(self.hashes('org/D.class'), index.hashes(jar_a))
+
+  def test_persisted(self):
+    with temporary_dir() as tmpdir:
+      cache_dir = os.path.join(tmpdir, 'index')
+      jar = os.path.join(tmpdir, 'a.jar')
+      self.write_jar(jar, 'A.class', 'B.class')
+
+      self.assertEqual(self.hashes('A.class', 'B.class'),
+                       JarEntryIndex(cache_dir=cache_dir).hashes(jar))
+      self.assertEqual(1, len(os.listdir(cache_dir)))
+
+      # A new index, as in a later run, loads the saved hashes rather than opening the jar.
+      with mock.patch.object(JarEntryIndex, '_index') as index_jar:
+        self.assertEqual(self.hashes('A.class', 'B.class'),
+                         JarEntryIndex(cache_dir=cache_dir).hashes(jar))
+        self.assertFalse(index_jar.called)
+
+      # An index with a different include predicate doesn't share the saved hashes.
+      self.assertEqual(self.hashes('A.class'),
+                       JarEntryIndex(include=lambda name: name == 'A.class',
+                                     include_key='A',
+                                     cache_dir=cache_dir).hashes(jar))
+      self.assertEqual(2, len(os.listdir(cache_dir)))
+
+      # A truncated entry is indexed again.
+      for name in os.listdir(cache_dir):
+        safe_file_dump(os.path.join(cache_dir, name), 'abc')
+      self.assertEqual(self.hashes('A.class', 'B.class'),
+                       JarEntryIndex(cache_dir=cache_dir).hashes(jar))
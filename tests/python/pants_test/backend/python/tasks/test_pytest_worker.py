@@ -0,0 +1,140 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import sys
+import unittest
+from textwrap import dedent
+
+from pex.interpreter import PythonInterpreter
+from pex.pex_info import PexInfo
+
+from pants.backend.python.tasks.pytest_worker import PytestWorker
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, touch
+
+
+class FakeFile(object):
+  def __init__(self):
+    self.content = b''
+
+  def write(self, val):
+    self.content += val
+
+
+class FakePex(object):
+  """Runs the worker main directly under the current interpreter, which has pytest available."""
+
+  def cmdline(self, args=()):
+    return [sys.executable] + list(args)
+
+
+class FakeChroot(object):
+  def __init__(self, path):
+    self._path = path
+    safe_file_dump(os.path.join(path, PexInfo.PATH), PexInfo.default().dump())
+
+  @property
+  def interpreter(self):
+    return PythonInterpreter.get()
+
+  def path(self):
+    return self._path
+
+  def pex(self):
+    return FakePex()
+
+
+class PytestWorkerTest(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir_context = temporary_dir()
+    self.tmpdir = os.path.realpath(self.tmpdir_context.__enter__())
+    self.chroot = FakeChroot(os.path.join(self.tmpdir, 'chroot'))
+    self.worker = PytestWorker(self.chroot, workdir=os.path.join(self.tmpdir, 'worker'),
+                               idle_timeout=60)
+
+    safe_file_dump(os.path.join(self.tmpdir, 'test_green.py'), dedent("""
+      def test_green():
+        print('so green')
+    """))
+    safe_file_dump(os.path.join(self.tmpdir, 'test_red.py'), dedent("""
+      def test_red():
+        assert False
+    """))
+    safe_file_dump(os.path.join(self.tmpdir, 'test_slow.py'), dedent("""
+      import time
+
+      def test_slow():
+        time.sleep(60)
+    """))
+
+  def tearDown(self):
+    self.worker.terminate()
+    self.tmpdir_context.__exit__(None, None, None)
+
+  def run_batch(self, *args):
+    stdout = FakeFile()
+    handler = self.worker.submit(['-s'] + list(args), cwd=self.tmpdir, stdout=stdout)
+    return handler.wait(), stdout.content
+
+  def test_fingerprint_stable(self):
+    self.assertEqual(self.worker.fingerprint, PytestWorker.fingerprint_chroot(self.chroot))
+
+  def test_green(self):
+    rc, stdout = self.run_batch('test_green.py')
+    self.assertEqual(0, rc)
+    self.assertIn(b'so green', stdout)
+    self.assertIn(b'1 passed', stdout)
+
+  def test_red(self):
+    rc, stdout = self.run_batch('test_red.py')
+    self.assertEqual(1, rc)
+    self.assertIn(b'1 failed', stdout)
+
+  def test_worker_reused(self):
+    self.assertEqual(0, self.run_batch('test_green.py')[0])
+    pid = self.worker.pid
+    self.assertEqual(1, self.run_batch('test_red.py')[0])
+    self.assertEqual(pid, self.worker.pid)
+    self.assertTrue(self.worker.is_alive())
+
+  def test_output_streamed(self):
+    # The test only finishes once its output has reached the stream, so that output has to be
+    # copied while the batch is still running.
+    released = os.path.join(self.tmpdir, 'released')
+    safe_file_dump(os.path.join(self.tmpdir, 'test_streamed.py'), dedent("""
+      import os
+      import sys
+      import time
+
+      def test_streamed():
+        sys.stdout.write('waiting\\n')
+        sys.stdout.flush()
+        deadline = time.time() + 30
+        while not os.path.exists({released!r}):
+          assert time.time() < deadline, 'Output was not streamed.'
+          time.sleep(0.1)
+    """.format(released=released)))
+
+    class ReleasingFile(FakeFile):
+      def write(self, val):
+        super(ReleasingFile, self).write(val)
+        if b'waiting' in self.content:
+          touch(released)
+
+    stdout = ReleasingFile()
+    handler = self.worker.submit(['-s', 'test_streamed.py'], cwd=self.tmpdir, stdout=stdout)
+    self.assertEqual(0, handler.wait())
+    self.assertIn(b'1 passed', stdout.content)
+
+  def test_kill(self):
+    handler = self.worker.submit(['test_slow.py'], cwd=self.tmpdir)
+    self.assertIsNotNone(handler.pid)
+    handler.kill()
+    self.assertNotEqual(0, handler.wait())
+    # The worker itself survives the loss of a batch.
+    self.assertEqual(0, self.run_batch('test_green.py')[0])
@@ -0,0 +1,100 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Measures parsing thousands of synthetic BUILD files with the engine.exp parsers.
+
+Run with: ./pants run tests/python/pants_test/engine/exp:parser_benchmark -- --files=5000
+"""
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import os
+from functools import partial
+from textwrap import dedent
+
+from pants.engine.exp import parsers
+from pants.engine.exp.struct import Struct, StructWithDeps
+from pants.engine.exp.targets import Target
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_open
+from pants_test.testutils.benchmark import benchmark_parser, best_of, timed
+
+
+SYMBOL_TABLE = {'struct': Struct, 'struct_with_deps': StructWithDeps, 'target': Target}
+
+
+def json_build_file(index):
+  return dedent("""
+    # Generated BUILD file {index}.
+    {target}
+
+    {config}
+  """).format(index=index,
+              target=json.dumps({'type_alias': 'target',
+                                 'name': 't{}'.format(index),
+                                 'configurations': [':config{}'.format(index),
+                                                    {'type_alias': 'struct', 'embedded': True}]},
+                                indent=2),
+              config=json.dumps({'type_alias': 'struct_with_deps',
+                                 'name': 'config{}'.format(index),
+                                 'dependencies': ['//src/t{}'.format(d)
+                                                  for d in range(max(0, index - 3), index)]},
+                                indent=2))
+
+
+def python_build_file(index):
+  return dedent("""
+    # Generated BUILD file {index}.
+    target(name='t{index}',
+           configurations=[':config{index}', struct(embedded=True)])
+
+    struct_with_deps(name='config{index}',
+                     dependencies={dependencies!r})
+  """).format(index=index,
+              dependencies=[str('//src/t{}'.format(d)) for d in range(max(0, index - 3), index)])
+
+
+def write_build_files(build_root, files, render):
+  paths = []
+  for index in range(files):
+    path = os.path.join(build_root, 'src', 't{}'.format(index), 'BUILD')
+    with safe_open(path, 'w') as fp:
+      fp.write(render(index))
+    paths.append(path)
+  return paths
+
+
+def parse_all(parse, paths):
+  return sum(len(parse(path)) for path in paths)
+
+
+def report(name, parse, paths, runs):
+  # Only the first parse of each file is cold: later runs time the cached parses.
+  cold, objects = timed(parse_all, parse, paths)
+  warm, _ = best_of(runs, parse_all, parse, paths)
+  print('{name}: parsed {objects} objects from {files} files; cold {cold:.3f}s, cached {warm:.3f}s'
+        .format(name=name, objects=objects, files=len(paths), cold=cold, warm=warm))
+
+
+def main():
+  parser = benchmark_parser(__doc__)
+  parser.add_argument('--files', type=int, default=5000,
+                      help='The number of BUILD files to generate in each format.')
+  args = parser.parse_args()
+
+  with temporary_dir() as build_root:
+    json_paths = write_build_files(os.path.join(build_root, 'json'), args.files, json_build_file)
+    python_paths = write_build_files(os.path.join(build_root, 'python'), args.files,
+                                     python_build_file)
+
+    report('parse_json', partial(parsers.parse_json, symbol_table=SYMBOL_TABLE), json_paths,
+           args.runs)
+    report('python_callbacks_parser', parsers.python_callbacks_parser(SYMBOL_TABLE), python_paths,
+           args.runs)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,159 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Measures `LocalMultiprocessEngine.reduce` over a large generated graph of example java targets.
+
+Run with: ./pants run tests/python/pants_test/engine/exp:reduce_benchmark -- --targets=1000
+
+The rescanning reduce is quadratic in the number of plans, so pass --no-rescanning to time just the
+current reduce over graphs much beyond a thousand plans.
+"""
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import os
+import random
+import sys
+import time
+from contextlib import closing, contextmanager
+from multiprocessing.pool import ThreadPool
+
+from pants.build_graph.address import Address
+from pants.engine.exp.engine import LocalMultiprocessEngine
+from pants.engine.exp.examples.planners import setup_json_scheduler
+from pants.engine.exp.scheduler import BuildRequest
+from pants.util.contextutil import temporary_dir
+from pants_test.testutils.benchmark import (add_generated_graph_options, benchmark_parser,
+                                              sample_dependencies, timed)
+
+
+class RescanningEngine(LocalMultiprocessEngine):
+  """The reduce loop `LocalMultiprocessEngine` used before it tracked plan readiness up front."""
+
+  def reduce(self, execution_graph, fail_slow=False):
+    executor = self.Executor(self, execution_graph, fail_slow=fail_slow, debug=self._debug)
+
+    pending_submission = {}
+    in_flight = {}
+    satisfied_promises = set()
+
+    def submit_satisfied_pending():
+      for promise, plan in pending_submission.items():
+        if plan.promises.issubset(satisfied_promises):
+          in_flight[promise] = pending_submission.pop(promise)
+          executor.submit(promise, plan)
+
+    def process_one_result():
+      for satisfied_promise in executor.gather_one_result():
+        if satisfied_promise in in_flight:
+          in_flight.pop(satisfied_promise)
+        satisfied_promises.add(satisfied_promise)
+
+    for promise, plan in execution_graph.walk():
+      pending_submission[promise] = plan
+      submit_satisfied_pending()
+      if len(in_flight) == self._pool_size:
+        process_one_result()
+
+    while pending_submission or in_flight:
+      submit_satisfied_pending()
+      process_one_result()
+
+    return executor.finish(execution_graph)
+
+
+def generate_build_root(build_root, targets, fanout, window, seed):
+  """Writes `targets` java targets, each depending on up to `fanout` of the `window` before it."""
+  rng = random.Random(seed)
+
+  def write_json(path, obj):
+    path = os.path.join(build_root, path)
+    if not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as fp:
+      json.dump(obj, fp)
+
+  write_json('3rdparty/jvm/BLD.json', {'type_alias': 'jar',
+                                       'org': 'com.google.guava',
+                                       'name': 'guava',
+                                       'rev': '18.0'})
+  for index in range(targets):
+    dependencies = ['src/java/t{}'.format(d)
+                    for d in sample_dependencies(rng, index, fanout, window)]
+    write_json('src/java/t{}/BLD.json'.format(index),
+               {'type_alias': 'target',
+                'name': 't{}'.format(index),
+                'configurations': [{'type_alias': 'java',
+                                    'files': ['T{}.java'.format(index)],
+                                    'dependencies': ['3rdparty/jvm:guava'] + dependencies}]})
+  return [Address.parse('src/java/t{}'.format(index)) for index in range(targets)]
+
+
+@contextmanager
+def quiet():
+  # The example planners print as they execute.
+  stdout = sys.stdout
+  with open(os.devnull, 'w') as devnull:
+    sys.stdout = devnull
+    try:
+      yield
+    finally:
+      sys.stdout = stdout
+
+
+def engine_for(engine_type, scheduler, args):
+  engine = engine_type(scheduler, pool_size=args.pool_size)
+  if not args.processes:
+    # Swap in threads so the measurement is dominated by scheduling rather than pickling.
+    engine.close()
+    engine._pool = ThreadPool(engine._pool_size)
+  return engine
+
+
+def time_reduce(engine_type, scheduler, execution_graph, args):
+  timings = []
+  for _ in range(args.runs):
+    with closing(engine_for(engine_type, scheduler, args)) as engine:
+      with quiet():
+        elapsed, result = timed(engine.reduce, execution_graph)
+        timings.append(elapsed)
+  return min(timings), result
+
+
+def main():
+  parser = benchmark_parser(__doc__)
+  # Each generated java target yields one javac plan.
+  add_generated_graph_options(parser, targets=10000)
+  parser.add_argument('--pool-size', type=int, default=8)
+  parser.add_argument('--processes', action='store_true', default=False,
+                      help='Use a process pool as the engine does by default; slower and noisier.')
+  parser.add_argument('--no-rescanning', dest='rescanning', action='store_false', default=True,
+                      help='Skip timing the rescanning reduce loop for comparison.')
+  args = parser.parse_args()
+
+  with temporary_dir() as build_root:
+    roots = generate_build_root(build_root, args.targets, args.fanout, args.window, args.seed)
+    _, scheduler = setup_json_scheduler(build_root)
+
+    start = time.time()
+    execution_graph = scheduler.execution_graph(BuildRequest(goals=['compile'],
+                                                             addressable_roots=roots))
+    plans = sum(1 for _ in execution_graph.walk())
+    print('Planned {} plans in {:.3f}s'.format(plans, time.time() - start))
+
+    ready_queue, actual = time_reduce(LocalMultiprocessEngine, scheduler, execution_graph, args)
+    print('ready queue reduce: {:.3f}s'.format(ready_queue))
+
+    if args.rescanning:
+      rescanning, expected = time_reduce(RescanningEngine, scheduler, execution_graph, args)
+      if expected != actual:
+        raise AssertionError('The reduce loops disagree on the root products.')
+      print('rescanning reduce:  {:.3f}s ({:.1f}x slower)'.format(rescanning,
+                                                                   rescanning / ready_queue))
+
+
+if __name__ == '__main__':
+  main()
@@ -7,14 +7,16 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import unittest
+from collections import namedtuple
 from contextlib import closing, contextmanager
 
 from pants.build_graph.address import Address
 from pants.engine.exp.engine import (Engine, LocalMultiprocessEngine, LocalSerialEngine,
-                                     SerializationError)
+                                     LocalThreadedEngine, ReadyQueue, SerializationError)
 from pants.engine.exp.examples.planners import (ApacheThriftError, Classpath, Javac, JavaSources,
                                                 setup_json_scheduler)
 from pants.engine.exp.scheduler import BuildRequest, Promise
+from pants.engine.exp.storage import ProductStore
 
 
 class EngineTest(unittest.TestCase):
@@ -37,8 +39,14 @@ class EngineTest(unittest.TestCase):
     self.assertIsNone(result.error)
 
   @contextmanager
-  def multiprocessing_engine(self, pool_size=None):
-    with closing(LocalMultiprocessEngine(self.scheduler, pool_size=pool_size, debug=True)) as e:
+  def multiprocessing_engine(self, pool_size=None, io_pool_size=0):
+    with closing(LocalMultiprocessEngine(self.scheduler, pool_size=pool_size, debug=True,
+                                         io_pool_size=io_pool_size)) as e:
+      yield e
+
+  @contextmanager
+  def threaded_engine(self, pool_size=None):
+    with closing(LocalThreadedEngine(self.scheduler, pool_size=pool_size)) as e:
       yield e
 
   def test_serial_engine(self):
@@ -53,6 +61,45 @@ class EngineTest(unittest.TestCase):
     with self.multiprocessing_engine(pool_size=1) as engine:
       self.assert_engine(engine)
 
+  def test_multiprocess_engine_io_pool(self):
+    with self.multiprocessing_engine(io_pool_size=2) as engine:
+      self.assert_engine(engine)
+
+  def test_threaded_engine(self):
+    with self.threaded_engine() as engine:
+      self.assert_engine(engine)
+
+  def test_threaded_engine_single_thread(self):
+    with self.threaded_engine(pool_size=1) as engine:
+      self.assert_engine(engine)
+
+  def assert_engine_memoizes(self, engine):
+    self.assert_engine(engine)
+    stats = engine.product_store.stats
+    self.assertEqual(0, stats.hits)
+    self.assertTrue(stats.misses > 0)
+
+    self.assert_engine(engine)
+    self.assertEqual(stats.misses, stats.hits)
+    self.assertEqual(0.5, stats.hit_rate)
+
+  def test_serial_engine_memoizes(self):
+    engine = LocalSerialEngine(self.scheduler, product_store=ProductStore())
+    self.assert_engine_memoizes(engine)
+
+  def test_multiprocess_engine_memoizes(self):
+    with closing(LocalMultiprocessEngine(self.scheduler, debug=True,
+                                         product_store=ProductStore())) as engine:
+      self.assert_engine_memoizes(engine)
+
+  def test_serial_engine_fail_slow_not_memoized(self):
+    engine = LocalSerialEngine(self.scheduler, product_store=ProductStore())
+    self.assert_engine_fail_slow(engine)
+    misses = engine.product_store.stats.misses
+    self.assert_engine_fail_slow(engine)
+    # Only the failed plan is re-executed; the plans depending on it short-circuit as before.
+    self.assertEqual(misses + 1, engine.product_store.stats.misses)
+
   def assert_engine_fail_slow(self, engine):
     build_request = BuildRequest(goals=['compile'],
                                  addressable_roots=[self.java.address, self.java_fail_slow.address])
@@ -87,6 +134,14 @@ class EngineTest(unittest.TestCase):
     with self.multiprocessing_engine(pool_size=1) as engine:
       self.assert_engine_fail_slow(engine)
 
+  def test_multiprocess_engine_fail_slow_io_pool(self):
+    with self.multiprocessing_engine(io_pool_size=2) as engine:
+      self.assert_engine_fail_slow(engine)
+
+  def test_threaded_engine_fail_slow(self):
+    with self.threaded_engine() as engine:
+      self.assert_engine_fail_slow(engine)
+
   def test_multiprocess_unpicklable_inputs(self):
     build_request = BuildRequest(goals=['unpickleable_inputs'],
                                  addressable_roots=[self.java.address])
@@ -102,3 +157,74 @@ class EngineTest(unittest.TestCase):
     with self.multiprocessing_engine() as engine:
       with self.assertRaises(SerializationError):
         engine.execute(build_request)
+
+  def test_threaded_unpicklable(self):
+    for goal in ('unpickleable_inputs', 'unpickleable_result'):
+      build_request = BuildRequest(goals=[goal], addressable_roots=[self.java.address])
+      with self.threaded_engine() as engine:
+        self.assertIsNone(engine.execute(build_request).error)
+
+
+class ReadyQueueTest(unittest.TestCase):
+  class FakePromise(namedtuple('FakePromise', ['name'])):
+    def rebind(self, subject):
+      return self
+
+  FakePlan = namedtuple('FakePlan', ['promises', 'subjects'])
+
+  class FakeExecutionGraph(object):
+    def __init__(self, nodes):
+      self._nodes = nodes
+
+    def walk(self):
+      return iter(self._nodes)
+
+  def graph(self, *dependencies_by_name):
+    # Nodes must be given in post-order, as `ExecutionGraph.walk` would yield them.
+    nodes = []
+    for name, dependencies in dependencies_by_name:
+      plan = self.FakePlan(promises=[self.FakePromise(d) for d in dependencies], subjects=[name])
+      nodes.append((self.FakePromise(name), plan))
+    return self.FakeExecutionGraph(nodes)
+
+  def drain(self, ready_queue):
+    order = []
+    while ready_queue.has_ready():
+      promise, plan = ready_queue.pop_ready()
+      order.append(promise.name)
+      ready_queue.satisfy(promise)
+    return order
+
+  def long_and_short_chains(self):
+    return self.graph(('short', []),
+                      ('a', []),
+                      ('b', ['a']),
+                      ('c', ['b']),
+                      ('root', ['short', 'c']))
+
+  def test_dependencies_first(self):
+    ready_queue = ReadyQueue(self.long_and_short_chains())
+    self.assertEqual(5, len(ready_queue))
+    order = self.drain(ready_queue)
+    self.assertEqual(0, len(ready_queue))
+    self.assertEqual({'short', 'a', 'b', 'c', 'root'}, set(order))
+    self.assertTrue(order.index('a') < order.index('b') < order.index('c') < order.index('root'))
+    self.assertTrue(order.index('short') < order.index('root'))
+
+  def test_critical_path_first(self):
+    # Once the long chain has caught up, ties are broken in walk order.
+    self.assertEqual(['a', 'b', 'short', 'c', 'root'],
+                     self.drain(ReadyQueue(self.long_and_short_chains(), critical_path=True)))
+
+  def test_walk_order(self):
+    self.assertEqual(['short', 'a', 'b', 'c', 'root'],
+                     self.drain(ReadyQueue(self.long_and_short_chains(), critical_path=False)))
+
+  def test_satisfy_idempotent(self):
+    ready_queue = ReadyQueue(self.graph(('a', []), ('b', []), ('root', ['a', 'b'])))
+    for promise in [ready_queue.pop_ready()[0], ready_queue.pop_ready()[0]]:
+      self.assertFalse(ready_queue.has_ready())
+      ready_queue.satisfy(promise)
+      ready_queue.satisfy(promise)
+    self.assertEqual('root', ready_queue.pop_ready()[0].name)
+    self.assertEqual(1, len(ready_queue))
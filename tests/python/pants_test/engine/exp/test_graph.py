@@ -5,6 +5,7 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import json
 import os
 import unittest
 from functools import partial
@@ -17,6 +18,8 @@ from pants.engine.exp.mapper import AddressMapper
 from pants.engine.exp.parsers import parse_json, python_assignments_parser, python_callbacks_parser
 from pants.engine.exp.struct import Struct, StructWithDeps
 from pants.engine.exp.targets import Target
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_open
 
 
 class ApacheThriftConfiguration(StructWithDeps):
@@ -271,3 +274,69 @@ class LazyResolvingGraphTest(GraphTestBase):
     graph = self.create_graph(build_pattern=r'.+\.BUILD$',
                               parser=python_callbacks_parser(symbol_table=self.symbol_table))
     self.do_test_codegen_simple(graph)
+
+
+class GraphInvalidationTest(unittest.TestCase):
+  def setUp(self):
+    build_root_context = temporary_dir()
+    self.build_root = build_root_context.__enter__()
+    self.addCleanup(build_root_context.__exit__, None, None, None)
+
+    # a depends on b and nothing depends on c.
+    self.write_build_file('a', name='a', dependencies=['//b'])
+    self.write_build_file('b', name='b')
+    self.write_build_file('c', name='c')
+
+  def write_build_file(self, namespace, **kwargs):
+    kwargs.update(type_alias='target')
+    with safe_open(os.path.join(self.build_root, namespace, 'BLD.json'), 'w') as fp:
+      json.dump(kwargs, fp)
+
+  def create_graph(self, inline=True):
+    parser = partial(parse_json, symbol_table={'target': StructWithDeps})
+    mapper = AddressMapper(build_root=self.build_root, build_pattern=r'^BLD.json$', parser=parser)
+    return Graph(mapper, inline=inline)
+
+  def resolve_all(self, graph):
+    return {spec: graph.resolve(Address.parse(spec)) for spec in ('a', 'b', 'c')}
+
+  def test_invalidate_namespace(self):
+    graph = self.create_graph()
+    resolved = self.resolve_all(graph)
+
+    self.write_build_file('b', name='b', dependencies=['//c'])
+    self.assertEqual({Address.parse('a'), Address.parse('b')}, graph.invalidate_namespace('b'))
+
+    re_resolved = self.resolve_all(graph)
+    self.assertIs(resolved['c'], re_resolved['c'])
+    self.assertIsNot(resolved['b'], re_resolved['b'])
+    self.assertEqual([resolved['c']], re_resolved['b'].dependencies)
+    self.assertEqual([re_resolved['b']], re_resolved['a'].dependencies)
+
+  def test_invalidate_dependee_namespace(self):
+    graph = self.create_graph()
+    resolved = self.resolve_all(graph)
+
+    self.assertEqual({Address.parse('a')}, graph.invalidate_namespace('a'))
+    re_resolved = self.resolve_all(graph)
+    self.assertIsNot(resolved['a'], re_resolved['a'])
+    self.assertIs(resolved['b'], re_resolved['b'])
+
+  def test_invalidate_build_file(self):
+    graph = self.create_graph()
+    resolved = self.resolve_all(graph)
+
+    os.unlink(os.path.join(self.build_root, 'c', 'BLD.json'))
+    self.assertEqual({Address.parse('c')}, graph.invalidate_build_file('c/BLD.json'))
+    self.assertIs(resolved['a'], graph.resolve(Address.parse('a')))
+    with self.assertRaises(ResolveError):
+      graph.resolve(Address.parse('c'))
+
+  def test_invalidate_lazy(self):
+    graph = self.create_graph(inline=False)
+    resolved = self.resolve_all(graph)
+
+    # Lazily resolved objects only point at their dependencies, so they stay valid.
+    self.assertEqual({Address.parse('b')}, graph.invalidate_namespace('b'))
+    self.assertIs(resolved['a'], graph.resolve(Address.parse('a')))
+    self.assertIsNot(resolved['b'], graph.resolve(Address.parse('b')))
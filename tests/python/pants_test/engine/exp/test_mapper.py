@@ -252,6 +252,35 @@ class AddressMapperTest(unittest.TestCase):
     with self.assertRaises(ResolveError):
       self.address_mapper.resolve(Address.parse('a/b'))
 
+  def test_invalidate_namespace(self):
+    resolved = self.address_mapper.resolve(Address.parse('a/b'))
+    self.assertEqual(self.a_b_target, resolved)
+
+    build_file = os.path.join(self.build_root, 'a/b/b.BUILD.json')
+    os.unlink(build_file)
+    self.address_mapper.invalidate_namespace('a/b')
+    with self.assertRaises(ResolveError):
+      self.address_mapper.resolve(Address.parse('a/b'))
+
+    # The deleted BUILD file's old parse must not be resurrected when it re-appears.
+    with safe_open(build_file, 'w') as fp:
+      fp.write('{"type_alias": "struct", "name": "b"}')
+    self.address_mapper.invalidate_namespace('a/b')
+    self.assertEqual(Struct(name='b'), self.address_mapper.resolve(Address.parse('a/b')))
+
+  def test_invalidate_namespace_leaves_others(self):
+    a_b_family = self.address_mapper.family('a/b')
+    a_d_family = self.address_mapper.family('a/d')
+
+    self.address_mapper.invalidate_namespace('a/d')
+    self.assertIs(a_b_family, self.address_mapper.family('a/b'))
+    self.assertIsNot(a_d_family, self.address_mapper.family('a/d'))
+
+  def test_invalidate_build_file_root(self):
+    root_family = self.address_mapper.family('')
+    self.assertEqual('', self.address_mapper.invalidate_build_file('root.BUILD.json'))
+    self.assertIsNot(root_family, self.address_mapper.family(''))
+
   @staticmethod
   def addr(spec):
     return Address.parse(spec)
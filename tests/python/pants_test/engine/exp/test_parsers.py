@@ -37,6 +37,17 @@ def parse(parser, document, **args):
     return parser(fp.name, **args)
 
 
+class CountingBobs(object):
+  """A symbol that counts the Bobs it creates."""
+
+  def __init__(self):
+    self.count = 0
+
+  def __call__(self, **kwargs):
+    self.count += 1
+    return Bob(**kwargs)
+
+
 class JsonParserTest(unittest.TestCase):
   def parse(self, document, **kwargs):
     return parse(parsers.parse_json, document, **kwargs)
@@ -186,6 +197,29 @@ class JsonParserTest(unittest.TestCase):
     results = self.parse(document)
     self.assertEqual([Bob(hobbies=[1, 2, 3]), {}, Bob(age=42)], results)
 
+  def test_top_level_scalar(self):
+    with self.assertRaises(ParseError):
+      self.parse('{"age": 42}\n42')
+
+  def test_cached(self):
+    bobs = CountingBobs()
+    document = dedent("""
+    # A cached Bob.
+    {"type_alias": "bob", "age": 42}
+    """)
+    self.assertEqual([Bob(age=42)], self.parse(document, symbol_table={'bob': bobs}))
+    self.assertEqual([Bob(age=42)], self.parse(document, symbol_table={'bob': bobs}))
+    self.assertEqual(1, bobs.count)
+
+    # The symbol table is part of the cache key.
+    other_bobs = CountingBobs()
+    self.assertEqual([Bob(age=42)], self.parse(document, symbol_table={'bob': other_bobs}))
+    self.assertEqual(1, other_bobs.count)
+
+    self.assertEqual([Bob(age=43)],
+                     self.parse(document.replace('42', '43'), symbol_table={'bob': bobs}))
+    self.assertEqual(2, bobs.count)
+
   def test_error_presentation(self):
     document = dedent("""
     # An example with several Bobs.
@@ -345,3 +379,11 @@ class PythonCallbacksParserTest(unittest.TestCase):
     results = parse(parsers.python_callbacks_parser(symbol_table), document)
     self.assertEqual([Bob(name='bill', hobbies=[1, 2, 3])], results)
     self.assertEqual('nancy', results[0]._asdict()['type_alias'])
+
+  def test_cached(self):
+    bobs = CountingBobs()
+    parser = parsers.python_callbacks_parser({'nancy': bobs})
+    document = "nancy(name='bill')"
+    self.assertEqual([Bob(name='bill')], parse(parser, document))
+    self.assertEqual([Bob(name='bill')], parse(parser, document))
+    self.assertEqual(1, bobs.count)
@@ -131,6 +131,14 @@ class SchedulerTest(unittest.TestCase):
                                       Promise(Classpath, self.thrift)])),
                      self.extract_product_type_and_plan(plans[3]))
 
+  def test_io_bound_hints(self):
+    build_request = BuildRequest(goals=['compile'], addressable_roots=[self.java.address])
+    execution_graph = self.scheduler.execution_graph(build_request)
+
+    io_bound = {plan.func_or_task_type.value: execution_graph.is_io_bound(plan)
+                for _, plan in execution_graph.walk()}
+    self.assertEqual({gen_apache_thrift: False, IvyResolve: True, Javac: False}, io_bound)
+
   def test_consumes_resources(self):
     build_request = BuildRequest(goals=['compile'], addressable_roots=[self.consumes_resources.address])
     execution_graph = self.scheduler.execution_graph(build_request)
@@ -0,0 +1,65 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import unittest
+
+from pants.engine.exp.scheduler import Plan
+from pants.engine.exp.storage import ProductStore
+
+
+def concat(left, right):
+  return left + right
+
+
+def reverse(left, right):
+  return right + left
+
+
+class ProductStoreTest(unittest.TestCase):
+  def key_for(self, store, func, subjects=('a',), **inputs):
+    plan = Plan(func, subjects, **inputs)
+    return store.key_for(plan, plan.bind({}))
+
+  def test_key_for(self):
+    store = ProductStore()
+    key = self.key_for(store, concat, left='a', right='b')
+    self.assertEqual(key, self.key_for(store, concat, right='b', left='a'))
+    self.assertNotEqual(key, self.key_for(store, concat, left='a', right='c'))
+    self.assertNotEqual(key, self.key_for(store, concat, subjects=('b',), left='a', right='b'))
+    self.assertNotEqual(key, self.key_for(store, reverse, left='a', right='b'))
+    self.assertEqual(0, store.stats.uncacheable)
+
+  def test_key_for_uncacheable(self):
+    store = ProductStore()
+    self.assertIsNone(self.key_for(store, lambda left, right: left, left='a', right='b'))
+    self.assertIsNone(self.key_for(store, concat, left='a', right=lambda: 'b'))
+    self.assertEqual(2, store.stats.uncacheable)
+
+  def test_get_put(self):
+    store = ProductStore()
+    self.assertIsNone(store.get('key'))
+    store.put('key', 'product')
+    self.assertEqual('product', store.get('key'))
+    self.assertEqual(1, store.stats.hits)
+    self.assertEqual(1, store.stats.misses)
+    self.assertEqual(0.5, store.stats.hit_rate)
+
+  def test_lru_eviction(self):
+    store = ProductStore(max_entries=2)
+    store.put('a', 1)
+    store.put('b', 2)
+    store.get('a')
+    store.put('c', 3)
+    self.assertEqual(2, len(store))
+    self.assertEqual(1, store.stats.evictions)
+    self.assertIsNone(store.get('b'))
+    self.assertEqual(1, store.get('a'))
+    self.assertEqual(3, store.get('c'))
+
+  def test_invalid_max_entries(self):
+    with self.assertRaises(ValueError):
+      ProductStore(max_entries=0)
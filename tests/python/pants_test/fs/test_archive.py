@@ -6,11 +6,15 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import struct
 import unittest
+import zipfile
+
+import mock
 
 from pants.fs.archive import archiver
-from pants.util.contextutil import temporary_dir
-from pants.util.dirutil import safe_mkdir, safe_walk, touch
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_mkdir, safe_walk, touch
 
 
 class ArchiveTest(unittest.TestCase):
@@ -72,3 +76,65 @@ class ArchiveTest(unittest.TestCase):
         with temporary_dir() as todir:
           archiver('zip').extract(archive, todir, filter_func=do_filter)
           self.assertEquals(set(['allowed.txt']), self._listtree(todir, empty_dirs=False))
+
+  def test_zip_reuses_unchanged_entries(self):
+    def compressed_entries(archive):
+      with open_zip(archive) as zip:
+        return {info.filename: (info.CRC, info.compress_size, self._compressed_data(zip, info))
+                for info in zip.infolist()}
+
+    with temporary_dir() as fromdir, temporary_dir() as archivedir:
+      index_file = os.path.join(archivedir, 'archive.index')
+      safe_file_dump(os.path.join(fromdir, 'a/unchanged.txt'), 'unchanged ' * 100)
+      safe_file_dump(os.path.join(fromdir, 'a/changed.txt'), 'changed ' * 100)
+      archive = archiver('zip').create(fromdir, archivedir, 'archive', index_file=index_file)
+      entries = compressed_entries(archive)
+
+      safe_file_dump(os.path.join(fromdir, 'a/changed.txt'), 'changed again ' * 100)
+      safe_file_dump(os.path.join(fromdir, 'a/added.txt'), 'added ' * 100)
+
+      with mock.patch.object(zipfile.ZipFile, 'write', autospec=True,
+                             side_effect=zipfile.ZipFile.write) as mock_write:
+        archiver('zip').create(fromdir, archivedir, 'archive', index_file=index_file)
+        written = sorted(call[0][2] for call in mock_write.call_args_list)
+      self.assertEqual(['a/added.txt', 'a/changed.txt'], written)
+
+      # Only the new and changed files were compressed: the unchanged entry's data was copied.
+      reused_entries = compressed_entries(archive)
+      self.assertEqual(entries['a/unchanged.txt'], reused_entries['a/unchanged.txt'])
+      self.assertNotEqual(entries['a/changed.txt'], reused_entries['a/changed.txt'])
+      with open_zip(archive) as zip:
+        self.assertIsNone(zip.testzip())
+        self.assertEqual(b'unchanged ' * 100, zip.read('a/unchanged.txt'))
+        self.assertEqual(b'changed again ' * 100, zip.read('a/changed.txt'))
+
+  def test_zip_rewritten_without_valid_index(self):
+    with temporary_dir() as fromdir, temporary_dir() as archivedir:
+      index_file = os.path.join(archivedir, 'archive.index')
+      safe_file_dump(os.path.join(fromdir, 'a.txt'), 'a' * 100)
+      archive = archiver('zip').create(fromdir, archivedir, 'archive', index_file=index_file)
+
+      # An archive changed since its index was written has unknown entries.
+      os.utime(archive, (0, 0))
+      with mock.patch.object(zipfile.ZipFile, 'write', autospec=True,
+                             side_effect=zipfile.ZipFile.write) as mock_write:
+        archiver('zip').create(fromdir, archivedir, 'archive', index_file=index_file)
+        self.assertTrue(mock_write.called)
+
+      with open_zip(archive) as zip:
+        self.assertIsNone(zip.testzip())
+        self.assertEqual(b'a' * 100, zip.read('a.txt'))
+
+  @staticmethod
+  def _data_offset(zip, info):
+    # The compressed data follows the entry's local header, whose name and extra field may differ
+    # in length from those recorded in the central directory.
+    zip.fp.seek(info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, zip.fp.read(zipfile.sizeFileHeader))
+    return (info.header_offset + zipfile.sizeFileHeader +
+            header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH])
+
+  @classmethod
+  def _compressed_data(cls, zip, info):
+    zip.fp.seek(cls._data_offset(zip, info))
+    return zip.fp.read(info.compress_size)
@@ -0,0 +1,58 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import threading
+import time
+import unittest
+from collections import Counter
+
+from pants.goal.sampling_profiler import SamplingProfiler
+from pants.util.contextutil import temporary_dir
+
+
+def spin_in_distinctively_named_function(event):
+  while not event.is_set():
+    time.sleep(0.001)
+
+
+class SamplingProfilerTest(unittest.TestCase):
+  def setUp(self):
+    self.profiler = SamplingProfiler(interval_secs=0.001)
+
+  def tearDown(self):
+    self.profiler.close()
+
+  def test_profiles_only_the_given_thread(self):
+    done = threading.Event()
+    thread = threading.Thread(target=spin_in_distinctively_named_function, args=(done,))
+    thread.start()
+    try:
+      self.profiler.start('spinner', thread.ident)
+      self.profiler.start('idle')
+      time.sleep(0.1)
+      spinner = self.profiler.stop('spinner')
+    finally:
+      done.set()
+      thread.join()
+    self.profiler.stop('idle')
+
+    self.assertTrue(spinner)
+    for stack in spinner:
+      frames = stack.split(';')
+      self.assertIn('spin_in_distinctively_named_function', frames[-1])
+      self.assertTrue(all(' ' not in frame for frame in frames))
+
+  def test_stop_unknown(self):
+    self.assertIsNone(self.profiler.stop('unknown'))
+
+  def test_write_collapsed(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'profiles', 'main_compile.collapsed')
+      SamplingProfiler.write_collapsed(path, Counter({'main;compile;zinc': 3, 'main;compile': 1}))
+      with open(path) as fp:
+        self.assertEqual('main;compile 1\nmain;compile;zinc 3\n', fp.read())
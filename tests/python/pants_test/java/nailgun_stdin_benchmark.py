@@ -0,0 +1,112 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+"""Measures nailgun client stdin throughput against a local echo nailgun stand-in.
+
+Each run pipes a file through a real `NailgunClientSession` to a stand-in that echoes every stdin
+chunk back as stdout, comparing the client's stdin read size before and after it was raised to
+`NailgunStreamReader.BUF_SIZE`.
+
+Run with: ./pants run tests/python/pants_test/java:nailgun_stdin_benchmark -- --megabytes=256
+"""
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import io
+import os
+import socket
+import threading
+from contextlib import closing, contextmanager
+
+from pants.java.nailgun_client import NailgunClientSession
+from pants.java.nailgun_io import NailgunStreamReader
+from pants.java.nailgun_protocol import ChunkType, NailgunProtocol
+from pants.util.contextutil import temporary_file
+from pants.util.socket import RecvBufferedSocket
+from pants_test.testutils.benchmark import benchmark_parser, best_of
+
+
+class CountingSink(object):
+  """Counts bytes written while forwarding them to /dev/null so flushes cost a real syscall."""
+
+  def __init__(self, fp):
+    self._fp = fp
+    self.size = 0
+
+  def write(self, payload):
+    self.size += len(payload)
+    self._fp.write(payload)
+
+  def flush(self):
+    self._fp.flush()
+
+
+@contextmanager
+def echo_server():
+  """A nailgun stand-in that echoes each stdin chunk back as stdout, then exits 0 at stdin EOF."""
+  server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+  server.bind(('127.0.0.1', 0))
+  server.listen(1)
+
+  def echo(conn):
+    NailgunProtocol.parse_request(conn)
+    NailgunProtocol.send_start_reading_input(conn)
+    while True:
+      chunk_type, payload = NailgunProtocol.read_chunk(conn)
+      if chunk_type == ChunkType.STDIN:
+        NailgunProtocol.send_stdout(conn, payload)
+      elif chunk_type == ChunkType.STDIN_EOF:
+        NailgunProtocol.send_exit(conn, b'0')
+        return
+
+  def serve():
+    while True:
+      try:
+        conn, _ = server.accept()
+      except socket.error:
+        return
+      with closing(RecvBufferedSocket(conn)) as conn:
+        echo(conn)
+
+  thread = threading.Thread(target=serve)
+  thread.daemon = True
+  thread.start()
+  try:
+    yield server.getsockname()
+  finally:
+    server.close()
+
+
+def run_once(address, input_path, buf_size):
+  sock = RecvBufferedSocket(socket.create_connection(address))
+  with closing(sock), open(input_path, 'rb') as stdin, open(os.devnull, 'wb') as devnull:
+    stdout = CountingSink(devnull)
+    session = NailgunClientSession(sock, in_fd=None, out_fd=stdout, err_fd=stdout)
+    session._input_reader = NailgunStreamReader(stdin, sock, buf_size=buf_size)
+    session.execute('/', 'org.pantsbuild.Echo')
+    return stdout.size
+
+
+def main():
+  parser = benchmark_parser(__doc__)
+  parser.add_argument('--megabytes', type=int, default=64,
+                      help='The amount of input to pipe through the client.')
+  args = parser.parse_args()
+
+  with temporary_file() as fp, echo_server() as address:
+    block = b'x' * (1024 * 1024)
+    for _ in range(args.megabytes):
+      fp.write(block)
+    fp.close()
+
+    for name, buf_size in (('default', io.DEFAULT_BUFFER_SIZE),
+                           ('BUF_SIZE', NailgunStreamReader.BUF_SIZE)):
+      best, size = best_of(args.runs, run_once, address, fp.name, buf_size)
+      print('{:>8} ({:>6} byte reads): {:8.3f}s  {:8.1f} MB/s'
+            .format(name, buf_size, best, size / best / 1024 / 1024))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,111 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import threading
+import unittest
+
+import mock
+
+from pants.java.nailgun_executor import NailgunExecutor, NailgunExecutorPool
+from pants.pantsd.process_manager import ProcessManager
+from pants.util.contextutil import temporary_dir
+
+
+class FakeDistribution(object):
+  java = '/fake/bin/java'
+  version = '1.8.0'
+
+  def validate(self):
+    pass
+
+
+class NailgunExecutorPoolTest(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir_context = temporary_dir()
+    self.buildroot = self.tmpdir_context.__enter__()
+    for module in ('pants.pantsd.process_manager', 'pants.java.nailgun_executor'):
+      patcher = mock.patch('{}.get_buildroot'.format(module), return_value=self.buildroot)
+      patcher.start()
+      self.addCleanup(patcher.stop)
+    self.addCleanup(self.tmpdir_context.__exit__, None, None, None)
+
+  def pool(self, identity='ng_Test', **kwargs):
+    return NailgunExecutorPool(identity, os.path.join(self.buildroot, 'workdir'), [],
+                               FakeDistribution(), **kwargs)
+
+  def create_member_metadata(self, pool, fingerprint, last_used):
+    for slot in range(pool._pool_size):
+      ProcessManager.write_metadata_by_name(pool._member_name(fingerprint, slot),
+                                            NailgunExecutorPool._LAST_USED_KEY,
+                                            repr(last_used))
+
+  def test_invalid_sizes(self):
+    with self.assertRaises(ValueError):
+      self.pool(pool_size=0)
+    with self.assertRaises(ValueError):
+      self.pool(max_fingerprints=0)
+
+  def test_select_least_loaded(self):
+    pool = self.pool(identity='ng_Select', pool_size=2)
+    first = pool._select_member('abc123')
+    second = pool._select_member('abc123')
+    self.assertNotEqual(first, second)
+    pool._release(first)
+    self.assertEqual(first, pool._select_member('abc123'))
+    pool._release(first)
+    pool._release(second)
+
+  def test_retire_least_recently_used(self):
+    pool = self.pool(identity='ng_Retire', pool_size=2, max_fingerprints=2)
+    self.create_member_metadata(pool, 'aaaaaaaaaaaa', last_used=1)
+    self.create_member_metadata(pool, 'bbbbbbbbbbbb', last_used=3)
+    self.create_member_metadata(pool, 'cccccccccccc', last_used=2)
+
+    pool._retire_stale('dddddddddddd')
+
+    self.assertEqual(['bbbbbbbbbbbb'], sorted(pool._pool_members()))
+
+  def test_retire_ignores_other_identities(self):
+    pool = self.pool(identity='ng_Mine', max_fingerprints=1)
+    other = self.pool(identity='ng_Other', max_fingerprints=1)
+    self.create_member_metadata(pool, 'aaaaaaaaaaaa', last_used=1)
+    self.create_member_metadata(other, 'bbbbbbbbbbbb', last_used=1)
+
+    pool._retire_stale('cccccccccccc')
+
+    self.assertEqual({}, pool._pool_members())
+    self.assertEqual(['bbbbbbbbbbbb'], list(other._pool_members()))
+
+  def test_run_dispatches_and_prewarms(self):
+    pool = self.pool(identity='ng_Run', pool_size=3)
+    prewarmed = []
+    prewarm_lock = threading.Lock()
+    ran = []
+
+    def prewarm(executor, jvm_options, classpath):
+      with prewarm_lock:
+        prewarmed.append(executor._identity)
+
+    def runner(executor, classpath, main, jvm_options=None, args=None, cwd=None):
+      fake_runner = mock.Mock()
+      fake_runner.run.side_effect = lambda **kwargs: ran.append(executor._identity) or 0
+      return fake_runner
+
+    with mock.patch.object(NailgunExecutor, 'prewarm', autospec=True, side_effect=prewarm):
+      with mock.patch.object(NailgunExecutor, 'runner', autospec=True, side_effect=runner):
+        self.assertEqual(0, pool.execute(['a.jar'], 'org.pantsbuild.Main'))
+        for thread in threading.enumerate():
+          if thread.name.startswith('prewarm-'):
+            thread.join()
+
+    self.assertEqual(1, len(ran))
+    self.assertEqual(2, len(prewarmed))
+    self.assertNotIn(ran[0], prewarmed)
+    self.assertIsNotNone(ProcessManager.read_metadata_by_name(ran[0],
+                                                              NailgunExecutorPool._LAST_USED_KEY,
+                                                              float))
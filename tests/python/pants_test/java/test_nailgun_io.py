@@ -7,7 +7,6 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import errno
 import inspect
-import io
 import os
 import socket
 import time
@@ -78,7 +77,7 @@ class TestNailgunStreamReader(unittest.TestCase):
 
     self.assertTrue(self.reader.is_stopped)
 
-    mock_read.assert_called_with(-1, io.DEFAULT_BUFFER_SIZE)
+    mock_read.assert_called_with(-1, NailgunStreamReader.BUF_SIZE)
     self.assertEquals(mock_read.call_count, 2)
 
     self.mock_socket.shutdown.assert_called_once_with(socket.SHUT_WR)
@@ -0,0 +1,81 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.reporting.report_writer import ReportWriter
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_rmtree
+
+
+class ReportWriterTest(unittest.TestCase):
+  def read(self, path):
+    with open(path, 'rb') as fp:
+      return fp.read()
+
+  def test_appends(self):
+    with temporary_dir() as root:
+      report = os.path.join(root, 'build.html')
+      output = os.path.join(root, 'w1.stdout')
+      writer = ReportWriter(root, max_queued=3, max_batch=2)
+      writer.start()
+      for i in range(100):
+        writer.append(report, '<div>{}</div>'.format(i))
+        writer.append(output, 'line {}\xe2\x9c\x93\n'.format(i).encode('utf-8'))
+      writer.close()
+
+      self.assertEqual(''.join('<div>{}</div>'.format(i) for i in range(100)).encode('utf-8'),
+                       self.read(report))
+      self.assertEqual(b''.join('line {}\xe2\x9c\x93\n'.format(i).encode('utf-8')
+                                for i in range(100)),
+                       self.read(output))
+
+  def test_overwrite(self):
+    with temporary_dir() as root:
+      stats = os.path.join(root, 'self_timings')
+      writer = ReportWriter(root)
+      writer.start()
+      writer.overwrite(stats, 'first')
+      writer.overwrite(stats, 'second')
+      writer.close()
+      self.assertEqual(b'second', self.read(stats))
+
+  def test_close_file(self):
+    with temporary_dir() as root:
+      output = os.path.join(root, 'w1.stdout')
+      writer = ReportWriter(root)
+      writer.start()
+      writer.append(output, 'before')
+      writer.close_file(output)
+      # Output after a close is appended to what was written before.
+      writer.append(output, 'after')
+      writer.close()
+      self.assertEqual(b'beforeafter', self.read(output))
+
+  def test_overwrite_appended(self):
+    with temporary_dir() as root:
+      report = os.path.join(root, 'build.html')
+      writer = ReportWriter(root, max_batch=1)
+      writer.start()
+      writer.append(report, 'appended at length')
+      writer.overwrite(report, 'short')
+      writer.append(report, '+more')
+      writer.close()
+      self.assertEqual(b'short+more', self.read(report))
+
+  def test_root_dir_removed(self):
+    with temporary_dir() as root:
+      html_dir = os.path.join(root, 'html')
+      os.makedirs(html_dir)
+      writer = ReportWriter(html_dir)
+      writer.start()
+      safe_rmtree(html_dir)
+      writer.append(os.path.join(html_dir, 'build.html'), 'dropped')
+      writer.overwrite(os.path.join(html_dir, 'self_timings'), 'dropped')
+      writer.close()
+      self.assertFalse(os.path.exists(html_dir))
@@ -0,0 +1,76 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import os
+import threading
+import unittest
+
+from pants.base.workunit import WorkUnit, WorkUnitLabel
+from pants.reporting.report import Report
+from pants.reporting.trace_reporter import TraceReporter
+from pants.util.contextutil import temporary_dir
+
+
+class TraceReporterTest(unittest.TestCase):
+  def run_workunit(self, reporter, run_info_dir, name, parent=None, labels=None):
+    workunit = WorkUnit(run_info_dir, parent, name, labels=labels)
+    workunit.start()
+    reporter.start_workunit(workunit)
+    return workunit
+
+  def end_workunit(self, reporter, workunit, outcome=WorkUnit.SUCCESS):
+    workunit.set_outcome(outcome)
+    workunit.end()
+    reporter.end_workunit(workunit)
+
+  def test_trace(self):
+    with temporary_dir() as tmpdir:
+      trace_file = os.path.join(tmpdir, 'reports', 'trace.json')
+      settings = TraceReporter.Settings(log_level=Report.INFO, trace_file=trace_file)
+      reporter = TraceReporter(run_tracker=None, settings=settings)
+      reporter.open()
+
+      root = self.run_workunit(reporter, tmpdir, 'all')
+      compile = self.run_workunit(reporter, tmpdir, 'compile', parent=root,
+                                  labels=[WorkUnitLabel.TASK, WorkUnitLabel.COMPILER])
+
+      def background():
+        failed = self.run_workunit(reporter, tmpdir, 'resolve', parent=root)
+        self.end_workunit(reporter, failed, outcome=WorkUnit.FAILURE)
+      thread = threading.Thread(target=background, name='worker-1')
+      thread.start()
+      thread.join()
+
+      self.end_workunit(reporter, compile)
+      self.end_workunit(reporter, root)
+      reporter.close()
+
+      with open(trace_file) as fp:
+        events = json.load(fp)
+
+    def spans(ph):
+      return [(e['name'], e['tid']) for e in events if e['ph'] == ph]
+
+    main_tid = threading.current_thread().ident
+    self.assertEqual([('all', main_tid), ('compile', main_tid), ('resolve', thread.ident)],
+                     spans('B'))
+    self.assertEqual([('resolve', thread.ident), ('compile', main_tid), ('all', main_tid)],
+                     spans('E'))
+
+    thread_names = {e['tid']: e['args']['name'] for e in events if e['name'] == 'thread_name'}
+    self.assertEqual({main_tid: threading.current_thread().name, thread.ident: 'worker-1'},
+                     thread_names)
+
+    begin_compile = next(e for e in events if e['ph'] == 'B' and e['name'] == 'compile')
+    self.assertEqual('COMPILER,TASK', begin_compile['cat'])
+    self.assertEqual('all:compile', begin_compile['args']['path'])
+    self.assertEqual(int(compile.start_time * 1000000), begin_compile['ts'])
+
+    end_resolve = next(e for e in events if e['ph'] == 'E' and e['name'] == 'resolve')
+    self.assertEqual('FAILURE', end_resolve['args']['outcome'])
+    self.assertEqual({os.getpid()}, {e['pid'] for e in events})
@@ -233,6 +233,55 @@ class GitTest(unittest.TestCase):
     with current_reader.open('dir/relative-dotdot') as f:
       self.assertEquals('Hello World.\u2764'.encode('utf-8'), f.read())
 
+  def test_walk(self):
+    with environment_as(GIT_DIR=self.gitdir, GIT_WORK_TREE=self.worktree):
+      for path in 'nested/a/b/f', 'nested/a/g', 'nested/h':
+        touch(os.path.join(self.worktree, path))
+      os.symlink('b', os.path.join(self.worktree, 'nested', 'a', 'link-to-b'))
+      os.symlink('a/g', os.path.join(self.worktree, 'nested', 'link-to-g'))
+      subprocess.check_call(['git', 'add', 'nested'])
+      subprocess.check_call(['git', 'commit', '-m', 'Add nested dirs.'])
+      rev = subprocess.check_output(['git', 'rev-parse', 'HEAD']).strip()
+
+    def normalize(walk):
+      return sorted((path, sorted(dirnames), sorted(filenames))
+                    for path, dirnames, filenames in walk)
+
+    reader = self.git.repo_reader(rev)
+    expected = [
+      ('nested', ['a'], ['h', 'link-to-g']),
+      ('nested/a', ['b', 'link-to-b'], ['g']),
+      ('nested/a/b', [], ['f']),
+      ('nested/a/link-to-b', [], ['f']),
+    ]
+    self.assertEqual(expected, normalize(reader.walk('nested')))
+    self.assertEqual(expected[1:], normalize(reader.walk('nested/a')))
+    self.assertEqual([], list(reader.walk('nested/h')))
+    self.assertEqual([], list(reader.walk('no-such-dir')))
+
+    topdown = [path for path, _, _ in reader.walk('nested')]
+    self.assertEqual('nested', topdown[0])
+    bottomup = [path for path, _, _ in reader.walk('nested', topdown=False)]
+    self.assertEqual('nested', bottomup[-1])
+
+    # A fresh reader of the same rev reads the same trees from the shared cache.
+    fresh_reader = self.git.repo_reader(rev)
+    self.assertEqual(['f'], fresh_reader.listdir('nested/a/link-to-b'))
+    self.assertEqual(expected, normalize(fresh_reader.walk('nested')))
+
+  def test_read_objects_pipelined(self):
+    reader = self.git.repo_reader(self.initial_rev)
+    # Enough requests that the responses overflow the pipe from git if they aren't read eagerly.
+    specs = ['{}:dir/f'.format(self.initial_rev)] * 10000 + ['{}:missing'.format(self.initial_rev)]
+    results = reader._read_objects_from_repo(specs)
+    self.assertEqual(len(specs), len(results))
+    self.assertEqual({('blob', 'file in subdir')},
+                     {(object_type, data) for _, object_type, data in results[:-1]})
+    self.assertIsNone(results[-1])
+
+    with reader.open('dir/f') as f:
+      self.assertEquals('file in subdir', f.read())
+
   def test_integration(self):
     self.assertEqual(set(), self.git.changed_files())
     self.assertEqual({'README'}, self.git.changed_files(from_commit='HEAD^'))
@@ -8,7 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import os
 import unittest
 
-from pants.stats.statsdb import StatsDB
+from pants.stats.statsdb import StatsDB, StatsDBError
 from pants.util.contextutil import temporary_dir
 
 
@@ -16,6 +16,29 @@ def t(label, timing):
   return {'label': label, 'timing': timing}
 
 
+def run_info(run_id, timestamp, cmd_line='pants compile --foo-bar baz:qux'):
+  return {
+    'id': run_id,
+    'timestamp': str(timestamp),
+    'machine': 'ernie',
+    'user': 'bert',
+    'version': '9.8.7',
+    'buildroot': '/path/to/repo',
+    'outcome': 'SUCCESS',
+    'cmd_line': cmd_line
+  }
+
+
+def cache_stat(cache_name, hits, misses):
+  return {
+    'cache_name': cache_name,
+    'num_hits': len(hits),
+    'num_misses': len(misses),
+    'hits': [[target, ''] for target in hits],
+    'misses': [[target, 'uncached'] for target in misses]
+  }
+
+
 class StatsDBTest(unittest.TestCase):
   def test_statsdb(self):
     with temporary_dir() as tmpdir:
@@ -60,3 +83,62 @@ class StatsDBTest(unittest.TestCase):
       self.assertEqual(
         sorted([('2015-08-03', 'compile.java', 2, 21340), ('2015-08-03', 'resolve.ivy', 1, 56000)]),
         sorted(aggs))
+
+      all_aggs = list(statsdb.get_aggregated_stats_for_cmd_line('self_timings', '%'))
+      self.assertEqual(sorted(aggs), sorted(all_aggs))
+      self.assertEqual([], list(statsdb.get_stats_for_cmd_line('self_timings', '% test %')))
+
+  def test_history(self):
+    with temporary_dir() as tmpdir:
+      statsdb = StatsDB(os.path.join(tmpdir, 'statsdb.sqlite'))
+      statsdb.ensure_tables()
+      statsdb.insert_stats({
+        'run_info': run_info('run1', 1000),
+        'cumulative_timings': [t('main:compile:zinc', 10), t('main:resolve:ivy', 3)],
+        'self_timings': [],
+        'artifact_cache_stats': [cache_stat('compile', hits=['a:a'], misses=['b:b'])]
+      })
+      statsdb.insert_stats({
+        'run_info': run_info('run2', 2000),
+        'cumulative_timings': [t('main:compile:zinc', 20)],
+        'self_timings': [],
+        'artifact_cache_stats': [cache_stat('compile', hits=['a:a', 'b:b'], misses=[])]
+      })
+      # Stats from before cache stats were stored.
+      statsdb.insert_stats({
+        'run_info': run_info('run3', 3000),
+        'cumulative_timings': [t('main:compile:zinc', 30)],
+        'self_timings': []
+      })
+
+      self.assertEqual([(3000, 30000), (2000, 20000), (1000, 10000)],
+                       list(statsdb.get_timing_history('cumulative_timings', 'main:compile:zinc')))
+      self.assertEqual([(3000, 30000)],
+                       list(statsdb.get_timing_history('cumulative_timings', 'main:compile:zinc',
+                                                       limit=1)))
+      self.assertEqual([(3000, 30000), (2000, 20000)],
+                       list(statsdb.get_timing_history('cumulative_timings', 'main:compile:zinc',
+                                                       since=2000)))
+
+      self.assertEqual([('main:compile:zinc', 3, 20000.0), ('main:resolve:ivy', 1, 3000.0)],
+                       list(statsdb.get_mean_timings('cumulative_timings')))
+      self.assertEqual([('main:compile:zinc', 2, 25000.0)],
+                       list(statsdb.get_mean_timings('cumulative_timings',
+                                                     label_like='main:compile:%', since=2000)))
+
+      self.assertEqual([('a:a', 2, 0), ('b:b', 1, 1)], list(statsdb.get_cache_hit_rates()))
+      self.assertEqual([('b:b', 1, 0)], list(statsdb.get_cache_hit_rates('b:%', since=2000)))
+      statsdb.close()
+
+  def test_invalid_stats_are_not_inserted(self):
+    with temporary_dir() as tmpdir:
+      statsdb = StatsDB(os.path.join(tmpdir, 'statsdb.sqlite'))
+      statsdb.ensure_tables()
+      with self.assertRaises(StatsDBError):
+        statsdb.insert_stats({
+          'run_info': run_info('run1', 1000),
+          'cumulative_timings': [t('main:compile:zinc', 10)],
+          'self_timings': [{'label': 'main:compile'}]
+        })
+      self.assertEqual([], list(statsdb.get_mean_timings('cumulative_timings')))
+      self.assertEqual([], list(statsdb.get_aggregated_stats_for_cmd_line('self_timings', '%')))
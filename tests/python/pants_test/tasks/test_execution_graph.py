@@ -5,11 +5,11 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import random
 import unittest
 
-from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
-                                                                 Job, JobExistsError,
-                                                                 NoRootJobError, UnknownJobError)
+from pants.base.execution_graph import (ExecutionFailure, ExecutionGraph, Job, JobExistsError,
+                                        NoRootJobError, UnknownJobError, reduced_dependencies)
 
 
 class ImmediatelyExecutingPool(object):
@@ -272,3 +272,47 @@ class ExecutionGraphTest(unittest.TestCase):
 
     self.assertEqual(self.jobs_run, ['A'])
     self.assertEqual(failures, ['A', 'B1', 'B2', 'C1', 'C2', 'E'])
+
+
+class ReducedDependenciesTest(unittest.TestCase):
+
+  def test_transitive_edges_dropped(self):
+    graph = {'A': ['B', 'C', 'D'], 'B': ['D'], 'C': ['D'], 'D': []}
+    self.assertEqual({'A': ['B', 'C'], 'B': ['D'], 'C': ['D'], 'D': []},
+                     reduced_dependencies('ABCD', graph.get))
+
+  def test_dependencies_through_excluded_nodes(self):
+    # Only A, C and E are included: C is reached from A through B, and E from C through D and F.
+    graph = {'A': ['B', 'E'], 'B': ['C'], 'C': ['D', 'F'], 'D': ['E'], 'E': [], 'F': []}
+    self.assertEqual({'A': ['C'], 'C': ['E'], 'E': []},
+                     reduced_dependencies(['E', 'A', 'C'], graph.get))
+
+  def test_matches_reduction_of_closures(self):
+    rng = random.Random(42)
+    graph = {}
+    for index in range(200):
+      candidates = range(max(0, index - 20), index)
+      graph[index] = rng.sample(candidates, min(3, len(candidates)))
+
+    def closure(node):
+      seen = set()
+      to_walk = list(graph[node])
+      while to_walk:
+        dependency = to_walk.pop()
+        if dependency not in seen:
+          seen.add(dependency)
+          to_walk.extend(graph[dependency])
+      return seen
+
+    included = set(rng.sample(range(200), 100))
+    closures = {node: closure(node) & included for node in included}
+    expected = {}
+    for node, dependencies in closures.items():
+      implied = set()
+      for dependency in dependencies:
+        implied.update(closures[dependency])
+      expected[node] = sorted(dependencies - implied)
+
+    reduced = reduced_dependencies(included, graph.get)
+    self.assertEqual(expected, {node: sorted(deps) for node, deps in reduced.items()})
+
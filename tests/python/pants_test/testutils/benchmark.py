@@ -0,0 +1,61 @@
+# coding=utf-8
+# Copyright 2016 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import time
+
+
+def benchmark_parser(description, runs=3):
+  """Returns an argument parser for a benchmark binary, with a `--runs` option.
+
+  :param string description: The benchmark's description, typically its module `__doc__`.
+  :param int runs: The default number of times to run each measurement.
+  :rtype: :class:`argparse.ArgumentParser`
+  """
+  parser = argparse.ArgumentParser(description=description,
+                                   formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--runs', type=int, default=runs,
+                      help='The number of times to run each measurement; the best is reported.')
+  return parser
+
+
+def add_generated_graph_options(parser, targets):
+  """Adds the options of `sample_dependencies` for benchmarks over generated target graphs.
+
+  :param parser: The benchmark's argument parser.
+  :param int targets: The default number of targets to generate.
+  """
+  parser.add_argument('--targets', type=int, default=targets,
+                      help='The number of targets to generate.')
+  parser.add_argument('--fanout', type=int, default=3,
+                      help='The maximum number of dependencies per target.')
+  parser.add_argument('--window', type=int, default=50,
+                      help='How far back in the target list dependencies may reach.')
+  parser.add_argument('--seed', type=int, default=42)
+
+
+def sample_dependencies(rng, index, fanout, window):
+  """Returns the sorted indexes of up to `fanout` of the `window` targets before target `index`."""
+  candidates = range(max(0, index - window), index)
+  return sorted(rng.sample(candidates, min(fanout, len(candidates))))
+
+
+def timed(func, *args, **kwargs):
+  """Calls func once, returning the wall time it took and its result."""
+  start = time.time()
+  result = func(*args, **kwargs)
+  return time.time() - start, result
+
+
+def best_of(runs, func, *args, **kwargs):
+  """Calls func `runs` times, returning the best wall time it took and its last result."""
+  timings = []
+  result = None
+  for _ in range(runs):
+    elapsed, result = timed(func, *args, **kwargs)
+    timings.append(elapsed)
+  return min(timings), result